@@ -0,0 +1,185 @@
+"""
+Multi-day analytics computed with NumPy over columnar arrays.
+
+The feed table is turned into parallel arrays once per data version - day
+number, hour of day, epoch seconds, category code and amount - and every
+/api/analytics query is then a handful of masked bincounts and a diff over
+those arrays instead of a Python loop over entry dicts.
+
+Counting rules match the Daily Summary sheet of /api/report: bottle and
+nursing entries are feeds, bottle amounts are intake, pump amounts are
+pump output. Intervals are the gaps between consecutive feeds.
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import date
+
+import numpy as np
+
+from feed_table import timestamp_epoch
+
+OTHER, BOTTLE, NURSE, PUMP, DIAPER, VITAMIN_D = range(6)
+
+METRICS = ("intake_ml", "feeds", "diapers", "pump_ml")
+PERCENTILES = (10, 25, 50, 75, 90)
+
+# Longest range one request may ask for
+MAX_DAYS = 3660
+
+_EPOCH_DAY = date(1970, 1, 1).toordinal()
+
+
+def category_code(type_str):
+    if not isinstance(type_str, str):
+        return OTHER
+    if "Feed (Bottle" in type_str:
+        return BOTTLE
+    if "Nurse" in type_str:
+        return NURSE
+    if "Pump" in type_str:
+        return PUMP
+    if "Diaper" in type_str:
+        return DIAPER
+    if "Vitamin D" in type_str:
+        return VITAMIN_D
+    return OTHER
+
+
+def _day_number(date_str):
+    try:
+        return date.fromisoformat(date_str).toordinal() - _EPOCH_DAY
+    except (TypeError, ValueError):
+        return None
+
+
+def _hour(timestamp_str):
+    # The stored timestamp is local ISO time, so its hour is the local hour
+    if isinstance(timestamp_str, str) and len(timestamp_str) >= 13 and timestamp_str[11:13].isdigit():
+        return int(timestamp_str[11:13])
+    return 0
+
+
+class Columns:
+    """Parallel arrays for the entries of one table version."""
+
+    def __init__(self, rows):
+        days, hours, epochs, codes, amounts = [], [], [], [], []
+        code_cache = {}
+        for row in rows:
+            if len(row) < 8:
+                continue
+            day = _day_number(row[0])
+            if day is None:
+                continue
+            type_str = row[2]
+            code = code_cache.get(type_str)
+            if code is None:
+                code = code_cache[type_str] = category_code(type_str)
+            epoch = timestamp_epoch(row[7])
+            amount = row[3]
+
+            days.append(day)
+            hours.append(_hour(row[7]))
+            epochs.append(np.nan if epoch is None else epoch)
+            codes.append(code)
+            amounts.append(float(amount) if isinstance(amount, (int, float)) and not isinstance(amount, bool) else 0.0)
+
+        self.day = np.array(days, dtype=np.int32)
+        self.hour = np.array(hours, dtype=np.int8)
+        self.epoch = np.array(epochs, dtype=np.float64)
+        self.code = np.array(codes, dtype=np.int8)
+        self.amount = np.array(amounts, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.day)
+
+    def concat(self, other):
+        merged = Columns([])
+        for name in ("day", "hour", "epoch", "code", "amount"):
+            setattr(merged, name, np.concatenate([getattr(self, name), getattr(other, name)]))
+        return merged
+
+
+def _metric_matrix(index, size, code, amount):
+    """Rows: intake_ml, feeds, diapers, pump_ml; one column per bucket."""
+    bottle = code == BOTTLE
+    feeds = bottle | (code == NURSE)
+    return {
+        "intake_ml": np.bincount(index[bottle], weights=amount[bottle], minlength=size),
+        "feeds": np.bincount(index[feeds], minlength=size),
+        "diapers": np.bincount(index[code == DIAPER], minlength=size),
+        "pump_ml": np.bincount(index[code == PUMP], weights=amount[code == PUMP], minlength=size),
+    }
+
+
+def _to_lists(matrix):
+    out = {}
+    for name in METRICS:
+        values = matrix[name]
+        if values.dtype.kind == "f":
+            out[name] = [round(v, 1) for v in values.tolist()]
+        else:
+            out[name] = values.tolist()
+    return out
+
+
+def compute(columns, start_date, end_date):
+    """Per-day and per-hour-of-day matrices and feed interval percentiles for start..end (inclusive)."""
+    first = date.fromisoformat(start_date).toordinal() - _EPOCH_DAY
+    last = date.fromisoformat(end_date).toordinal() - _EPOCH_DAY
+    span = max(last - first + 1, 0)
+
+    mask = (columns.day >= first) & (columns.day <= last)
+    day = columns.day[mask] - first
+    hour = columns.hour[mask].astype(np.intp)
+    code = columns.code[mask]
+    amount = columns.amount[mask]
+    epoch = columns.epoch[mask]
+
+    feed_times = np.sort(epoch[((code == BOTTLE) | (code == NURSE)) & ~np.isnan(epoch)])
+    gaps = np.diff(feed_times) / 60
+    if len(gaps):
+        values = np.percentile(gaps, PERCENTILES)
+        intervals = {f"p{p}": round(float(v), 1) for p, v in zip(PERCENTILES, values)}
+    else:
+        intervals = {f"p{p}": None for p in PERCENTILES}
+    intervals["count"] = int(len(gaps))
+
+    return {
+        "from": start_date,
+        "to": end_date,
+        "days": [date.fromordinal(first + _EPOCH_DAY + i).isoformat() for i in range(span)],
+        "per_day": _to_lists(_metric_matrix(day.astype(np.intp), span, code, amount)),
+        "per_hour": _to_lists(_metric_matrix(hour, 24, code, amount)),
+        "intervals_min": intervals,
+    }
+
+
+class ColumnCache:
+    """Columns per feed file, rebuilt when its data version changes."""
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._columns = OrderedDict()
+        self._lock = threading.Lock()
+
+    def forget(self, scope):
+        """Drop a feed file's columns, e.g. when its data versions start over."""
+        with self._lock:
+            self._columns.pop(scope, None)
+
+    def get(self, scope, table):
+        """Caller holds the table's lock."""
+        with self._lock:
+            cached = self._columns.get(scope)
+            if cached is not None and cached[0] == table.version:
+                self._columns.move_to_end(scope)
+                return cached[1]
+        columns = Columns(table.rows)
+        with self._lock:
+            self._columns[scope] = (table.version, columns)
+            self._columns.move_to_end(scope)
+            while len(self._columns) > self.max_entries:
+                self._columns.popitem(last=False)
+        return columns
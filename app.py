@@ -4,37 +4,264 @@ Baby Feed Tracker - Flask Backend
 Dead simple feed tracking for sleep-deprived parents.
 """
 
-from flask import Flask, render_template, request, jsonify
-from datetime import datetime, timedelta
+from flask import Flask, render_template, request, jsonify, Response, stream_with_context, send_file, g, has_request_context
+from datetime import date, datetime, timedelta, timezone
 from openpyxl import Workbook, load_workbook
 from openpyxl.styles import Font, Alignment
 import threading
 import os
 import socket
+import time
+import atexit
+import bisect
+import hashlib
+import heapq
+import itertools
+import json
+import tempfile
+import click
+
+import analytics
+import archive
+import backup
+import exporter
+import fast_json
+import feed_schema
+import follower as follower_mod
+import idempotency
+import importer
+import msgpack_format
+import reports
+import response_cache as response_cache_mod
+import rolling_stats
+import singleflight
+import static_assets
+import tenants
+from collections import OrderedDict
+from feed_schema import format_feed_type, parse_iso_timestamp
+from feed_table import FeedTable, file_fingerprint, row_to_feed, timestamp_epoch
 
 app = Flask(__name__)
+app.json = fast_json.FastJSONProvider(app)
+app.wsgi_app = tenants.TenantPrefixMiddleware(app.wsgi_app)
 
 
-def parse_iso_timestamp(ts_string):
-    """Parse ISO format timestamp, handling 'Z' suffix that Python 3.9 doesn't support."""
-    if ts_string.endswith('Z'):
-        ts_string = ts_string[:-1] + '+00:00'
-    return datetime.fromisoformat(ts_string)
-
 # Excel file path - configurable for testing
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DEFAULT_FEED_FILE = os.path.join(BASE_DIR, 'feeds.xlsx')
 app.config['FEED_FILE'] = os.environ.get('FEED_FILE', DEFAULT_FEED_FILE)
 
-# Thread lock for file writes
-file_lock = threading.Lock()
+# Cold-tier archive: defaults to a directory next to the feed file.
+# ARCHIVE_AFTER_DAYS enables archiving of whole years older than that on startup.
+app.config['ARCHIVE_DIR'] = os.environ.get('ARCHIVE_DIR')
+app.config['ARCHIVE_AFTER_DAYS'] = int(os.environ['ARCHIVE_AFTER_DAYS']) if os.environ.get('ARCHIVE_AFTER_DAYS') else None
+
+# Incremental backups: defaults to a directory next to the feed file.
+# NIGHTLY_BACKUP_HOUR (0-23) runs one automatically each night while the server is up.
+app.config['BACKUP_DIR'] = os.environ.get('BACKUP_DIR')
+app.config['NIGHTLY_BACKUP_HOUR'] = int(os.environ['NIGHTLY_BACKUP_HOUR']) if os.environ.get('NIGHTLY_BACKUP_HOUR') else None
+
+# Read-only follower mode: FOLLOW is the primary's URL, or the path of its
+# feed file (or directory) on shared storage. Writes are refused with 409.
+app.config['FOLLOW'] = os.environ.get('FOLLOW')
+
+# Tenants (one per child or household) live under TENANTS_DIR, defaulting to
+# tenants/ next to the feed file. At most MAX_OPEN_TABLES feed tables are kept
+# in memory; idle ones are dropped and reloaded from their snapshot when needed.
+app.config['TENANTS_DIR'] = os.environ.get('TENANTS_DIR')
+app.config['MAX_OPEN_TABLES'] = int(os.environ.get('MAX_OPEN_TABLES', 64))
+
+# Thread lock for file writes, one per feed file so tenants don't block each other
+file_locks = {}
+file_locks_guard = threading.Lock()
+
+# In-memory copy of each feed workbook, keyed by file path, least recently used first
+feed_tables = OrderedDict()
+feed_tables_lock = threading.Lock()
+
+# Set when running as a read-only follower of another instance
+follower = None
+
+# Identical concurrent /api/feeds, /api/home and /api/stats requests share one computation
+read_flight = singleflight.SingleFlight()
+
+# Serialized /api/feeds, /api/home and /api/stats bodies, keyed by data version
+response_cache = response_cache_mod.ResponseCache(max_bytes=int(os.environ.get('RESPONSE_CACHE_BYTES', 8 * 1024 * 1024)))
+
+# /api/stats?window= results, until the next write or minute
+window_stats = rolling_stats.RollingStats()
+
+# Columnar copies of each feed table for /api/analytics, by data version
+analytics_columns = analytics.ColumnCache()
+
+# Responses to writes sent with an Idempotency-Key, so a retried write isn't applied twice
+idempotency_index = idempotency.IdempotencyIndex(
+    max_entries=int(os.environ.get('IDEMPOTENCY_MAX_KEYS', 10000)),
+    ttl=int(os.environ.get('IDEMPOTENCY_TTL_SECONDS', 24 * 3600)))
+write_flight = singleflight.SingleFlight()
+
+# Entries per page of GET /api/feeds?before=&limit= (default and maximum)
+HISTORY_PAGE_DEFAULT = 100
+HISTORY_PAGE_MAX = 1000
+
+# Per feed file, the (data version, date) the missed vitamin dose check last ran at
+missed_dose_checks = {}
+
+# Generated report files, keyed by data version
+report_cache = reports.ReportCache(directory=os.environ.get('REPORT_CACHE_DIR'))
+
+# Scripts and stylesheets in static/, fingerprinted and precompressed once at startup
+assets = static_assets.AssetTable(app.static_folder)
+
+# How long browsers may reuse the page itself before revalidating it (seconds)
+SHELL_MAX_AGE = 60
+
+# JSON responses at least this large are compressed when the client accepts it
+COMPRESS_MIN_BYTES = int(os.environ.get('COMPRESS_MIN_BYTES', 1024))
+
+# Fields of an entry in API responses, in order (see feed_table.row_to_feed)
+FEED_FIELDS = ("id",) + feed_schema.FIELDS
+
+# GET /api/feeds?limit_days= ranges of at least this many entries (or reaching
+# the archive) are streamed as they are encoded instead of built and cached whole
+STREAM_MIN_ENTRIES = int(os.environ.get('STREAM_MIN_ENTRIES', 5000))
+
+
+def current_tenant():
+    """Tenant key of the current request, or None for the default feed file."""
+    return g.get('tenant') if has_request_context() else None
+
+
+def get_tenants_dir():
+    feed_dir = os.path.dirname(os.path.abspath(app.config.get('FEED_FILE', 'feeds.xlsx')))
+    return app.config.get('TENANTS_DIR') or os.path.join(feed_dir, 'tenants')
 
 
 def get_excel_file():
-    """Get the current Excel file path from app config."""
+    """Get the current Excel file path: the request's tenant's, or the one in app config."""
+    tenant = current_tenant()
+    if tenant:
+        return tenants.tenant_feed_file(get_tenants_dir(), tenant)
     return app.config.get('FEED_FILE', 'feeds.xlsx')
 
 
+def get_archive_dir():
+    """Get the archive directory for the current feed file."""
+    if current_tenant() is None and app.config.get('ARCHIVE_DIR'):
+        return app.config['ARCHIVE_DIR']
+    return archive.archive_dir_for(get_excel_file())
+
+
+def get_backup_dir():
+    """Get the backup directory for the current feed file."""
+    if current_tenant() is None and app.config.get('BACKUP_DIR'):
+        return app.config['BACKUP_DIR']
+    return backup.backup_dir_for(get_excel_file())
+
+
+def get_file_lock(path=None):
+    """The lock guarding a feed file (defaults to the current one)."""
+    path = path or get_excel_file()
+    with file_locks_guard:
+        lock = file_locks.get(path)
+        if lock is None:
+            lock = file_locks[path] = threading.Lock()
+        return lock
+
+
+def get_feed_table(ws=None):
+    """
+    Return the in-memory table for the current feed file. Caller holds its file lock.
+
+    Loads from the snapshot + journal when they match the workbook on disk,
+    otherwise parses the workbook (pass an already-loaded worksheet to reuse it).
+    On a follower this is the table mirrored from the primary.
+    """
+    if follower is not None:
+        return follower.table
+
+    path = get_excel_file()
+    fingerprint = file_fingerprint(path)
+
+    with feed_tables_lock:
+        table = feed_tables.get(path)
+        if table is not None:
+            feed_tables.move_to_end(path)
+    if table is not None and table.fingerprint == fingerprint:
+        return table
+
+    if table is None:
+        table = FeedTable.load(path)
+        if table is not None and table.fingerprint == fingerprint:
+            table.retain_journal = os.path.isdir(get_backup_dir())
+            cache_feed_table(path, table)
+            return table
+
+    # No snapshot yet, or the workbook was edited outside the app
+    if ws is None:
+        ws = load_workbook(path).active
+    if table is not None:
+        seq = table.seq + 1
+    else:
+        seq = 0
+        forget_data_versions(path)
+    table = FeedTable.from_worksheet(path, ws, fingerprint, seq)
+    table.retain_journal = os.path.isdir(get_backup_dir())
+    cache_feed_table(path, table)
+    return table
+
+
+def forget_data_versions(path):
+    """
+    Drop everything cached against a feed file's data versions. Called when
+    its versions start over (a table rebuilt without a snapshot, a follower's
+    full resync), so a reused version can't bring back results of old data.
+    """
+    response_cache.forget(path)
+    analytics_columns.forget(path)
+    window_stats.forget(path)
+    report_cache.forget(path)
+    missed_dose_checks.pop(path, None)
+
+
+def cache_feed_table(path, table):
+    """
+    Keep a table in memory, dropping the least recently used ones beyond
+    MAX_OPEN_TABLES. Nothing is lost by dropping one: its snapshot and journal
+    are already on disk, and the next load happens under that file's lock, so
+    it sees any write still in progress on the dropped copy.
+    """
+    with feed_tables_lock:
+        feed_tables[path] = table
+        feed_tables.move_to_end(path)
+        while len(feed_tables) > max(app.config['MAX_OPEN_TABLES'], 1):
+            feed_tables.popitem(last=False)
+
+
+def get_data_version():
+    """Version of the current feed data; changes whenever anything is written."""
+    with get_file_lock():
+        return get_feed_table().version
+
+
+def warm_feed_table():
+    """Load the current feed table on startup so the first request doesn't pay for it."""
+    started = time.perf_counter()
+    with get_file_lock():
+        table = get_feed_table()
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    print(f"✓ Loaded {len(table.rows)} entries in {elapsed_ms:.1f} ms")
+
+
+def save_feed_snapshots():
+    """Snapshot every loaded feed table (run on clean shutdown)."""
+    with feed_tables_lock:
+        tables = list(feed_tables.items())
+    for path, table in tables:
+        with get_file_lock(path):
+            table.write_snapshot()
+
+
 def get_local_ip():
     """Get the local network IP address."""
     try:
@@ -47,165 +274,350 @@ def get_local_ip():
         return "localhost"
 
 
+def new_feed_workbook():
+    """A workbook with the feed log's headers and column formatting, and no entries."""
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Feed Log"
+
+    # Headers
+    ws.append(feed_schema.HEADERS)
+
+    # Format headers
+    for cell in ws[1]:
+        cell.font = Font(bold=True)
+        cell.alignment = Alignment(horizontal="center")
+
+    # Set column widths
+    ws.column_dimensions["A"].width = 12  # Date
+    ws.column_dimensions["B"].width = 12  # Time
+    ws.column_dimensions["C"].width = 18  # Type
+    ws.column_dimensions["D"].width = 12  # Amount
+    ws.column_dimensions["E"].width = 14  # Duration
+    ws.column_dimensions["F"].width = 30  # Notes
+    ws.column_dimensions["G"].width = 12  # Logged By
+    ws.column_dimensions["H"].width = 20  # Timestamp
+
+    return wb
+
+
 def init_excel_file():
     """Create the Excel file with headers if it doesn't exist."""
     if not os.path.exists(get_excel_file()):
-        with file_lock:
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "Feed Log"
-
-            # Headers
-            headers = ["Date", "Time", "Type", "Amount (ml)", "Duration (min)", "Notes", "Logged By", "Timestamp"]
-            ws.append(headers)
-
-            # Format headers
-            for cell in ws[1]:
-                cell.font = Font(bold=True)
-                cell.alignment = Alignment(horizontal="center")
-
-            # Set column widths
-            ws.column_dimensions["A"].width = 12  # Date
-            ws.column_dimensions["B"].width = 12  # Time
-            ws.column_dimensions["C"].width = 18  # Type
-            ws.column_dimensions["D"].width = 12  # Amount
-            ws.column_dimensions["E"].width = 14  # Duration
-            ws.column_dimensions["F"].width = 30  # Notes
-            ws.column_dimensions["G"].width = 12  # Logged By
-            ws.column_dimensions["H"].width = 20  # Timestamp
-
-            wb.save(get_excel_file())
+        with get_file_lock():
+            new_feed_workbook().save(get_excel_file())
             print(f"✓ Created {get_excel_file()}")
 
 
-def format_feed_type(feed_type, side=None):
-    """Convert feed type and side into Excel-friendly string."""
-    if feed_type == "bottle":
-        if side == "formula":
-            return "Feed (Bottle - Formula)"
-        elif side == "milk":
-            return "Feed (Bottle - Milk)"
-        else:
-            return "Feed (Bottle)"
-    elif feed_type == "nurse":
-        if side == "left":
-            return "Nurse (Left)"
-        elif side == "right":
-            return "Nurse (Right)"
-        else:
-            return "Nurse (Both)"
-    elif feed_type == "pump":
-        if side == "left":
-            return "Pump (Left)"
-        elif side == "right":
-            return "Pump (Right)"
-        else:
-            return "Pump (Both)"
-    elif feed_type == "diaper":
-        if side == "pee":
-            return "Diaper (Pee)"
-        elif side == "poop":
-            return "Diaper (Poop)"
-        elif side == "both":
-            return "Diaper (Both)"
-        else:
-            return "Diaper"
-    elif feed_type == "vitamin_d":
-        return "Vitamin D"
-    return feed_type
+FEED_TYPES = ("bottle", "nurse", "pump", "diaper", "vitamin_d")
+
+# Most entries accepted by POST /api/feeds/batch in one request
+MAX_BATCH_SIZE = 1000
+
+# Rows written per workbook save during bulk imports
+IMPORT_BATCH_SIZE = 10000
+
+
+def build_feed_row(feed_data):
+    """Build the workbook row for a feed payload."""
+    # Parse timestamp
+    if isinstance(feed_data.get("timestamp"), str):
+        timestamp = parse_iso_timestamp(feed_data["timestamp"])
+        # Always convert to local system time
+        timestamp = timestamp.astimezone(None)
+    else:
+        timestamp = datetime.now().astimezone(None)
+
+    # Format type
+    feed_type_str = format_feed_type(
+        feed_data.get("type"),
+        feed_data.get("side")
+    )
+
+    return [
+        timestamp.strftime("%Y-%m-%d"),  # Date
+        timestamp.strftime("%I:%M %p"),  # Time
+        feed_type_str,  # Type
+        feed_data.get("amount_ml"),  # Amount
+        feed_data.get("duration_min"),  # Duration
+        feed_data.get("notes", ""),  # Notes
+        feed_data.get("logged_by", ""),  # Logged By
+        timestamp.isoformat()  # Timestamp
+    ]
+
+
+def validate_feed(feed_data):
+    """Return an error message for an invalid feed payload, or None if it's fine."""
+    if not isinstance(feed_data, dict):
+        return "Entry must be an object"
+
+    if feed_data.get("type") not in FEED_TYPES:
+        return f"Unknown type: {feed_data.get('type')!r}"
+
+    timestamp = feed_data.get("timestamp")
+    if timestamp is not None:
+        if not isinstance(timestamp, str):
+            return "timestamp must be an ISO 8601 string"
+        try:
+            parse_iso_timestamp(timestamp)
+        except ValueError:
+            return f"Invalid timestamp: {timestamp!r}"
+
+    for field in ("amount_ml", "duration_min"):
+        value = feed_data.get(field)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))):
+            return f"{field} must be a number"
+
+    for field in ("side", "notes", "logged_by"):
+        value = feed_data.get(field)
+        if value is not None and not isinstance(value, str):
+            return f"{field} must be a string"
+
+    return None
 
 
 def add_feed_to_excel(feed_data):
     """Append a feed entry to the Excel file."""
-    with file_lock:
-        try:
-            wb = load_workbook(get_excel_file())
-            ws = wb.active
+    return add_feeds_to_excel([feed_data])[0]
 
-            # Parse timestamp
-            if isinstance(feed_data.get("timestamp"), str):
-                timestamp = parse_iso_timestamp(feed_data["timestamp"])
-                # Always convert to local system time
-                timestamp = timestamp.astimezone(None)
-            else:
-                timestamp = datetime.now().astimezone(None)
 
-            # Format type
-            feed_type_str = format_feed_type(
-                feed_data.get("type"),
-                feed_data.get("side")
-            )
+def add_feeds_to_excel(feed_list):
+    """Append several feed entries with a single workbook load and save. Returns their ids."""
+    return append_rows_to_excel([build_feed_row(feed_data) for feed_data in feed_list])
 
-            # Build row
-            row = [
-                timestamp.strftime("%Y-%m-%d"),  # Date
-                timestamp.strftime("%I:%M %p"),  # Time
-                feed_type_str,  # Type
-                feed_data.get("amount_ml"),  # Amount
-                feed_data.get("duration_min"),  # Duration
-                feed_data.get("notes", ""),  # Notes
-                feed_data.get("logged_by", ""),  # Logged By
-                timestamp.isoformat()  # Timestamp
-            ]
 
-            ws.append(row)
+def append_rows_to_excel(rows):
+    """Append prebuilt workbook rows with a single load and save. Returns their ids."""
+    with get_file_lock():
+        try:
+            wb = load_workbook(get_excel_file())
+            ws = wb.active
+            table = get_feed_table(ws)
+
+            first_id = ws.max_row
+            for row in rows:
+                ws.append(row)
             wb.save(get_excel_file())
+            table.append_many(rows, file_fingerprint(get_excel_file()))
 
-            # Return row number (excluding header)
-            return ws.max_row - 1
+            # Row numbers (excluding header)
+            return list(range(first_id, first_id + len(rows)))
 
         except Exception as e:
             print(f"Error writing to Excel: {e}")
             raise
 
 
-def get_feeds_from_excel(date_filter=None, min_date=None):
-    """Read feeds from Excel, optionally filtered by specific date or date range."""
-    with file_lock:
+def feed_key(timestamp, type_str):
+    """De-duplication key for an entry: the instant it happened (to the second) and its type."""
+    try:
+        instant = parse_iso_timestamp(timestamp).astimezone(timezone.utc).replace(microsecond=0)
+    except (TypeError, ValueError, AttributeError):
+        return (timestamp, type_str)
+    return (instant.isoformat(), type_str)
+
+
+def import_entry_row(entry):
+    """Workbook row for an imported entry in either the stored or the POST payload shape."""
+    if not isinstance(entry, dict):
+        raise ValueError("Entry must be an object")
+
+    # Payload entries carry a raw type ("bottle") and usually a side column
+    if entry.get("type") in FEED_TYPES or "side" in entry:
+        error = validate_feed(entry)
+        if error:
+            raise ValueError(error)
+        return build_feed_row(entry)
+
+    timestamp = entry.get("timestamp")
+    if isinstance(timestamp, datetime):
+        timestamp = timestamp.isoformat()
+    type_str = entry.get("type")
+    if not isinstance(type_str, str) or not type_str.strip() or not isinstance(timestamp, str):
+        raise ValueError("Entry needs a type and a timestamp")
+
+    # Date, time and timestamp are all stored in local time, as API writes are,
+    # so date filtering, the time index and timestamp string order agree; a date
+    # column that contradicts the timestamp means a bad row
+    written = parse_iso_timestamp(timestamp)
+    local = written.astimezone(None)
+    date_value = entry.get("date")
+    if isinstance(date_value, datetime):
+        date_value = date_value.date()
+    if isinstance(date_value, date):
+        date_value = date_value.isoformat()
+    if date_value not in (None, "") and date_value not in (written.strftime("%Y-%m-%d"), local.strftime("%Y-%m-%d")):
+        raise ValueError(f"date {date_value!r} doesn't match timestamp {timestamp!r}")
+
+    return [
+        local.strftime("%Y-%m-%d"),
+        local.strftime("%I:%M %p"),
+        type_str,
+        entry.get("amount_ml"),
+        entry.get("duration_min"),
+        entry.get("notes") or "",
+        entry.get("logged_by") or "",
+        local.isoformat()
+    ]
+
+
+def import_feed_file(path, fmt=None, batch_size=None):
+    """
+    Stream entries from an xlsx/CSV/JSON/NDJSON file into the workbook.
+
+    Entries already present (same timestamp and type, in the workbook, the
+    archive or earlier in the file) are skipped. Rows are written every
+    batch_size entries read, and the running totals are yielded after each
+    write; the last yielded dict is the final result.
+    """
+    batch_size = batch_size or IMPORT_BATCH_SIZE
+
+    with get_file_lock():
+        seen = {feed_key(row[7], row[2]) for row in get_feed_table().rows if len(row) >= 8}
+    for feed in archive.read_archived_feeds(get_archive_dir()):
+        seen.add(feed_key(feed["timestamp"], feed["type"]))
+
+    stats = {"read": 0, "imported": 0, "skipped": 0, "errors": 0}
+    batch = []
+    for entry in importer.read_feed_file(path, fmt):
+        stats["read"] += 1
         try:
-            wb = load_workbook(get_excel_file())
-            ws = wb.active
-
-            feeds = []
-            for idx, row in enumerate(ws.iter_rows(min_row=2, values_only=True), start=2):
-                if len(row) < 8:
-                    continue
+            row = import_entry_row(entry)
+        except (TypeError, ValueError):
+            stats["errors"] += 1
+            continue
 
-                date_str, time_str, type_str, amount, duration, notes, logged_by, timestamp_str = row[:8]
+        key = feed_key(row[7], row[2])
+        if key in seen:
+            stats["skipped"] += 1
+        else:
+            seen.add(key)
+            batch.append(row)
 
-                # Filter by specific date if requested
-                if date_filter and date_str != date_filter:
-                    continue
+        if stats["read"] % batch_size == 0:
+            if batch:
+                append_rows_to_excel(batch)
+                stats["imported"] += len(batch)
+                batch = []
+            yield dict(stats)
 
-                # Filter by min_date if requested (for history range)
-                if min_date and date_str < min_date:
-                    continue
+    if batch:
+        append_rows_to_excel(batch)
+        stats["imported"] += len(batch)
+    yield dict(stats, done=True)
 
-                feeds.append({
-                    "id": idx - 1,  # Row number minus header
-                    "date": date_str,
-                    "time": time_str,
-                    "type": type_str,
-                    "amount_ml": amount,
-                    "duration_min": duration,
-                    "notes": notes or "",
-                    "logged_by": logged_by or "",
-                    "timestamp": timestamp_str
-                })
 
-            return feeds
+def get_feeds_from_excel(date_filter=None, min_date=None):
+    """Read feeds (via the in-memory table), optionally filtered by specific date or date range."""
+    with get_file_lock():
+        try:
+            return get_feed_table().select(date_filter, min_date)
 
         except Exception as e:
             print(f"Error reading Excel: {e}")
             return []
 
 
+def get_latest_entries():
+    """The most recent feed (anything but Vitamin D and pumping) and diaper change, as API dicts or None."""
+    with get_file_lock():
+        try:
+            table = get_feed_table()
+            feed, diaper = table.latest("feed"), table.latest("diaper")
+        except Exception as e:
+            print(f"Error reading Excel: {e}")
+            return None, None
+    return (row_to_feed(feed, None) if feed else None,
+            row_to_feed(diaper, None) if diaper else None)
+
+
+def get_feeds_with_archive(date_filter=None, min_date=None):
+    """Read feeds from the hot workbook, merging in archived entries only if the range reaches them."""
+    feeds = get_feeds_from_excel(date_filter, min_date)
+    if archive.reaches_archive(get_archive_dir(), date_filter or min_date):
+        feeds = archive.read_archived_feeds(get_archive_dir(), date_filter, min_date) + feeds
+    return feeds
+
+
+def iter_feeds_snapshot(min_date=None, max_date=None):
+    """
+    Entries between two dates (inclusive), oldest first, archive included.
+
+    The hot tier is captured by copying the table's row list under the lock,
+    so the returned iterator can be consumed slowly (e.g. by a large export)
+    without blocking anyone logging a feed.
+    """
+    archive_dir = get_archive_dir()
+    with get_file_lock():
+        rows = list(get_feed_table().rows)
+
+    def generate():
+        if archive.reaches_archive(archive_dir, min_date):
+            yield from archive.iter_archived_feeds(archive_dir, min_date=min_date, max_date=max_date)
+
+        selected = []
+        for idx, row in enumerate(rows):
+            if len(row) < 8 or not isinstance(row[0], str):
+                continue
+            if (min_date and row[0] < min_date) or (max_date and row[0] > max_date):
+                continue
+            selected.append((row[7] or "", idx))
+        selected.sort()
+
+        for _, idx in selected:
+            yield row_to_feed(rows[idx], idx + 1)
+
+    return generate()
+
+
+def archive_cutoff(after_days):
+    """First day of the year that contains (today - after_days); everything before it is archived."""
+    edge = datetime.now() - timedelta(days=after_days)
+    return f"{edge.year}-01-01"
+
+
+def archive_feeds_before(cutoff_date):
+    """Move entries dated before cutoff_date (YYYY-MM-DD) out of the workbook into the archive."""
+    with get_file_lock():
+        try:
+            wb = load_workbook(get_excel_file())
+            ws = wb.active
+            table = get_feed_table(ws)
+
+            keep, old = [], []
+            for row in ws.iter_rows(min_row=2, values_only=True):
+                date_str = row[0] if row else None
+                if len(row) >= 8 and isinstance(date_str, str) and date_str < cutoff_date:
+                    old.append(dict(zip(feed_schema.FIELDS, row[:8])))
+                else:
+                    keep.append(row)
+
+            if not old:
+                return 0
+
+            # Segments and index are written before the workbook shrinks, so a
+            # crash in between can only duplicate entries, never lose them.
+            archive.write_segments(get_archive_dir(), old, cutoff_date)
+
+            ws.delete_rows(2, ws.max_row)
+            for row in keep:
+                ws.append(row)
+            wb.save(get_excel_file())
+            table.replace_all(keep, file_fingerprint(get_excel_file()))
+            return len(old)
+
+        except Exception as e:
+            print(f"Error archiving Excel: {e}")
+            raise
+
+
 def delete_feed_from_excel(feed_id):
     """Delete a feed entry by row number."""
-    with file_lock:
+    with get_file_lock():
         try:
             wb = load_workbook(get_excel_file())
             ws = wb.active
+            table = get_feed_table(ws)
 
             # feed_id is row number minus header, so actual row is feed_id + 1
             row_num = feed_id + 1
@@ -215,6 +627,7 @@ def delete_feed_from_excel(feed_id):
 
             ws.delete_rows(row_num)
             wb.save(get_excel_file())
+            table.delete(feed_id, file_fingerprint(get_excel_file()))
             return True
 
         except Exception as e:
@@ -224,10 +637,11 @@ def delete_feed_from_excel(feed_id):
 
 def update_feed_in_excel(feed_id, feed_data):
     """Update a feed entry by row number."""
-    with file_lock:
+    with get_file_lock():
         try:
             wb = load_workbook(get_excel_file())
             ws = wb.active
+            table = get_feed_table(ws)
 
             row_num = feed_id + 1
 
@@ -254,16 +668,21 @@ def update_feed_in_excel(feed_id, feed_data):
             )
 
             # Update row
-            ws[f"A{row_num}"] = timestamp.strftime("%Y-%m-%d")
-            ws[f"B{row_num}"] = timestamp.strftime("%I:%M %p")
-            ws[f"C{row_num}"] = feed_type_str
-            ws[f"D{row_num}"] = feed_data.get("amount_ml")
-            ws[f"E{row_num}"] = feed_data.get("duration_min")
-            ws[f"F{row_num}"] = feed_data.get("notes", "")
-            ws[f"G{row_num}"] = feed_data.get("logged_by", "")
-            ws[f"H{row_num}"] = timestamp.isoformat()
+            row = [
+                timestamp.strftime("%Y-%m-%d"),  # Date
+                timestamp.strftime("%I:%M %p"),  # Time
+                feed_type_str,  # Type
+                feed_data.get("amount_ml"),  # Amount
+                feed_data.get("duration_min"),  # Duration
+                feed_data.get("notes", ""),  # Notes
+                feed_data.get("logged_by", ""),  # Logged By
+                timestamp.isoformat()  # Timestamp
+            ]
+            for col, value in zip("ABCDEFGH", row):
+                ws[f"{col}{row_num}"] = value
 
             wb.save(get_excel_file())
+            table.update(feed_id, row, file_fingerprint(get_excel_file()))
             return True
 
         except Exception as e:
@@ -271,19 +690,398 @@ def update_feed_in_excel(feed_id, feed_data):
             return False
 
 
+# Requests that may create a tenant's workbook
+WRITE_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+
+
+@app.before_request
+def select_tenant():
+    """Pick the request's tenant from its /t/<key>/ prefix or X-Tenant header.
+
+    A tenant's workbook is created by its first write (or `flask create-tenant`);
+    API reads of a tenant that doesn't exist yet get a 404 rather than an empty
+    workbook on disk. The page itself still loads so the first entry can be logged.
+    A follower only mirrors the primary's default feed file, so it has no tenants.
+    """
+    tenant = request.environ.get(tenants.ENVIRON_KEY) or request.headers.get(tenants.TENANT_HEADER)
+    if not tenant:
+        return None
+    if not tenants.is_valid_tenant(tenant):
+        return jsonify({"success": False, "error": "Tenant keys are 1-64 letters, digits, '-' or '_'"}), 400
+
+    if follower is not None:
+        return jsonify({"success": False, "error": f"Unknown tenant: {tenant} (followers only mirror the default feed file)"}), 404
+
+    g.tenant = tenant
+    if not os.path.exists(get_excel_file()):
+        if request.method in WRITE_METHODS:
+            create_tenant_workbook()
+        elif request.path.startswith("/api/"):
+            return jsonify({"success": False, "error": f"Unknown tenant: {tenant}"}), 404
+    return None
+
+
+def create_tenant_workbook():
+    """Create the current tenant's directory and empty workbook."""
+    os.makedirs(os.path.dirname(get_excel_file()), exist_ok=True)
+    init_excel_file()
+
+
+@app.before_request
+def reject_writes_on_follower():
+    """A follower only serves reads; writes belong on the primary."""
+    if follower is not None and request.method not in ("GET", "HEAD", "OPTIONS"):
+        return jsonify({
+            "success": False,
+            "error": "This is a read-only follower; log entries on the primary",
+            "primary": follower.source if follower.is_http else None
+        }), 409
+
+
+@app.context_processor
+def asset_helpers():
+    def asset_url(name):
+        """URL of a fingerprinted file from static/."""
+        return f"{request.script_root}/assets/{assets.url_name(name)}"
+    return {"asset_url": asset_url}
+
+
+def accepted_encoding(encodings):
+    """The best of the given content codings the client accepts, or None."""
+    return request.accept_encodings.best_match([e for e in encodings if e != "identity"])
+
+
+def wants_msgpack():
+    """True if the client asked for MessagePack (Accept: application/msgpack) over JSON."""
+    return request.accept_mimetypes.best_match(["application/json", msgpack_format.MIMETYPE]) == msgpack_format.MIMETYPE
+
+
+def negotiated_response(payload):
+    """payload as MessagePack if the client asked for it (wants_msgpack), JSON otherwise."""
+    if wants_msgpack():
+        response = Response(msgpack_format.packb(payload), mimetype=msgpack_format.MIMETYPE)
+    else:
+        response = jsonify(payload)
+    response.vary.add("Accept")
+    return response
+
+
+def encoded_response(body, mimetype, bodies=None):
+    """
+    A response with body compressed in the best coding the client accepts.
+    bodies maps codings to already-compressed copies; without it, body is
+    compressed here.
+    """
+    encodings = list(bodies) if bodies is not None else static_assets.available_encodings()
+    encoding = accepted_encoding(encodings)
+    if encoding is None:
+        response = Response(body, mimetype=mimetype)
+    else:
+        data = bodies[encoding] if bodies is not None else static_assets.compress(body, encoding, fast=True)
+        response = Response(data, mimetype=mimetype)
+        response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+@app.after_request
+def compress_json(response):
+    """
+    Compress JSON and MessagePack bodies of COMPRESS_MIN_BYTES or more in the
+    best coding the client accepts. Streamed responses (exports, imports) are
+    left alone.
+    """
+    if (response.mimetype not in ("application/json", msgpack_format.MIMETYPE) or response.is_streamed
+            or "Content-Encoding" in response.headers):
+        return response
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_BYTES:
+        return response
+    encoding = accepted_encoding(static_assets.available_encodings())
+    if encoding is not None:
+        response.set_data(static_assets.compress(body, encoding, fast=True))
+        response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    return response
+
+
 @app.route("/")
 def index():
-    """Serve the main UI."""
-    return render_template("index.html")
+    """
+    Serve the main UI: a small shell linking the fingerprinted assets, reused
+    for SHELL_MAX_AGE and then revalidated by ETag (304 when unchanged).
+    """
+    body = render_template("index.html").encode()
+    response = encoded_response(body, "text/html")
+    response.set_etag(static_assets.digest(body), weak=True)
+    response.headers["Cache-Control"] = f"max-age={SHELL_MAX_AGE}"
+    return response.make_conditional(request)
+
+
+@app.route("/assets/<name>")
+def static_asset(name):
+    """
+    A fingerprinted file from static/. Its URL changes with its content, so
+    browsers keep it for a year without asking again. A URL from before a
+    deploy gets the current file, revalidated on every use.
+    """
+    asset, current = assets.lookup(name)
+    if asset is None:
+        return jsonify({"success": False, "error": "Not found"}), 404
+    response = encoded_response(asset.bodies["identity"], asset.mimetype, asset.bodies)
+    response.set_etag(asset.digest, weak=True)
+    if current:
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    else:
+        response.headers["Cache-Control"] = "no-cache"
+    return response.make_conditional(request)
+
+
+@app.route("/sw.js")
+def service_worker():
+    """
+    The offline service worker, listing the current fingerprinted assets.
+    Served from the app's root rather than /assets/ so it can control the
+    whole app (under a tenant prefix, that tenant's pages), and revalidated
+    on every load so updates roll out.
+    """
+    prefix = "assets/"
+    manifest = {name: prefix + url_name for name, url_name in assets.manifest().items()}
+    response = Response(render_template("sw.js", assets=manifest), mimetype="text/javascript")
+    response.headers["Cache-Control"] = "no-cache"
+    return response
 
 
 @app.route("/api/feeds", methods=["GET"])
 def get_feeds():
-    """Get feed entries for a specific date (defaults to today)."""
+    """
+    Get feed entries for a specific date (defaults to today), or with ?limit=
+    and/or ?before= one page of the whole history (see build_history_page).
+    ?fields= and ?shape= select the entry fields and layout (parse_feed_shape).
+    Sent as MessagePack to clients that ask for it (see cached_json_response).
+    """
+    try:
+        shape = parse_feed_shape(request.args)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
+    if "limit" in request.args or "before" in request.args:
+        return get_history_page(shape)
+
     # Check for limit_days parameter (history view)
     limit_days = request.args.get("limit_days", type=int)
     date_filter = request.args.get("date")
 
+    if limit_days and not shape[1] and not wants_msgpack():
+        streamed = stream_feeds_response(limit_days, shape[0])
+        if streamed is not None:
+            return streamed
+
+    return cached_json_response(("feeds", limit_days, date_filter) + shape,
+                                shaped_feeds(lambda: build_feeds_payload(limit_days, date_filter), shape))
+
+
+def parse_feed_shape(args):
+    """
+    (fields, columns) from ?fields=id,type,... (default: all) and
+    ?shape=rows|columns. With columns, "feeds" becomes one array per field
+    instead of one object per entry. Raises ValueError for unknown names.
+    """
+    fields = None
+    if args.get("fields"):
+        fields = tuple(field.strip() for field in args["fields"].split(","))
+        unknown = [field for field in fields if field not in FEED_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)} (choose from {', '.join(FEED_FIELDS)})")
+    shape = args.get("shape", "rows")
+    if shape not in ("rows", "columns"):
+        raise ValueError(f"Invalid shape: {shape!r} (use rows or columns)")
+    return fields, shape == "columns"
+
+
+def shaped_feeds(build, shape):
+    """Wrap a payload builder so the "feeds" in its result come out in the shape from parse_feed_shape."""
+    fields, columns = shape
+    if fields is None and not columns:
+        return build
+    fields = fields or FEED_FIELDS
+
+    def build_shaped():
+        built = build()
+        payload = built[0] if isinstance(built, tuple) else built
+        feeds = payload["feeds"]
+        if columns:
+            payload["feeds"] = {field: [feed.get(field) for feed in feeds] for field in fields}
+        else:
+            payload["feeds"] = [{field: feed.get(field) for field in fields} for feed in feeds]
+        return built
+    return build_shaped
+
+
+def get_history_page(shape):
+    """GET /api/feeds?before=YYYY-MM-DD&limit=N"""
+    before = request.args.get("before") or None
+    limit = request.args.get("limit", default=HISTORY_PAGE_DEFAULT, type=int)
+    if not 1 <= limit <= HISTORY_PAGE_MAX:
+        return jsonify({"success": False, "error": f"limit must be 1 to {HISTORY_PAGE_MAX}"}), 400
+    if before:
+        try:
+            datetime.strptime(before, "%Y-%m-%d")
+        except ValueError:
+            return jsonify({"success": False, "error": f"Invalid date: {before!r} (use YYYY-MM-DD)"}), 400
+
+    return cached_json_response(("page", before, limit) + shape,
+                                shaped_feeds(lambda: build_history_page(before, limit), shape))
+
+
+def build_history_page(before, limit):
+    """
+    Whole days of entries dated before `before` (None = from the newest),
+    newest first, at least `limit` of them when there are that many.
+    next_cursor is the oldest date on the page - pass it as ?before= for the
+    next one - or None once nothing older is left.
+
+    The hot tier is walked back from a bisection of its time index, so a page
+    costs the same however deep into the history it is. Archived entries are
+    merged in once a page reaches the archive's dates.
+    """
+    before_epoch = timestamp_epoch(before + "T00:00:00") if before else None
+    with get_file_lock():
+        feeds, older = get_feed_table().page_before(before_epoch, limit)
+
+    archive_dir = get_archive_dir()
+    oldest = feeds[-1]["date"] if feeds else None
+    if archive.reaches_archive(archive_dir, oldest):
+        # The hot page holds every hot entry the merged page can need, so the
+        # limit and the whole-day boundary are applied to the merged stream
+        merged = heapq.merge(feeds, archive.iter_archived_before(archive_dir, before),
+                             key=lambda feed: (feed["date"], feed["timestamp"] or ""), reverse=True)
+        feeds = []
+        for feed in merged:
+            if len(feeds) >= limit and feed["date"] != feeds[-1]["date"]:
+                older = True
+                break
+            feeds.append(feed)
+        oldest = min((feed["date"] for feed in feeds), default=None)
+    elif archive.load_index(archive_dir)["segments"]:
+        # Everything archived is older than this page
+        older = True
+
+    return {"feeds": feeds, "next_cursor": oldest if older else None}
+
+
+@app.route("/api/home", methods=["GET"])
+def get_home():
+    """
+    Everything the home screen shows in one request: the last ?limit_days=
+    (default 7) of entries with their summaries, today's stats and the
+    vitamin status. Takes ?fields= and ?shape= like GET /api/feeds.
+    """
+    limit_days = request.args.get("limit_days", default=7, type=int)
+    if limit_days < 1:
+        return jsonify({"success": False, "error": "limit_days must be at least 1"}), 400
+    try:
+        shape = parse_feed_shape(request.args)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
+    log_missed_vitamin_dose()
+    return cached_json_response(("home", limit_days) + shape,
+                                shaped_feeds(lambda: build_home_payload(limit_days), shape))
+
+
+def build_home_payload(limit_days):
+    """
+    The GET /api/home response body. Entries and latest-entry pointers are
+    read under one lock, so every part describes the same data version.
+    """
+    today = datetime.now().strftime("%Y-%m-%d")
+    start_date = (datetime.now() - timedelta(days=limit_days)).strftime("%Y-%m-%d")
+    with get_file_lock():
+        table = get_feed_table()
+        feeds = table.select(min_date=start_date)
+        last_feed, last_diaper = table.latest("feed"), table.latest("diaper")
+
+    # Today's entries in row order, before sorting (the vitamin status reports the first dose)
+    today_feeds = [feed for feed in feeds if feed["date"] == today]
+    if archive.reaches_archive(get_archive_dir(), start_date):
+        feeds = archive.read_archived_feeds(get_archive_dir(), None, start_date) + feeds
+    feeds.sort(key=lambda x: x["timestamp"], reverse=True)
+
+    payload, clock_fields = summarize_feeds(
+        feeds,
+        row_to_feed(last_feed, None) if last_feed else None,
+        row_to_feed(last_diaper, None) if last_diaper else None)
+    payload["stats"] = {"today": day_totals(today_feeds)}
+    payload["vitamin"] = vitamin_status(today_feeds)
+    return payload, clock_fields
+
+
+def minutes_since(timestamp_str):
+    """Whole minutes from an entry's timestamp until now, or None."""
+    if not timestamp_str:
+        return None
+    timestamp = parse_iso_timestamp(timestamp_str)
+    # Remove timezone info if present to avoid comparison errors
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.replace(tzinfo=None)
+    return int((datetime.now() - timestamp).total_seconds() / 60)
+
+
+def serialize_payload(built, packed=False):
+    """
+    Encode a build_*_payload result as (body bytes, clock fields): JSON, or
+    if packed MessagePack with compact entries (msgpack_format.compact_entries).
+    """
+    payload, clock_fields = built if isinstance(built, tuple) else (built, {})
+    if packed:
+        return msgpack_format.packb(msgpack_format.compact_entries(payload)), clock_fields
+    return app.json.dumpb(payload), clock_fields
+
+
+def splice_clock_fields(body, clock_fields, packed=False):
+    """A serialized JSON (or packed) object with the "minutes ago" fields, worked out now, added at the end."""
+    if not clock_fields:
+        return body
+    clock = {field: minutes_since(ts) for field, ts in clock_fields.items()}
+    if packed:
+        return msgpack_format.extend_map(body, clock)
+    return body[:-1] + b"," + app.json.dumpb(clock)[1:]
+
+
+def cached_json_response(params, build):
+    """
+    Serve a read endpoint from the serialized response cache, keyed by the
+    request's parameters, the data version and the local date. On a miss the
+    body is built once (shared with identical concurrent requests) and
+    cached; per request only the clock fields are encoded and spliced in.
+    Clients that ask for MessagePack get it, cached separately.
+    """
+    scope = get_excel_file()
+    packed = wants_msgpack()
+    key = params + ("msgpack" if packed else "json", datetime.now().strftime("%Y-%m-%d"))
+    version = get_data_version()
+
+    cached = response_cache.get(scope, key, version)
+    if cached is None:
+        cached, _ = read_flight.do((scope, version) + key, lambda: serialize_payload(build(), packed))
+        response_cache.put(scope, key, version, cached)
+
+    body, clock_fields = cached
+    response = Response(splice_clock_fields(body, clock_fields, packed),
+                        mimetype=msgpack_format.MIMETYPE if packed else "application/json")
+    response.vary.add("Accept")
+    # Lets clients key their own caches (e.g. the charts) by data version
+    response.headers["X-Data-Version"] = str(version)
+    return response
+
+
+def build_feeds_payload(limit_days=None, date_filter=None):
+    """
+    The GET /api/feeds response body: entries, newest first, plus home-screen
+    summaries. Returns (payload, clock_fields), where clock_fields maps each
+    "minutes ago" field to the timestamp it counts from.
+    """
     if limit_days:
         # Calculate start date (Today - limit_days)
         # Note: limit_days=1 means today + yesterday (last 24h extended to specific days)
@@ -291,88 +1089,208 @@ def get_feeds():
         # Or just previous N days.
         # User asked for "7 days". Let's do Today + 6 past days.
         start_date = (datetime.now() - timedelta(days=limit_days)).strftime("%Y-%m-%d")
-        feeds = get_feeds_from_excel(min_date=start_date)
+        feeds = get_feeds_with_archive(min_date=start_date)
     elif not date_filter:
         # Default to today
         date_filter = datetime.now().strftime("%Y-%m-%d")
         feeds = get_feeds_from_excel(date_filter)
     else:
         # Specific date requested
-        feeds = get_feeds_from_excel(date_filter)
+        feeds = get_feeds_with_archive(date_filter)
 
     # Sort by timestamp descending (most recent first)
     feeds.sort(key=lambda x: x["timestamp"], reverse=True)
 
-    # Calculate stats (exclude Vitamin D from feed/diaper stats)
-    last_feed_minutes_ago = None
-    last_feed_summary = None
-    last_diaper_minutes_ago = None
-    last_diaper_summary = None
-    total_ml_today = 0
-    total_feeds_today = 0
-
-    if feeds:
-        # Find most recent actual feed (not Vitamin D, not Pump)
-        last_feed = None
+    # Last feed / diaper come from the table's latest-entry pointers, so they
+    # don't depend on the range requested (or cost a scan)
+    last_feed, last_diaper = get_latest_entries()
+    return summarize_feeds(feeds, last_feed, last_diaper)
+
+
+def stream_feeds_response(limit_days, fields=None):
+    """
+    GET /api/feeds?limit_days= for long ranges: the body build_feeds_payload
+    would give, streamed as it is encoded. Entries are read newest first from
+    a copy of the table's time index (merged with the archive when the range
+    reaches it), encoded exporter.ROWS_PER_CHUNK at a time and added to the
+    totals on the way, so memory stays flat and the first bytes go out at
+    once. Returns None for ranges of fewer than STREAM_MIN_ENTRIES hot
+    entries that don't reach the archive; those are built whole and cached.
+    Row shape only: ?shape=columns needs every entry before the first array.
+    """
+    start_date = (datetime.now() - timedelta(days=limit_days)).strftime("%Y-%m-%d")
+    # A day's margin covers timestamps whose offset puts them before start_date's local midnight
+    start_epoch = timestamp_epoch(start_date + "T00:00:00") - 24 * 3600
+    archive_dir = get_archive_dir()
+    reaches = archive.reaches_archive(archive_dir, start_date)
+
+    with get_file_lock():
+        table = get_feed_table()
+        epochs, rows, ids = table.time_index()
+        pos = bisect.bisect_left(epochs, start_epoch)
+        if len(epochs) - pos < STREAM_MIN_ENTRIES and not reaches:
+            return None
+        # Slices copy the (shared, appended-to) index, not the rows themselves
+        rows, ids = rows[pos:], ids[pos:]
+        last_feed, last_diaper = table.latest("feed"), table.latest("diaper")
+        version = table.version
+
+    def hot_feeds():
+        for row, feed_id in zip(reversed(rows), reversed(ids)):
+            if isinstance(row[0], str) and row[0] >= start_date:
+                yield row_to_feed(row, feed_id)
+
+    feeds = hot_feeds()
+    if reaches:
+        archived = itertools.takewhile(lambda feed: feed["date"] >= start_date,
+                                       archive.iter_archived_before(archive_dir))
+        feeds = heapq.merge(feeds, archived, key=lambda feed: feed["timestamp"] or "", reverse=True)
+
+    summary, clock_fields = summarize_feeds(
+        [],
+        row_to_feed(last_feed, None) if last_feed else None,
+        row_to_feed(last_diaper, None) if last_diaper else None)
+    del summary["feeds"]
+
+    def generate():
+        totals = {"total_ml_today": 0, "total_feeds_today": 0}
+        separator = b""
+        chunk = []
+        yield b'{"feeds":['
         for feed in feeds:
-            if "Vitamin D" not in feed["type"] and "Pump" not in feed["type"]:
-                last_feed = feed
-                break
+            count_feed(totals, feed)
+            chunk.append(feed if fields is None else {field: feed.get(field) for field in fields})
+            if len(chunk) == exporter.ROWS_PER_CHUNK:
+                yield separator + app.json.dumpb(chunk)[1:-1]
+                separator = b","
+                chunk = []
+        if chunk:
+            yield separator + app.json.dumpb(chunk)[1:-1]
+
+        summary["total_ml_today"] = round(totals["total_ml_today"], 1)
+        summary["total_feeds_today"] = totals["total_feeds_today"]
+        yield b"]," + splice_clock_fields(app.json.dumpb(summary), clock_fields)[1:]
+
+    encoding = accepted_encoding(static_assets.available_encodings())
+    if encoding is None:
+        response = Response(generate(), mimetype="application/json")
+    else:
+        response = Response(static_assets.compress_stream(generate(), encoding), mimetype="application/json")
+        response.headers["Content-Encoding"] = encoding
+    response.vary.update(("Accept", "Accept-Encoding"))
+    response.headers["X-Data-Version"] = str(version)
+    return response
 
-        if last_feed:
-            last_timestamp = parse_iso_timestamp(last_feed["timestamp"])
-            # Remove timezone info if present to avoid comparison errors
-            if last_timestamp.tzinfo is not None:
-                last_timestamp = last_timestamp.replace(tzinfo=None)
-            last_feed_minutes_ago = int((datetime.now() - last_timestamp).total_seconds() / 60)
 
-            # Build summary
-            amount_str = f"{last_feed['amount_ml']} ml" if last_feed["amount_ml"] else ""
-            duration_str = f"{last_feed['duration_min']} min" if last_feed["duration_min"] else ""
-            detail_str = " — ".join(filter(None, [amount_str, duration_str]))
+def summarize_feeds(feeds, last_feed, last_diaper):
+    """Home-screen summaries around an entry list: (payload, clock_fields) as in build_feeds_payload."""
+    last_feed_timestamp = last_feed["timestamp"] if last_feed else None
+    last_feed_summary = None
+    last_diaper_timestamp = last_diaper["timestamp"] if last_diaper else None
+    last_diaper_summary = None
 
-            last_feed_summary = f"{last_feed['type']}"
-            if detail_str:
-                last_feed_summary += f" — {detail_str}"
-            last_feed_summary += f" at {last_feed['time']}"
+    if last_feed:
+        # Build summary
+        amount_str = f"{last_feed['amount_ml']} ml" if last_feed["amount_ml"] else ""
+        duration_str = f"{last_feed['duration_min']} min" if last_feed["duration_min"] else ""
+        detail_str = " — ".join(filter(None, [amount_str, duration_str]))
 
-        # Calculate last diaper change
-        for feed in feeds:
-            if "Diaper" in feed["type"]:
-                last_diaper_timestamp = parse_iso_timestamp(feed["timestamp"])
-                if last_diaper_timestamp.tzinfo is not None:
-                    last_diaper_timestamp = last_diaper_timestamp.replace(tzinfo=None)
-                last_diaper_minutes_ago = int((datetime.now() - last_diaper_timestamp).total_seconds() / 60)
-                last_diaper_summary = f"{feed['type']} at {feed['time']}"
-                break
+        last_feed_summary = f"{last_feed['type']}"
+        if detail_str:
+            last_feed_summary += f" — {detail_str}"
+        last_feed_summary += f" at {last_feed['time']}"
 
-        # Calculate total ml and feed count (only Bottle and Nurse)
-        for feed in feeds:
-            if "Vitamin D" in feed["type"]:
-                continue
-            
-            # Only count Bottle and Nurse as "feeds"
-            if "Feed (Bottle" in feed["type"] or "Nurse" in feed["type"]:
-                total_feeds_today += 1
-            
-            # Only sum ml from Bottle feeds (baby's intake, not pump output)
-            if "Feed (Bottle" in feed["type"] and feed["amount_ml"]:
-                total_ml_today += feed["amount_ml"]
+    if last_diaper:
+        last_diaper_summary = f"{last_diaper['type']} at {last_diaper['time']}"
 
-    return jsonify({
+    totals = {"total_ml_today": 0, "total_feeds_today": 0}
+    for feed in feeds:
+        count_feed(totals, feed)
+
+    payload = {
         "feeds": feeds,
-        "last_feed_minutes_ago": last_feed_minutes_ago,
         "last_feed_summary": last_feed_summary,
-        "last_diaper_minutes_ago": last_diaper_minutes_ago,
         "last_diaper_summary": last_diaper_summary,
-        "total_ml_today": round(total_ml_today, 1),
-        "total_feeds_today": total_feeds_today
-    })
+        "total_ml_today": round(totals["total_ml_today"], 1),
+        "total_feeds_today": totals["total_feeds_today"]
+    }
+    # The "minutes ago" fields change by the minute, so they are filled in per request
+    clock_fields = {
+        "last_feed_minutes_ago": last_feed_timestamp,
+        "last_diaper_minutes_ago": last_diaper_timestamp
+    }
+    return payload, clock_fields
+
+
+def count_feed(totals, feed):
+    """Add an entry to the total ml and feed count of summarize_feeds (only Bottle and Nurse)."""
+    if "Vitamin D" in feed["type"]:
+        return
+
+    # Only count Bottle and Nurse as "feeds"
+    if "Feed (Bottle" in feed["type"] or "Nurse" in feed["type"]:
+        totals["total_feeds_today"] += 1
+
+    # Only sum ml from Bottle feeds (baby's intake, not pump output)
+    if "Feed (Bottle" in feed["type"] and feed["amount_ml"]:
+        totals["total_ml_today"] += feed["amount_ml"]
+
+
+def run_idempotent(handler):
+    """
+    Run a write handler at most once per Idempotency-Key header (per feed file
+    and endpoint). A request repeating a key with the same body gets the first
+    response back, headers included, marked Idempotent-Replayed, instead of
+    writing again - also if it arrives while the first is still running. A key
+    reused with a different body gets a 422. Server errors aren't kept, so a
+    retry after one runs the write again.
+    """
+    key = request.headers.get("Idempotency-Key")
+    if not key:
+        return handler()
+    if len(key) > 255:
+        return jsonify({"success": False, "error": "Idempotency-Key is longer than 255 characters"}), 400
+
+    scoped_key = (get_excel_file(), request.path, key)
+    body_hash = hashlib.sha256(request.get_data()).hexdigest()
+
+    def run():
+        stored = idempotency_index.get(scoped_key)
+        if stored is not None:
+            return stored, True
+        response = app.make_response(handler())
+        headers = [(name, value) for name, value in response.headers if name != "Content-Length"]
+        stored = (body_hash, response.get_data(), response.status_code, headers)
+        if response.status_code < 500:
+            idempotency_index.put(scoped_key, stored)
+        return stored, False
+
+    stored = idempotency_index.get(scoped_key)
+    replayed = stored is not None
+    if stored is None:
+        (stored, replayed), shared = write_flight.do(scoped_key, run)
+        replayed = replayed or shared
+    stored_hash, body, status, headers = stored
+    if stored_hash != body_hash:
+        idempotency_index.count_conflict()
+        return jsonify({
+            "success": False,
+            "error": "Idempotency-Key was already used for a different request body"
+        }), 422
+    response = Response(body, status=status, headers=headers)
+    if replayed:
+        idempotency_index.count_replay()
+        response.headers["Idempotent-Replayed"] = "true"
+    return response
 
 
 @app.route("/api/feeds", methods=["POST"])
 def create_feed():
-    """Log a new feed entry."""
+    """Log a new feed entry. Send an Idempotency-Key header to make retries safe."""
+    return run_idempotent(save_feed)
+
+
+def save_feed():
     feed_data = request.json
 
     try:
@@ -391,6 +1309,170 @@ def create_feed():
         }), 500
 
 
+@app.route("/api/feeds/batch", methods=["POST"])
+def create_feeds_batch():
+    """
+    Log many feed entries with a single workbook save (offline replay,
+    imports). Send an Idempotency-Key header to make retries safe.
+    """
+    return run_idempotent(save_feeds_batch)
+
+
+def save_feeds_batch():
+    payload = request.json
+    items = payload.get("feeds") if isinstance(payload, dict) else payload
+
+    if not isinstance(items, list):
+        return jsonify({"success": False, "error": "Expected a list of feeds"}), 400
+    if len(items) > MAX_BATCH_SIZE:
+        return jsonify({
+            "success": False,
+            "error": f"At most {MAX_BATCH_SIZE} feeds per batch"
+        }), 413
+
+    # Validate everything first; only valid entries are written
+    results = []
+    valid = []
+    for index, item in enumerate(items):
+        error = validate_feed(item)
+        if error:
+            results.append({"index": index, "success": False, "error": error})
+        else:
+            results.append({"index": index, "success": True, "id": None})
+            valid.append(index)
+
+    if valid:
+        try:
+            feed_ids = add_feeds_to_excel([items[index] for index in valid])
+        except Exception as e:
+            return jsonify({
+                "success": False,
+                "error": str(e)
+            }), 500
+        for index, feed_id in zip(valid, feed_ids):
+            results[index]["id"] = feed_id
+
+    failed = len(items) - len(valid)
+    if not failed:
+        status = 201
+    elif valid:
+        status = 207  # Multi-Status: some entries were rejected
+    else:
+        status = 400
+
+    return jsonify({
+        "success": failed == 0,
+        "created": len(valid),
+        "failed": failed,
+        "results": results
+    }), status
+
+
+@app.route("/api/import", methods=["POST"])
+def import_feeds():
+    """Bulk-import an uploaded xlsx/CSV/JSON file. Streams progress as NDJSON lines."""
+    upload = request.files.get("file")
+    if upload is None:
+        return jsonify({"success": False, "error": "Upload a file in the 'file' field"}), 400
+
+    fmt = request.args.get("format") or importer.detect_format(upload.filename)
+    if fmt not in importer.FORMATS:
+        return jsonify({"success": False, "error": f"Unsupported import format: {fmt!r}"}), 400
+
+    # Spool to disk so the readers can stream it (and xlsx needs a seekable file)
+    with tempfile.NamedTemporaryFile(suffix="." + fmt, delete=False) as tmp:
+        upload.save(tmp)
+
+    def generate():
+        try:
+            for stats in import_feed_file(tmp.name, fmt):
+                yield json.dumps(stats) + "\n"
+        except Exception as e:
+            yield json.dumps({"error": str(e), "done": True}) + "\n"
+        finally:
+            os.unlink(tmp.name)
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
+def get_date_range_args():
+    """Read ?from= and ?to= (YYYY-MM-DD, either optional). Raises ValueError if malformed."""
+    min_date = request.args.get("from")
+    max_date = request.args.get("to")
+    for value in (min_date, max_date):
+        if value:
+            try:
+                datetime.strptime(value, "%Y-%m-%d")
+            except ValueError:
+                raise ValueError(f"Invalid date: {value!r} (use YYYY-MM-DD)")
+    return min_date, max_date
+
+
+@app.route("/api/export", methods=["GET"])
+def export_feeds():
+    """Download entries as CSV, NDJSON or xlsx (?format=, ?from=, ?to=), streamed in chunks."""
+    fmt = request.args.get("format", "csv")
+    if fmt not in exporter.FORMATS:
+        return jsonify({"success": False, "error": f"Unsupported export format: {fmt!r}"}), 400
+
+    try:
+        min_date, max_date = get_date_range_args()
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
+    filename = "_".join(filter(None, ["feeds", min_date, max_date])) + "." + fmt
+    return Response(
+        exporter.WRITERS[fmt](iter_feeds_snapshot(min_date, max_date)),
+        mimetype=exporter.FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@app.route("/api/analytics", methods=["GET"])
+def get_analytics():
+    """Per-day and per-hour-of-day totals plus feed interval percentiles (?from=, ?to=; default last 30 days), JSON or MessagePack."""
+    try:
+        min_date, max_date = get_date_range_args()
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
+    max_date = max_date or datetime.now().strftime("%Y-%m-%d")
+    min_date = min_date or (datetime.strptime(max_date, "%Y-%m-%d") - timedelta(days=29)).strftime("%Y-%m-%d")
+    days = (datetime.strptime(max_date, "%Y-%m-%d") - datetime.strptime(min_date, "%Y-%m-%d")).days + 1
+    if not 1 <= days <= analytics.MAX_DAYS:
+        return jsonify({"success": False, "error": f"Range must be 1 to {analytics.MAX_DAYS} days"}), 400
+
+    with get_file_lock():
+        columns = analytics_columns.get(get_excel_file(), get_feed_table())
+
+    if archive.reaches_archive(get_archive_dir(), min_date):
+        archived = [tuple(feed[field] for field in feed_schema.FIELDS)
+                    for feed in archive.iter_archived_feeds(get_archive_dir(), min_date=min_date, max_date=max_date)]
+        columns = columns.concat(analytics.Columns(archived))
+
+    return negotiated_response(analytics.compute(columns, min_date, max_date))
+
+
+@app.route("/api/report", methods=["GET"])
+def download_report():
+    """Formatted Excel report with a daily summary (?from=, ?to=), cached until the data changes."""
+    fmt = request.args.get("format", "xlsx")
+    if fmt not in reports.FORMATS:
+        return jsonify({"success": False, "error": f"Unsupported report format: {fmt!r}"}), 400
+    try:
+        min_date, max_date = get_date_range_args()
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
+    key = (get_excel_file(), get_data_version(), min_date, max_date, fmt)
+    path, cached = report_cache.get(key, lambda: iter_feeds_snapshot(min_date, max_date))
+
+    filename = "_".join(filter(None, ["feed_report", min_date, max_date])) + "." + fmt
+    response = send_file(path, mimetype=reports.FORMATS[fmt], as_attachment=True, download_name=filename)
+    response.headers["X-Report-Cache"] = "hit" if cached else "miss"
+    return response
+
+
 @app.route("/api/feeds/<int:feed_id>", methods=["DELETE"])
 def delete_feed(feed_id):
     """Delete a feed entry."""
@@ -417,18 +1499,40 @@ def update_feed(feed_id):
 @app.route("/api/vitamin-status", methods=["GET"])
 def get_vitamin_status():
     """Check if Vitamin D has been given today. Also lazily auto-logs missed doses."""
+    log_missed_vitamin_dose()
     today = datetime.now().strftime("%Y-%m-%d")
-    today_feeds = get_feeds_from_excel(today)
+    return jsonify(vitamin_status(get_feeds_from_excel(today)))
 
-    # Check today's vitamin status
-    vitamin_feed = None
+
+def vitamin_status(today_feeds):
+    """The GET /api/vitamin-status body for today's entries (in row order)."""
     for feed in today_feeds:
         if "Vitamin D" in feed["type"]:
-            vitamin_feed = feed
-            break
+            return {
+                "given_today": True,
+                "vitamin_feed_id": feed["id"],
+                "time_given": feed["time"]
+            }
+    return {
+        "given_today": False,
+        "vitamin_feed_id": None,
+        "time_given": None
+    }
 
-    # Lazy missed-dose check: did yesterday have a vitamin entry?
+
+def log_missed_vitamin_dose():
+    """
+    Lazy missed-dose check: if yesterday had feeds but no vitamin, log a
+    missed dose. The outcome only depends on the data and the date, so the
+    check is skipped while neither has changed since it last ran.
+    """
+    if follower is not None:
+        return
+    scope = get_excel_file()
     yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
+    if missed_dose_checks.get(scope) == (get_data_version(), yesterday):
+        return
+
     yesterday_feeds = get_feeds_from_excel(yesterday)
     has_yesterday_vitamin = any("Vitamin D" in f["type"] for f in yesterday_feeds)
 
@@ -446,23 +1550,16 @@ def get_vitamin_status():
         }
         add_feed_to_excel(missed_data)
 
-    if vitamin_feed:
-        return jsonify({
-            "given_today": True,
-            "vitamin_feed_id": vitamin_feed["id"],
-            "time_given": vitamin_feed["time"]
-        })
-    else:
-        return jsonify({
-            "given_today": False,
-            "vitamin_feed_id": None,
-            "time_given": None
-        })
+    missed_dose_checks[scope] = (get_data_version(), yesterday)
 
 
 @app.route("/api/vitamin", methods=["POST"])
 def log_vitamin():
-    """Log Vitamin D administration."""
+    """Log Vitamin D administration. Send an Idempotency-Key header to make retries safe."""
+    return run_idempotent(save_vitamin)
+
+
+def save_vitamin():
     data = request.json or {}
 
     feed_data = {
@@ -491,10 +1588,50 @@ def log_vitamin():
 
 @app.route("/api/stats", methods=["GET"])
 def get_stats():
-    """Get summary statistics."""
+    """Get summary statistics: today's, or over a rolling ?window=24h (6h, 90m, 7d, ...)."""
+    window = request.args.get("window")
+    if window:
+        try:
+            window_seconds = rolling_stats.parse_window(window)
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+        return jsonify(build_window_stats_payload(window, window_seconds))
+    return cached_json_response(("stats",), build_stats_payload)
+
+
+def build_window_stats_payload(window, window_seconds):
+    """Totals for the rolling window ending now, from the table's time index and the archive."""
+    now = time.time()
+    archive_dir = get_archive_dir()
+    # A day's margin covers timestamps whose offset puts them before the start's local date
+    start_date = datetime.fromtimestamp(now - window_seconds - 24 * 3600).strftime("%Y-%m-%d")
+    archived = None
+    if archive.reaches_archive(archive_dir, start_date):
+        def archived(start_epoch):
+            for feed in archive.iter_archived_feeds(archive_dir, min_date=start_date):
+                epoch = timestamp_epoch(feed["timestamp"])
+                if epoch is not None and epoch > start_epoch:
+                    yield epoch, (feed["date"], feed["time"], feed["type"], feed["amount_ml"],
+                                  feed["duration_min"], feed["notes"], feed["logged_by"], feed["timestamp"])
+
+    with get_file_lock():
+        totals = window_stats.get(get_excel_file(), window_seconds, get_feed_table(), now, archived)
+    return {
+        "window": window,
+        "from": datetime.fromtimestamp(now - window_seconds).isoformat(timespec="seconds"),
+        "to": datetime.fromtimestamp(now).isoformat(timespec="seconds"),
+        "totals": totals
+    }
+
+
+def build_stats_payload():
+    """The GET /api/stats response body: today's totals."""
     today = datetime.now().strftime("%Y-%m-%d")
-    feeds = get_feeds_from_excel(today)
+    return {"today": day_totals(get_feeds_from_excel(today))}
+
 
+def day_totals(feeds):
+    """Totals over one day's entries, as in the "today" object of GET /api/stats."""
     total_ml = 0
     total_feeds = 0
     nursing_sessions = 0
@@ -538,27 +1675,180 @@ def get_stats():
             intervals.append(interval)
         avg_interval = int(sum(intervals) / len(intervals))
 
+    return {
+        "total_ml": round(total_ml, 1),
+        "total_feeds": total_feeds,
+        "total_nursing_sessions": nursing_sessions,
+        "total_pump_ml": round(pump_ml, 1),
+        "avg_feed_interval_min": avg_interval,
+        "total_diaper_changes": diaper_changes
+    }
+
+
+@app.route("/api/changes", methods=["GET"])
+def get_changes():
+    """Change log for followers: journal records after ?after=<seq>, or all rows to resync (JSON or MessagePack)."""
+    after_seq = request.args.get("after", type=int)
+    with get_file_lock():
+        changes = follower_mod.changes_since(get_feed_table(), after_seq)
+    return negotiated_response(changes)
+
+
+@app.route("/api/replication", methods=["GET"])
+def get_replication_status():
+    """Role of this instance and, on a follower, how far behind the primary it is."""
+    if follower is not None:
+        return jsonify(follower.status())
+    return jsonify({"role": "primary", "seq": get_data_version()})
+
+
+@app.route("/api/metrics", methods=["GET"])
+def get_metrics():
+    """Counters for the read caches (serialized responses, computations shared between concurrent requests, reports) and replayed writes."""
     return jsonify({
-        "today": {
-            "total_ml": round(total_ml, 1),
-            "total_feeds": total_feeds,
-            "total_nursing_sessions": nursing_sessions,
-            "total_pump_ml": round(pump_ml, 1),
-            "avg_feed_interval_min": avg_interval,
-            "total_diaper_changes": diaper_changes
-        }
+        "response_cache": response_cache.stats(),
+        "coalescing": read_flight.stats(),
+        "report_cache": {"hits": report_cache.hits, "misses": report_cache.misses},
+        "idempotency": idempotency_index.stats()
     })
 
 
-if __name__ == "__main__":
-    # Initialize Excel file
+def start_follower(source):
+    """Switch this instance to a read-only follower of source and start tailing it."""
+    global follower
+    follower = follower_mod.Follower(source, lock=get_file_lock(),
+                                     on_resync=lambda: forget_data_versions(app.config['FEED_FILE']))
+    follower.poll()
+    follower.start()
+    return follower
+
+
+@app.cli.command("archive")
+@click.option("--before", "cutoff_date", help="Archive entries dated before YYYY-MM-DD.")
+@click.option("--after-days", type=int, help="Archive whole years older than this many days.")
+def archive_command(cutoff_date, after_days):
+    """Move old entries from the workbook into the compressed archive."""
+    if not cutoff_date:
+        cutoff_date = archive_cutoff(after_days or app.config['ARCHIVE_AFTER_DAYS'] or 365)
+    moved = archive_feeds_before(cutoff_date)
+    print(f"✓ Archived {moved} entries before {cutoff_date} to {get_archive_dir()}")
+
+
+@app.cli.command("create-tenant")
+@click.argument("key")
+def create_tenant_command(key):
+    """Create a tenant's empty workbook ahead of its first entry."""
+    if not tenants.is_valid_tenant(key):
+        raise click.ClickException("Tenant keys are 1-64 letters, digits, '-' or '_'")
+    with app.test_request_context():
+        g.tenant = key
+        create_tenant_workbook()
+        print(f"✓ Tenant {key} uses {get_excel_file()}")
+
+
+@app.cli.command("import-feeds")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--format", "fmt", type=click.Choice(importer.FORMATS), help="Defaults to the file extension.")
+@click.option("--batch-size", type=int, default=IMPORT_BATCH_SIZE, show_default=True)
+def import_command(path, fmt, batch_size):
+    """Import entries from an xlsx/CSV/JSON/NDJSON file, skipping ones already logged."""
+    init_excel_file()
+    for stats in import_feed_file(path, fmt, batch_size):
+        print(f"  read {stats['read']}, imported {stats['imported']}, "
+              f"skipped {stats['skipped']} duplicates, {stats['errors']} errors")
+    print(f"✓ Import finished into {get_excel_file()}")
+
+
+def backup_feeds(full=False):
+    """Back up the current feed table (a base snapshot or just the changes since the last run)."""
+    with get_file_lock():
+        return backup.run_backup(get_feed_table(), get_backup_dir(), full=full)
+
+
+def restore_feeds(as_of, output):
+    """Write the feed log as it was at as_of (a datetime) to a new workbook at output."""
+    rows = backup.restore_rows(get_backup_dir(), as_of.timestamp())
+    wb = new_feed_workbook()
+    ws = wb.active
+    for row in rows:
+        ws.append(list(row))
+    wb.save(output)
+    return len(rows)
+
+
+def nightly_backups(hour):
+    """Run backup_feeds once a day at the given local hour (background thread)."""
+    while True:
+        now = datetime.now()
+        next_run = now.replace(hour=hour, minute=0, second=0, microsecond=0)
+        if next_run <= now:
+            next_run += timedelta(days=1)
+        time.sleep((next_run - now).total_seconds())
+        try:
+            stats = backup_feeds()
+            print(f"✓ Nightly backup: {stats['kind']}, {stats['records']} records, {stats['bytes']} bytes")
+        except Exception as e:
+            print(f"Nightly backup failed: {e}")
+
+
+@app.cli.command("backup")
+@click.option("--full", is_flag=True, help="Take a new base snapshot even if one isn't due.")
+def backup_command(full):
+    """Back up the feed log incrementally."""
     init_excel_file()
+    stats = backup_feeds(full)
+    if stats["kind"] == "none":
+        print(f"✓ Nothing changed since the last backup in {get_backup_dir()}")
+    else:
+        print(f"✓ Wrote {stats['kind']} backup {stats['file']} "
+              f"({stats['records']} records, {stats['bytes']} bytes) to {get_backup_dir()}")
+
+
+@app.cli.command("restore")
+@click.option("--as-of", "as_of", required=True, help="ISO timestamp to restore to, e.g. 2026-02-12T18:00.")
+@click.option("--output", type=click.Path(dir_okay=False), help="Workbook to write (never the live feed file).")
+def restore_command(as_of, output):
+    """Rebuild the feed log as of a point in time into a new workbook."""
+    when = parse_iso_timestamp(as_of)
+    if not output:
+        base, _ = os.path.splitext(get_excel_file())
+        output = f"{base}_restored_{when.strftime('%Y%m%dT%H%M%S')}.xlsx"
+    try:
+        count = restore_feeds(when, output)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    print(f"✓ Restored {count} entries as of {as_of} to {output}")
+
+
+if __name__ == "__main__":
+    if app.config['FOLLOW']:
+        # Mirror another instance instead of owning a workbook
+        start_follower(app.config['FOLLOW'])
+        print(f"✓ Following {app.config['FOLLOW']} (read-only)")
+    else:
+        # Initialize Excel file
+        init_excel_file()
+
+        # Move closed years out of the hot workbook
+        if app.config['ARCHIVE_AFTER_DAYS']:
+            moved = archive_feeds_before(archive_cutoff(app.config['ARCHIVE_AFTER_DAYS']))
+            if moved:
+                print(f"✓ Archived {moved} old entries to {get_archive_dir()}")
+
+        # Load the in-memory table from its snapshot + journal, and snapshot it again on exit
+        warm_feed_table()
+        atexit.register(save_feed_snapshots)
+
+        if app.config['NIGHTLY_BACKUP_HOUR'] is not None:
+            threading.Thread(target=nightly_backups, args=(app.config['NIGHTLY_BACKUP_HOUR'],), daemon=True).start()
+
+    atexit.register(report_cache.close)
 
     # Get local IP
     local_ip = get_local_ip()
 
-    # Port configuration
-    PORT = 8080  # Using 8080 to avoid firewall/AirPlay conflicts on port 5000
+    # Port configuration (PORT lets a follower run next to the primary on one machine)
+    PORT = int(os.environ.get("PORT", 8080))  # Using 8080 to avoid firewall/AirPlay conflicts on port 5000
 
     print("\n" + "="*60)
     print("🍼 Baby Feed Tracker")
@@ -567,7 +1857,8 @@ if __name__ == "__main__":
     print(f"   http://{local_ip}:{PORT}")
     print(f"\n💻 Or on this computer:")
     print(f"   http://localhost:{PORT}")
-    print(f"\n📊 Data saved to: {os.path.abspath(get_excel_file())}")
+    if follower is None:
+        print(f"\n📊 Data saved to: {os.path.abspath(get_excel_file())}")
     print("\nPress Ctrl+C to stop\n")
     print("="*60 + "\n")
 
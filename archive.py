@@ -0,0 +1,246 @@
+"""
+Cold-tier archive for old feed entries.
+
+Entries older than a cutoff are moved out of feeds.xlsx into gzip-compressed
+JSON-lines segments that are written once and never modified. A small
+index.json records the date range and totals of every segment, so reads can
+skip segments that don't overlap the requested range.
+"""
+
+import gzip
+import heapq
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from feed_schema import FIELDS
+
+INDEX_FILE = "index.json"
+
+# Parsed index per archive directory, keyed by index.json mtime
+_index_cache = {}
+_index_lock = threading.Lock()
+
+# Decompressed rows of recently read segments (segments never change), for paging
+_segment_cache = OrderedDict()
+_segment_cache_lock = threading.Lock()
+SEGMENT_CACHE_SIZE = 4
+
+
+def archive_dir_for(feed_file):
+    """Default archive directory: sits next to the feed file (feeds.xlsx -> feeds_archive/)."""
+    base, _ = os.path.splitext(feed_file)
+    return base + "_archive"
+
+
+def load_index(archive_dir):
+    """Return the archive index, or an empty one if nothing has been archived yet."""
+    path = os.path.join(archive_dir, INDEX_FILE)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return {"archived_before": None, "segments": []}
+
+    with _index_lock:
+        cached = _index_cache.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        with open(path, encoding="utf-8") as f:
+            index = json.load(f)
+        _index_cache[path] = (mtime, index)
+        return index
+
+
+def reaches_archive(archive_dir, start_date):
+    """True if a range starting at start_date (None = everything) needs archived entries."""
+    archived_before = load_index(archive_dir)["archived_before"]
+    if not archived_before:
+        return False
+    return start_date is None or start_date < archived_before
+
+
+def summarize(rows):
+    """Build the index summary for a list of archived rows."""
+    dates = [r["date"] for r in rows]
+    summary = {
+        "count": len(rows),
+        "first_date": min(dates),
+        "last_date": max(dates),
+        "total_bottle_ml": 0,
+        "total_feeds": 0,
+        "total_pump_ml": 0,
+        "total_diaper_changes": 0,
+    }
+    for row in rows:
+        type_str = row["type"] or ""
+        if "Feed (Bottle" in type_str or "Nurse" in type_str:
+            summary["total_feeds"] += 1
+        if "Feed (Bottle" in type_str and row["amount_ml"]:
+            summary["total_bottle_ml"] += row["amount_ml"]
+        if "Pump" in type_str and row["amount_ml"]:
+            summary["total_pump_ml"] += row["amount_ml"]
+        if "Diaper" in type_str:
+            summary["total_diaper_changes"] += 1
+    summary["total_bottle_ml"] = round(summary["total_bottle_ml"], 1)
+    summary["total_pump_ml"] = round(summary["total_pump_ml"], 1)
+    return summary
+
+
+def _write_atomic(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def write_segments(archive_dir, rows, cutoff_date):
+    """
+    Write rows (dicts with FIELDS) as new segments, one per year, and
+    record them in the index. Existing segments are never touched; archiving
+    more entries for a year that already has a segment adds another one.
+    """
+    os.makedirs(archive_dir, exist_ok=True)
+    index = dict(load_index(archive_dir))
+    segments = list(index["segments"])
+
+    by_year = {}
+    for row in rows:
+        by_year.setdefault(row["date"][:4], []).append(row)
+
+    for year in sorted(by_year):
+        year_rows = sorted(by_year[year], key=lambda r: r["timestamp"] or "")
+        seq = sum(1 for s in segments if s["year"] == year) + 1
+        filename = f"feeds-{year}-{seq:03d}.jsonl.gz"
+
+        body = "".join(
+            json.dumps({k: r[k] for k in FIELDS}, ensure_ascii=False) + "\n"
+            for r in year_rows
+        )
+        path = os.path.join(archive_dir, filename)
+        _write_atomic(path, gzip.compress(body.encode("utf-8")))
+        os.chmod(path, 0o444)
+
+        segment = {"file": filename, "year": year}
+        segment.update(summarize(year_rows))
+        segments.append(segment)
+
+    previous = index.get("archived_before")
+    index["archived_before"] = max(previous, cutoff_date) if previous else cutoff_date
+    index["segments"] = segments
+    _write_atomic(
+        os.path.join(archive_dir, INDEX_FILE),
+        json.dumps(index, indent=2).encode("utf-8")
+    )
+    return len(by_year)
+
+
+def iter_archived_feeds(archive_dir, date_filter=None, min_date=None, max_date=None):
+    """
+    Yield archived entries for a date or date range, in the same shape as the
+    hot tier, reading only the segments that overlap the range.
+    """
+    index = load_index(archive_dir)
+    start = date_filter or min_date
+    end = date_filter or max_date
+
+    for segment in index["segments"]:
+        if start and segment["last_date"] < start:
+            continue
+        if end and segment["first_date"] > end:
+            continue
+
+        with gzip.open(os.path.join(archive_dir, segment["file"]), "rt", encoding="utf-8") as f:
+            for line in f:
+                row = json.loads(line)
+                if date_filter and row["date"] != date_filter:
+                    continue
+                if min_date and row["date"] < min_date:
+                    continue
+                if max_date and row["date"] > max_date:
+                    continue
+
+                row["notes"] = row["notes"] or ""
+                row["logged_by"] = row["logged_by"] or ""
+                row["id"] = None  # Archived entries are read-only
+                row["archived"] = True
+                yield row
+
+
+def read_archived_feeds(archive_dir, date_filter=None, min_date=None, max_date=None):
+    """Archived entries for a date or date range, as a list."""
+    return list(iter_archived_feeds(archive_dir, date_filter, min_date, max_date))
+
+
+def _segment_rows(path):
+    """All rows of one segment, oldest first, through a small LRU cache."""
+    with _segment_cache_lock:
+        rows = _segment_cache.get(path)
+        if rows is not None:
+            _segment_cache.move_to_end(path)
+            return rows
+
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f]
+    rows.sort(key=_row_key)
+
+    with _segment_cache_lock:
+        _segment_cache[path] = rows
+        while len(_segment_cache) > SEGMENT_CACHE_SIZE:
+            _segment_cache.popitem(last=False)
+    return rows
+
+
+def _row_key(row):
+    return (row["date"], row["timestamp"] or "")
+
+
+class _Newest:
+    """Heap key that pops the newest entry first."""
+    __slots__ = ("key",)
+
+    def __init__(self, key):
+        self.key = key
+
+    def __lt__(self, other):
+        return self.key > other.key
+
+
+def iter_archived_before(archive_dir, before_date=None):
+    """
+    Yield archived entries dated before before_date (None = all), newest
+    first. Segments are opened one at a time, newest first, and only once the
+    entries already open can no longer be newer than what the next segment
+    holds, so a caller that stops early reads only the segments it reached.
+    """
+    segments = [s for s in load_index(archive_dir)["segments"]
+                if not before_date or s["first_date"] < before_date]
+    segments.sort(key=lambda s: (s["last_date"], s["file"]), reverse=True)
+    heap = []
+
+    def open_segment(segment):
+        rows = _segment_rows(os.path.join(archive_dir, segment["file"]))
+        newest_first = (row for row in reversed(rows) if not before_date or row["date"] < before_date)
+        push(next(newest_first, None), newest_first)
+
+    def push(row, rest):
+        if row is not None:
+            heapq.heappush(heap, (_Newest(_row_key(row)), id(rest), row, rest))
+
+    while heap or segments:
+        while segments and (not heap or segments[0]["last_date"] >= heap[0][2]["date"]):
+            open_segment(segments.pop(0))
+        if not heap:
+            break
+        _, _, row, rest = heapq.heappop(heap)
+        push(next(rest, None), rest)
+
+        feed = dict(row)
+        feed["notes"] = feed["notes"] or ""
+        feed["logged_by"] = feed["logged_by"] or ""
+        feed["id"] = None  # Archived entries are read-only
+        feed["archived"] = True
+        yield feed
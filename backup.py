@@ -0,0 +1,153 @@
+"""
+Incremental backups with point-in-time restore.
+
+A backup directory holds a base snapshot (the feed table's struct-packed
+snapshot, gzip-compressed) taken every few days, plus one compressed segment
+of journal records per backup run in between. Each run only reads and writes
+the journal records since the previous run, so nightly backup I/O scales
+with that day's changes rather than the whole history.
+
+While backups are enabled the feed table seals its journal on compaction
+(feeds.journal.<seq>) instead of truncating it; a run consumes the sealed
+files and deletes them once they are safely in a segment. If records are
+missing (the workbook was edited by hand, entries were archived, or the
+journal was lost) the run takes a new base instead.
+
+Restoring replays the newest base taken at or before the requested time plus
+every later record written at or before it.
+"""
+
+import glob
+import gzip
+import json
+import os
+import time
+from datetime import datetime
+
+from feed_table import FeedTable, decode_snapshot, encode_snapshot, journal_path_for, read_journal
+
+MANIFEST_FILE = "manifest.json"
+
+# Take a fresh base snapshot at least this often
+FULL_EVERY_DAYS = 7
+
+
+def backup_dir_for(feed_file):
+    """Default backup directory: sits next to the feed file (feeds.xlsx -> feeds_backups/)."""
+    return os.path.splitext(feed_file)[0] + "_backups"
+
+
+def load_manifest(backup_dir):
+    try:
+        with open(os.path.join(backup_dir, MANIFEST_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"entries": []}
+
+
+def _write_atomic(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _save_manifest(backup_dir, manifest):
+    _write_atomic(os.path.join(backup_dir, MANIFEST_FILE), json.dumps(manifest, indent=2).encode("utf-8"))
+
+
+def sealed_journals(feed_file):
+    """Journals sealed by compaction, oldest first."""
+    return sorted(glob.glob(glob.escape(journal_path_for(feed_file)) + ".*"))
+
+
+def pending_records(feed_file, after_seq):
+    """Journal records with seq > after_seq, from sealed journals and the live one."""
+    records = []
+    for path in sealed_journals(feed_file) + [journal_path_for(feed_file)]:
+        records.extend(read_journal(path, after_seq))
+    return records
+
+
+def run_backup(table, backup_dir, full=False, now=None):
+    """
+    Back up a feed table (caller holds its lock). Writes a base snapshot when
+    due or when the journal can't bridge the gap, otherwise an incremental
+    segment. Returns a summary dict.
+    """
+    now = now if now is not None else time.time()
+    os.makedirs(backup_dir, exist_ok=True)
+    table.retain_journal = True
+
+    manifest = load_manifest(backup_dir)
+    entries = manifest["entries"]
+    bases = [e for e in entries if e["kind"] == "base"]
+    last_seq = entries[-1]["to_seq"] if entries else None
+
+    if last_seq == table.seq and not full:
+        return {"kind": "none", "records": 0, "bytes": 0}
+
+    records = []
+    need_base = full or not bases or now - bases[-1]["at"] >= FULL_EVERY_DAYS * 86400
+    if not need_base:
+        # A seq behind the last backup (the table was rebuilt from the workbook
+        # without its snapshot) can't be bridged by any journal
+        records = pending_records(table.path, last_seq) if last_seq < table.seq else []
+        contiguous = [r["seq"] for r in records] == list(range(last_seq + 1, table.seq + 1))
+        need_base = not records or not contiguous
+
+    stamp = datetime.fromtimestamp(now).strftime("%Y%m%dT%H%M%S")
+    if need_base:
+        data = gzip.compress(encode_snapshot(table.rows, table.seq, table.fingerprint))
+        filename = f"base-{table.seq:012d}-{stamp}.snap.gz"
+        entry = {"kind": "base", "file": filename, "to_seq": table.seq, "at": now}
+        count = len(table.rows)
+    else:
+        body = "".join(json.dumps(r, ensure_ascii=False, default=str) + "\n" for r in records)
+        data = gzip.compress(body.encode("utf-8"))
+        filename = f"incr-{records[0]['seq']:012d}-{table.seq:012d}-{stamp}.jsonl.gz"
+        entry = {"kind": "incremental", "file": filename, "from_seq": records[0]["seq"],
+                 "to_seq": table.seq, "first_at": records[0]["at"], "at": records[-1]["at"]}
+        count = len(records)
+
+    _write_atomic(os.path.join(backup_dir, filename), data)
+    entries.append(entry)
+    _save_manifest(backup_dir, manifest)
+
+    # Everything sealed so far is now covered by this backup
+    for path in sealed_journals(table.path):
+        os.remove(path)
+
+    return {"kind": entry["kind"], "file": filename, "records": count, "bytes": len(data)}
+
+
+def restore_rows(backup_dir, as_of):
+    """
+    Rebuild the table rows as they were at as_of (epoch seconds).
+    Raises ValueError if no base snapshot is that old.
+    """
+    entries = load_manifest(backup_dir)["entries"]
+    base_index = None
+    for i, entry in enumerate(entries):
+        if entry["kind"] == "base" and entry["at"] <= as_of:
+            base_index = i
+    if base_index is None:
+        raise ValueError("No backup exists from before that time")
+
+    base = entries[base_index]
+    with open(os.path.join(backup_dir, base["file"]), "rb") as f:
+        rows, _, _ = decode_snapshot(gzip.decompress(f.read()))
+
+    table = FeedTable(None, rows, seq=base["to_seq"])
+    for entry in entries[base_index + 1:]:
+        if entry["kind"] == "base" or entry["first_at"] > as_of:
+            break
+        with gzip.open(os.path.join(backup_dir, entry["file"]), "rt", encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                if record["at"] > as_of:
+                    return table.rows
+                table._apply(record)
+    return table.rows
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+/api/analytics: NumPy over columnar arrays vs a pure-Python loop over entry dicts.
+
+Seeds a workbook with a year of entries (about 14 a day), checks that both
+implementations give identical results, then times each for a 30-day and a
+full-year range. Usage:
+
+    python benchmarks/bench_analytics.py [DAYS]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from openpyxl import load_workbook
+
+import analytics
+import app as app_module
+
+REPEAT = 5
+PER_DAY = [("bottle", "milk", 90), ("nurse", "left", None), ("diaper", "pee", None), ("bottle", "formula", 120),
+           ("pump", "both", 150), ("nurse", "right", None), ("diaper", "poop", None)]
+
+
+def seed_workbook(path, days):
+    app_module.app.config['FEED_FILE'] = path
+    app_module.init_excel_file()
+    wb = load_workbook(path)
+    ws = wb.active
+    start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days)
+    count = 0
+    for day in range(days):
+        for slot in range(2):
+            for i, (feed_type, side, amount) in enumerate(PER_DAY):
+                ts = (start + timedelta(days=day, minutes=slot * 720 + i * 97 + (day * 13) % 40)).astimezone(None)
+                ws.append([ts.strftime("%Y-%m-%d"), ts.strftime("%I:%M %p"),
+                           app_module.format_feed_type(feed_type, side), amount,
+                           12 if feed_type == "nurse" else None, "", "Mom", ts.isoformat()])
+                count += 1
+    wb.save(path)
+    return count
+
+
+def reference(feeds, start_date, end_date):
+    """Straightforward Python: one loop over the /api/feeds dicts, like get_stats."""
+    first = datetime.strptime(start_date, "%Y-%m-%d")
+    span = (datetime.strptime(end_date, "%Y-%m-%d") - first).days + 1
+    days = [(first + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(span)]
+    position = {d: i for i, d in enumerate(days)}
+    per_day = {m: [0] * span for m in analytics.METRICS}
+    per_hour = {m: [0] * 24 for m in analytics.METRICS}
+    feed_times = []
+
+    for feed in feeds:
+        if feed["date"] not in position:
+            continue
+        type_str = feed["type"] or ""
+        hour = int(feed["timestamp"][11:13])
+        amount = feed["amount_ml"] or 0
+        for table, index in ((per_day, position[feed["date"]]), (per_hour, hour)):
+            if "Feed (Bottle" in type_str:
+                table["intake_ml"][index] += amount
+            if "Feed (Bottle" in type_str or "Nurse" in type_str:
+                table["feeds"][index] += 1
+            elif "Pump" in type_str:
+                table["pump_ml"][index] += amount
+            elif "Diaper" in type_str:
+                table["diapers"][index] += 1
+        if "Feed (Bottle" in type_str or "Nurse" in type_str:
+            feed_times.append(datetime.fromisoformat(feed["timestamp"]).timestamp())
+
+    for table in (per_day, per_hour):
+        for m in ("intake_ml", "pump_ml"):
+            table[m] = [round(float(v), 1) for v in table[m]]
+
+    feed_times.sort()
+    gaps = [(b - a) / 60 for a, b in zip(feed_times, feed_times[1:])]
+    intervals = {f"p{p}": round(float(v), 1) for p, v in zip(analytics.PERCENTILES, np.percentile(gaps, analytics.PERCENTILES))}
+    intervals["count"] = len(gaps)
+
+    return {"from": start_date, "to": end_date, "days": days, "per_day": per_day,
+            "per_hour": per_hour, "intervals_min": intervals}
+
+
+def timed(fn):
+    """Best-of-REPEAT wall time in milliseconds."""
+    best = float("inf")
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main():
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 365
+    with tempfile.TemporaryDirectory() as workdir:
+        count = seed_workbook(os.path.join(workdir, "feeds.xlsx"), days)
+        with app_module.get_file_lock():
+            table = app_module.get_feed_table()
+        feeds = table.select()
+        columns = analytics.Columns(table.rows)
+        today = datetime.now().strftime("%Y-%m-%d")
+
+        print(f"{count} entries over {days} days")
+        print(f"{'range':>8} {'numpy':>10} {'python':>10} {'speedup':>8}   (ms, best of {REPEAT}; columns built once in "
+              f"{timed(lambda: analytics.Columns(table.rows)):.1f} ms)")
+        for span in (30, days):
+            start = (datetime.now() - timedelta(days=span - 1)).strftime("%Y-%m-%d")
+            fast = analytics.compute(columns, start, today)
+            slow = reference(feeds, start, today)
+            assert fast == slow, f"results differ for {span} days"
+
+            numpy_ms = timed(lambda: analytics.compute(columns, start, today))
+            python_ms = timed(lambda: reference(feeds, start, today))
+            print(f"{span:>7}d {numpy_ms:>10.3f} {python_ms:>10.3f} {python_ms / numpy_ms:>7.1f}x")
+        print("✓ NumPy and reference results identical")
+
+
+if __name__ == "__main__":
+    main()
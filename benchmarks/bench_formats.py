@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+JSON vs MessagePack bodies of GET /api/feeds?limit_days=N and the full
+GET /api/changes resync a follower does.
+
+Seeds the same history as bench_payload.py and, for each body, prints its
+size (plain and gzipped) and the best of REPEAT times to encode it on the
+server and decode it again in Python. MessagePack entries are the compact
+ones (type codes, epoch timestamps). Encoding is timed from the built
+payload, so it is the serialization alone. Usage:
+
+    python benchmarks/bench_formats.py [DAYS ...]
+"""
+
+import contextlib
+import gzip
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import app as app_module
+import fast_json
+import follower as follower_mod
+import msgpack_format
+from bench_payload import HISTORY_DAYS, make_feeds
+
+REPEAT = 5
+
+VARIANTS = [
+    ("rows", ""),
+    ("charts", "&fields=date,type,amount_ml,timestamp&shape=columns"),
+]
+
+
+def best_time(fn):
+    best = float("inf")
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def measure(label, payload, packed_payload):
+    """Print one line per format for a payload (and its MessagePack form)."""
+    app = app_module.app
+    for name, encode, decode, obj in (
+        ("json", app.json.dumpb, json.loads, payload),
+        ("msgpack", msgpack_format.packb, msgpack_format.unpackb, packed_payload),
+    ):
+        body = encode(obj)
+        print(f"{label:>14} {name:>8} {len(body):>10} {len(gzip.compress(body, 6)):>10}"
+              f" {best_time(lambda: encode(obj)):>10.1f} {best_time(lambda: decode(body)):>10.1f}")
+
+
+def main():
+    views = [int(arg) for arg in sys.argv[1:]] or [7, 30, 90]
+    print(f"JSON: {'orjson' if fast_json.orjson else 'json'}; "
+          f"MessagePack: {'msgpack' if msgpack_format.msgpack else 'pure Python'}")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        app = app_module.app
+        app.config['FEED_FILE'] = os.path.join(workdir, "feeds.xlsx")
+        with app.test_request_context(), contextlib.redirect_stdout(io.StringIO()):
+            app_module.init_excel_file()
+            app_module.add_feeds_to_excel(list(make_feeds(HISTORY_DAYS)))
+
+        print(f"{'body':>14} {'format':>8} {'bytes':>10} {'gzip':>10} {'encode ms':>10} {'decode ms':>10}")
+        for days in views:
+            for name, query in VARIANTS:
+                with app.test_request_context(f"/api/feeds?limit_days={days}{query}"):
+                    shape = app_module.parse_feed_shape(app_module.request.args)
+                    built = app_module.shaped_feeds(lambda: app_module.build_feeds_payload(days), shape)()
+                payload = built[0]
+                measure(f"{days}d {name}", payload, msgpack_format.compact_entries(payload))
+
+        with app.test_request_context():
+            changes = follower_mod.changes_since(app_module.get_feed_table(), None)
+        measure("changes", changes, changes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Response sizes of GET /api/feeds?limit_days=N for the 7, 30 and 90 day views.
+
+Seeds ENTRIES_PER_DAY entries a day (bottles, nursing, diapers, pumping,
+vitamin D) and prints the body size of each view as it used to be sent (all
+fields, one object per entry, uncompressed) and with the options added since:
+gzip/brotli compression, ?shape=columns, and the chart worker's
+?fields=date,type,amount_ml,timestamp&shape=columns. Usage:
+
+    python benchmarks/bench_payload.py [DAYS ...]
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import app as app_module
+import static_assets
+
+ENTRIES_PER_DAY = 16
+HISTORY_DAYS = 100
+
+VARIANTS = [
+    ("rows", ""),
+    ("columns", "&shape=columns"),
+    ("charts", "&fields=date,type,amount_ml,timestamp&shape=columns"),
+]
+
+
+def make_feeds(days):
+    kinds = [
+        ("bottle", "formula", 120, None), ("nurse", "left", None, 15), ("diaper", "pee", None, None),
+        ("bottle", "milk", 90, None), ("pump", "both", 140, 20), ("diaper", "poop", None, None),
+        ("nurse", "right", None, 12), ("bottle", "formula", 110, None),
+    ]
+    start = datetime.now() - timedelta(days=days)
+    step = timedelta(days=1) / ENTRIES_PER_DAY
+    for i in range(days * ENTRIES_PER_DAY):
+        feed_type, side, amount, duration = kinds[i % len(kinds)]
+        if i % ENTRIES_PER_DAY == 0:
+            feed_type, side, amount, duration = "vitamin_d", None, None, None
+        yield {
+            "type": feed_type,
+            "side": side,
+            "amount_ml": amount,
+            "duration_min": duration,
+            "notes": "fussy" if i % 11 == 0 else "",
+            "logged_by": "Mom" if i % 3 else "Dad",
+            "timestamp": (start + step * i).isoformat(timespec="seconds")
+        }
+
+
+def size(client, url, encoding=None):
+    headers = {"Accept-Encoding": encoding} if encoding else {}
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200
+    assert response.headers.get("Content-Encoding") == encoding
+    return len(response.get_data())
+
+
+def main():
+    views = [int(arg) for arg in sys.argv[1:]] or [7, 30, 90]
+    encodings = [None] + list(reversed(static_assets.available_encodings()))
+
+    with tempfile.TemporaryDirectory() as workdir:
+        app = app_module.app
+        app.config['FEED_FILE'] = os.path.join(workdir, "feeds.xlsx")
+        with app.test_request_context(), contextlib.redirect_stdout(io.StringIO()):
+            app_module.init_excel_file()
+            app_module.add_feeds_to_excel(list(make_feeds(HISTORY_DAYS)))
+        client = app.test_client()
+
+        header = f"{'days':>5} {'entries':>8} {'shape':>8}" + "".join(f"{e or 'identity':>10}" for e in encodings)
+        print(header + "   (bytes)")
+        for days in views:
+            url = f"/api/feeds?limit_days={days}"
+            entries = len(client.get(url).get_json()["feeds"])
+            for name, query in VARIANTS:
+                sizes = "".join(f"{size(client, url + query, e):>10}" for e in encodings)
+                print(f"{days:>5} {entries:>8} {name:>8}{sizes}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Head-to-head benchmark: feeds.xlsx workbook vs the memory-mapped event log.
+
+Seeds both stores with N entries (one every ~2.5 hours), then times the
+operations the API performs: appending "now", reading the 7-day history,
+updating and deleting an entry. Usage:
+
+    python benchmarks/bench_storage.py [N ...]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from openpyxl import load_workbook
+
+import app as app_module
+from event_log import EventLogStore
+
+REPEAT = 5
+
+
+def make_feeds(n):
+    start = datetime.now() - timedelta(minutes=150 * n)
+    kinds = [("bottle", "milk", 90), ("nurse", "left", None), ("diaper", "pee", None), ("pump", "both", 120)]
+    for i in range(n):
+        feed_type, side, amount = kinds[i % len(kinds)]
+        yield {
+            "type": feed_type,
+            "side": side,
+            "amount_ml": amount,
+            "duration_min": 12 if feed_type == "nurse" else None,
+            "notes": "",
+            "logged_by": "Mom" if i % 2 else "Dad",
+            "timestamp": (start + timedelta(minutes=150 * i)).isoformat()
+        }
+
+
+def timed(fn):
+    """Best-of-REPEAT wall time in milliseconds."""
+    best = float("inf")
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def seed_workbook(path, feeds):
+    app_module.app.config['FEED_FILE'] = path
+    app_module.init_excel_file()
+    wb = load_workbook(path)
+    ws = wb.active
+    for feed in feeds:
+        ts = datetime.fromisoformat(feed["timestamp"]).astimezone(None)
+        ws.append([ts.strftime("%Y-%m-%d"), ts.strftime("%I:%M %p"),
+                   app_module.format_feed_type(feed["type"], feed["side"]),
+                   feed["amount_ml"], feed["duration_min"], feed["notes"], feed["logged_by"], ts.isoformat()])
+    wb.save(path)
+
+
+def run(n, workdir):
+    feeds = list(make_feeds(n))
+    week_ago = (datetime.now() - timedelta(days=7)).strftime("%Y-%m-%d")
+    new_feed = {"type": "bottle", "side": "formula", "amount_ml": 60}
+    results = {}
+
+    xlsx = os.path.join(workdir, f"feeds_{n}.xlsx")
+    seed_workbook(xlsx, feeds)
+    results["workbook"] = {
+        "add": timed(lambda: app_module.add_feed_to_excel(new_feed)),
+        "read 7d": timed(lambda: app_module.get_feeds_from_excel(min_date=week_ago)),
+        "update": timed(lambda: app_module.update_feed_in_excel(n // 2, new_feed)),
+        "delete": timed(lambda: app_module.delete_feed_from_excel(n // 2)),
+    }
+
+    store = EventLogStore(os.path.join(workdir, f"feeds_{n}.log"))
+    for feed in feeds:
+        store.add_feed(feed)
+    results["event log"] = {
+        "add": timed(lambda: store.add_feed(new_feed)),
+        "read 7d": timed(lambda: store.get_feeds(min_date=week_ago)),
+        "update": timed(lambda: store.update_feed(n // 2, new_feed)),
+        "delete": timed(lambda: store.delete_feed(n // 2)),
+    }
+    store.close()
+    return results
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 10000]
+    with tempfile.TemporaryDirectory() as workdir:
+        print(f"{'entries':>8} {'engine':>10} {'add':>10} {'read 7d':>10} {'update':>10} {'delete':>10}   (ms, best of {REPEAT})")
+        for n in sizes:
+            for engine, ops in run(n, workdir).items():
+                print(f"{n:>8} {engine:>10} " + " ".join(f"{ops[op]:>10.3f}" for op in ("add", "read 7d", "update", "delete")))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Per-tenant latency as the number of tenants grows.
+
+Seeds N tenants with ENTRIES entries each, then times GET /api/feeds?limit_days=7
+through the test client: for a tenant whose table is open ("warm"), and for
+one the LRU has dropped and must reload from its snapshot + journal ("cold").
+Both should stay flat as N grows, since a request only touches its own
+tenant's table. Usage:
+
+    python benchmarks/bench_tenants.py [N ...]
+"""
+
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import app as app_module
+
+ENTRIES = 200
+REQUESTS = 500
+MAX_OPEN_TABLES = 64
+
+
+def make_feeds(n):
+    start = datetime.now() - timedelta(minutes=150 * n)
+    kinds = [("bottle", "milk", 90), ("nurse", "left", None), ("diaper", "pee", None)]
+    for i in range(n):
+        feed_type, side, amount = kinds[i % len(kinds)]
+        yield {
+            "type": feed_type,
+            "side": side,
+            "amount_ml": amount,
+            "duration_min": 12 if feed_type == "nurse" else None,
+            "notes": "",
+            "logged_by": "Mom",
+            "timestamp": (start + timedelta(minutes=150 * i)).isoformat()
+        }
+
+
+def percentile(samples, pct):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+
+def get_feeds(client, tenant):
+    started = time.perf_counter()
+    response = client.get('/api/feeds?limit_days=7', headers={"X-Tenant": tenant})
+    elapsed = (time.perf_counter() - started) * 1000
+    assert response.status_code == 200
+    return elapsed
+
+
+def run(n, workdir):
+    app = app_module.app
+    app.config['FEED_FILE'] = os.path.join(workdir, f"run_{n}", "feeds.xlsx")
+    app.config['TENANTS_DIR'] = os.path.join(workdir, f"run_{n}", "tenants")
+    app.config['MAX_OPEN_TABLES'] = MAX_OPEN_TABLES
+    app_module.feed_tables.clear()
+
+    names = [f"child{i:04d}" for i in range(n)]
+    feeds = list(make_feeds(ENTRIES))
+    for name in names:
+        with app.test_request_context(headers={"X-Tenant": name}), contextlib.redirect_stdout(io.StringIO()):
+            app.preprocess_request()
+            app_module.add_feeds_to_excel(feeds)
+
+    client = app.test_client()
+    warm_set = names[-min(n, MAX_OPEN_TABLES // 2):]
+    for name in warm_set:
+        get_feeds(client, name)
+    warm = [get_feeds(client, random.choice(warm_set)) for _ in range(REQUESTS)]
+
+    cold = []
+    if n > MAX_OPEN_TABLES:
+        for _ in range(min(REQUESTS, 100)):
+            # Touch enough other tenants that this one has been dropped
+            name = random.choice(names)
+            for other in random.sample(names, MAX_OPEN_TABLES + 1):
+                if other != name:
+                    client.get('/api/stats', headers={"X-Tenant": other})
+            cold.append(get_feeds(client, name))
+    return warm, cold
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10, 100, 300]
+    with tempfile.TemporaryDirectory() as workdir:
+        print(f"{'tenants':>8} {'warm p50':>10} {'warm p95':>10} {'cold p50':>10} {'cold p95':>10}   "
+              f"(ms, {ENTRIES} entries each, {MAX_OPEN_TABLES} open tables)")
+        for n in sizes:
+            warm, cold = run(n, workdir)
+            cold_cols = (f"{percentile(cold, 50):>10.3f} {percentile(cold, 95):>10.3f}"
+                         if cold else f"{'-':>10} {'-':>10}")
+            print(f"{n:>8} {percentile(warm, 50):>10.3f} {percentile(warm, 95):>10.3f} {cold_cols}")
+
+
+if __name__ == "__main__":
+    main()
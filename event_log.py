@@ -0,0 +1,290 @@
+"""
+Memory-mapped, fixed-width event log: an alternative storage engine.
+
+Each entry is a 64-byte record (epoch microseconds, UTC offset, type/side
+codes, amount, duration, and offsets into a strings heap for notes and
+logged-by). Records are kept in timestamp order, so logging "now" is a single
+record write at the end of the map, and a date range is a binary search plus
+one copied slice that is only decoded as it is iterated.
+
+Feed ids are stable record ids (not positions), deletes are tombstones, and
+strings live in an append-only heap file next to the log.
+
+EventLogStore implements the same operations as the workbook functions in
+app.py (add / get / update / delete) so the two can be benchmarked
+head-to-head; see benchmarks/bench_storage.py.
+"""
+
+from bisect import bisect_left, bisect_right
+import math
+import mmap
+import os
+import struct
+import threading
+from datetime import datetime, timedelta, timezone
+
+from feed_schema import format_feed_type, parse_iso_timestamp
+
+MAGIC = b"BFEL"
+FORMAT_VERSION = 1
+
+# magic, version, record size, slots used, next id
+HEADER = struct.Struct("<4sHHII")
+HEADER_SIZE = 64
+
+# epoch_us, id, utc offset (min), flags, type code, side code, amount, duration,
+# notes (offset, length), logged_by (offset, length), raw type (offset, length)
+RECORD = struct.Struct("<qIhBBBddIIIIII7x")
+RECORD_SIZE = RECORD.size
+
+FLAG_DELETED = 1
+FLAG_AMOUNT_INT = 2
+FLAG_DURATION_INT = 4
+
+INITIAL_CAPACITY = 1024
+
+TYPE_CODES = {"other": 0, "bottle": 1, "nurse": 2, "pump": 3, "diaper": 4, "vitamin_d": 5}
+SIDE_CODES = {None: 0, "left": 1, "right": 2, "both": 3, "formula": 4, "milk": 5, "pee": 6, "poop": 7}
+
+# Every type string format_feed_type can produce, keyed by (type code, side code)
+_TYPE_STRINGS = {}
+for _type in ("bottle", "nurse", "pump", "diaper", "vitamin_d"):
+    for _side in SIDE_CODES:
+        _TYPE_STRINGS.setdefault(format_feed_type(_type, _side), (TYPE_CODES[_type], SIDE_CODES[_side]))
+_TYPE_NAMES = {codes: name for name, codes in _TYPE_STRINGS.items()}
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _encode_number(value, int_flag):
+    """Numbers are stored as float64 (NaN = None) with a flag to restore ints."""
+    if value is None:
+        return math.nan, 0
+    if isinstance(value, int) and not isinstance(value, bool):
+        return float(value), int_flag
+    return float(value), 0
+
+
+def _decode_number(value, flags, int_flag):
+    if math.isnan(value):
+        return None
+    return int(value) if flags & int_flag else value
+
+
+class EventLogStore:
+    """Feed storage in a memory-mapped fixed-width log plus a strings heap."""
+
+    def __init__(self, path):
+        self.path = path
+        self.heap_path = path + ".heap"
+        self.lock = threading.Lock()
+
+        if not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.write(HEADER.pack(MAGIC, FORMAT_VERSION, RECORD_SIZE, 0, 1).ljust(HEADER_SIZE, b"\0"))
+                f.truncate(HEADER_SIZE + INITIAL_CAPACITY * RECORD_SIZE)
+
+        self._file = open(path, "r+b")
+        self._heap = open(self.heap_path, "a+b")
+        self._map = mmap.mmap(self._file.fileno(), 0)
+
+        magic, version, record_size, self.count, self.next_id = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != FORMAT_VERSION or record_size != RECORD_SIZE:
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} event log")
+
+        # id -> slot, and slot -> epoch_us for the binary search
+        self._slots = {}
+        self._times = []
+        for slot in range(self.count):
+            epoch_us, feed_id, _, flags = RECORD.unpack_from(self._map, self._offset(slot))[:4]
+            self._times.append(epoch_us)
+            if not flags & FLAG_DELETED:
+                self._slots[feed_id] = slot
+
+    def close(self):
+        self._map.flush()
+        self._map.close()
+        self._file.close()
+        self._heap.close()
+
+    # --- Layout helpers ---
+
+    @staticmethod
+    def _offset(slot):
+        return HEADER_SIZE + slot * RECORD_SIZE
+
+    def _capacity(self):
+        return (len(self._map) - HEADER_SIZE) // RECORD_SIZE
+
+    def _grow(self):
+        """Double the file. mmap.resize isn't available on macOS, so remap instead."""
+        new_size = HEADER_SIZE + self._capacity() * 2 * RECORD_SIZE
+        self._map.close()
+        self._file.truncate(new_size)
+        self._map = mmap.mmap(self._file.fileno(), 0)
+
+    def _write_header(self):
+        HEADER.pack_into(self._map, 0, MAGIC, FORMAT_VERSION, RECORD_SIZE, self.count, self.next_id)
+
+    def _put_string(self, text):
+        if not text:
+            return 0, 0
+        data = str(text).encode("utf-8")
+        self._heap.seek(0, os.SEEK_END)
+        offset = self._heap.tell()
+        self._heap.write(data)
+        self._heap.flush()
+        return offset, len(data)
+
+    def _get_string(self, offset, length):
+        if not length:
+            return ""
+        return os.pread(self._heap.fileno(), length, offset).decode("utf-8")
+
+    # --- Record encoding ---
+
+    def _pack(self, feed_id, feed_data, timestamp):
+        type_str = format_feed_type(feed_data.get("type"), feed_data.get("side"))
+        type_code, side_code = _TYPE_STRINGS.get(type_str, (0, 0))
+        raw_type = (0, 0) if type_code else self._put_string(type_str)
+
+        amount, amount_flag = _encode_number(feed_data.get("amount_ml"), FLAG_AMOUNT_INT)
+        duration, duration_flag = _encode_number(feed_data.get("duration_min"), FLAG_DURATION_INT)
+        offset_min = int(timestamp.utcoffset().total_seconds() // 60)
+        epoch_us = (timestamp - _EPOCH) // timedelta(microseconds=1)
+
+        return epoch_us, RECORD.pack(
+            epoch_us, feed_id, offset_min, amount_flag | duration_flag, type_code, side_code,
+            amount, duration,
+            *self._put_string(feed_data.get("notes", "")),
+            *self._put_string(feed_data.get("logged_by", "")),
+            *raw_type
+        )
+
+    def _unpack(self, buf, offset=0):
+        (epoch_us, feed_id, offset_min, flags, type_code, side_code, amount, duration,
+         notes_off, notes_len, by_off, by_len, type_off, type_len) = RECORD.unpack_from(buf, offset)
+
+        tz = timezone(timedelta(minutes=offset_min))
+        timestamp = (_EPOCH + timedelta(microseconds=epoch_us)).astimezone(tz)
+        type_str = _TYPE_NAMES.get((type_code, side_code)) if type_code else self._get_string(type_off, type_len)
+
+        return {
+            "id": feed_id,
+            "date": timestamp.strftime("%Y-%m-%d"),
+            "time": timestamp.strftime("%I:%M %p"),
+            "type": type_str,
+            "amount_ml": _decode_number(amount, flags, FLAG_AMOUNT_INT),
+            "duration_min": _decode_number(duration, flags, FLAG_DURATION_INT),
+            "notes": self._get_string(notes_off, notes_len),
+            "logged_by": self._get_string(by_off, by_len),
+            "timestamp": timestamp.isoformat()
+        }
+
+    @staticmethod
+    def _timestamp(feed_data, default):
+        if isinstance(feed_data.get("timestamp"), str):
+            return parse_iso_timestamp(feed_data["timestamp"]).astimezone(None)
+        return default
+
+    def _insert(self, epoch_us, record):
+        """Place a packed record in time order. Appending "now" is one record write."""
+        if self.count == self._capacity():
+            self._grow()
+
+        slot = self.count
+        if self._times and epoch_us < self._times[-1]:
+            # Backdated entry: shift the newer records up one slot
+            slot = bisect_right(self._times, epoch_us)
+            start = self._offset(slot)
+            self._map.move(start + RECORD_SIZE, start, (self.count - slot) * RECORD_SIZE)
+            for feed_id, other in self._slots.items():
+                if other >= slot:
+                    self._slots[feed_id] = other + 1
+
+        self._map[self._offset(slot):self._offset(slot) + RECORD_SIZE] = record
+        self._times.insert(slot, epoch_us)
+        self.count += 1
+        return slot
+
+    # --- Public API (mirrors the workbook functions) ---
+
+    def add_feed(self, feed_data):
+        """Append a feed entry. Returns its id."""
+        with self.lock:
+            timestamp = self._timestamp(feed_data, datetime.now().astimezone(None))
+            feed_id = self.next_id
+            epoch_us, record = self._pack(feed_id, feed_data, timestamp)
+
+            self._slots[feed_id] = self._insert(epoch_us, record)
+            self.next_id += 1
+            self._write_header()
+            return feed_id
+
+    def iter_range(self, start_us=None, end_us=None):
+        """
+        Lazily decode live records with start_us <= epoch_us < end_us.
+        The slice is located by binary search and copied out under the lock;
+        records are decoded as the generator is iterated, with the store
+        unlocked, so a slow consumer doesn't hold up writes.
+        """
+        with self.lock:
+            lo = bisect_left(self._times, start_us) if start_us is not None else 0
+            hi = bisect_left(self._times, end_us) if end_us is not None else self.count
+            records = self._map[self._offset(lo):self._offset(hi)]
+
+        for pos in range(0, len(records), RECORD_SIZE):
+            if records[pos + 14] & FLAG_DELETED:
+                continue
+            yield self._unpack(records, pos)
+
+    def get_feeds(self, date_filter=None, min_date=None):
+        """Read feeds, optionally filtered by specific date or date range, in time order."""
+        start = date_filter or min_date
+        start_us = end_us = None
+        if start:
+            # Local dates depend on each record's own offset, so search with a
+            # day of slack either side and filter on the decoded date exactly.
+            day = datetime.strptime(start, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+            start_us = (day - timedelta(days=1) - _EPOCH) // timedelta(microseconds=1)
+            if date_filter:
+                end_us = (day + timedelta(days=2) - _EPOCH) // timedelta(microseconds=1)
+
+        feeds = []
+        for feed in self.iter_range(start_us, end_us):
+            if date_filter and feed["date"] != date_filter:
+                continue
+            if min_date and feed["date"] < min_date:
+                continue
+            feeds.append(feed)
+        return feeds
+
+    def update_feed(self, feed_id, feed_data):
+        """Update a feed entry by id. Returns False if it doesn't exist."""
+        with self.lock:
+            slot = self._slots.get(feed_id)
+            if slot is None:
+                return False
+
+            old_epoch_us, _, offset_min = RECORD.unpack_from(self._map, self._offset(slot))[:3]
+            old_tz = timezone(timedelta(minutes=offset_min))
+            existing = (_EPOCH + timedelta(microseconds=old_epoch_us)).astimezone(old_tz)
+            epoch_us, record = self._pack(feed_id, feed_data, self._timestamp(feed_data, existing))
+
+            if epoch_us == old_epoch_us:
+                self._map[self._offset(slot):self._offset(slot) + RECORD_SIZE] = record
+            else:
+                # Time moved: tombstone the old slot and re-insert in order
+                self._map[self._offset(slot) + 14] |= FLAG_DELETED
+                self._slots[feed_id] = self._insert(epoch_us, record)
+                self._write_header()
+            return True
+
+    def delete_feed(self, feed_id):
+        """Delete a feed entry by id (tombstone). Returns False if it doesn't exist."""
+        with self.lock:
+            slot = self._slots.pop(feed_id, None)
+            if slot is None:
+                return False
+            self._map[self._offset(slot) + 14] |= FLAG_DELETED
+            return True
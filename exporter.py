@@ -0,0 +1,78 @@
+"""
+Streaming writers for /api/export.
+
+Each writer takes an iterator of feeds (the /api/feeds dict shape) and yields
+encoded chunks, so an export of any size is sent with chunked transfer
+encoding without ever holding the whole body in memory.
+"""
+
+import csv
+import io
+import json
+import tempfile
+
+from openpyxl import Workbook
+
+from feed_schema import FIELDS, HEADERS
+
+FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+# Rows encoded per yielded chunk
+ROWS_PER_CHUNK = 500
+
+# Bytes per chunk when streaming the finished xlsx file
+FILE_CHUNK_SIZE = 64 * 1024
+
+
+def csv_chunks(feeds):
+    """CSV with the workbook's column headers (importable again)."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(HEADERS)
+    for count, feed in enumerate(feeds, start=1):
+        writer.writerow([feed[field] for field in FIELDS])
+        if count % ROWS_PER_CHUNK == 0:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue()
+
+
+def ndjson_chunks(feeds):
+    """One /api/feeds entry object per line."""
+    lines = []
+    for feed in feeds:
+        lines.append(json.dumps(feed, ensure_ascii=False) + "\n")
+        if len(lines) == ROWS_PER_CHUNK:
+            yield "".join(lines)
+            lines = []
+    yield "".join(lines)
+
+
+def xlsx_chunks(feeds):
+    """
+    A workbook built with openpyxl's write-only mode (rows go straight to a
+    temp file), then streamed from disk. The zip format needs its directory
+    at the end, so nothing can be sent until the last row is written.
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Feed Log")
+    ws.append(HEADERS)
+    for feed in feeds:
+        ws.append([feed[field] for field in FIELDS])
+
+    with tempfile.TemporaryFile() as f:
+        wb.save(f)
+        f.seek(0)
+        while True:
+            chunk = f.read(FILE_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+
+WRITERS = {"csv": csv_chunks, "ndjson": ndjson_chunks, "xlsx": xlsx_chunks}
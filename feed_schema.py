@@ -0,0 +1,56 @@
+"""
+The stored entry schema shared by the app, the storage engines, import,
+export and the archive: the column list, the stored type strings and ISO
+timestamp parsing. Kept apart from app.py so storage modules can use it
+without importing the Flask app.
+"""
+
+from datetime import datetime
+
+# Stored columns in workbook order, as entry field names and workbook headers
+FIELDS = ("date", "time", "type", "amount_ml", "duration_min", "notes", "logged_by", "timestamp")
+HEADERS = ("Date", "Time", "Type", "Amount (ml)", "Duration (min)", "Notes", "Logged By", "Timestamp")
+
+
+def parse_iso_timestamp(ts_string):
+    """Parse ISO format timestamp, handling 'Z' suffix that Python 3.9 doesn't support."""
+    if ts_string.endswith('Z'):
+        ts_string = ts_string[:-1] + '+00:00'
+    return datetime.fromisoformat(ts_string)
+
+
+def format_feed_type(feed_type, side=None):
+    """Convert feed type and side into Excel-friendly string."""
+    if feed_type == "bottle":
+        if side == "formula":
+            return "Feed (Bottle - Formula)"
+        elif side == "milk":
+            return "Feed (Bottle - Milk)"
+        else:
+            return "Feed (Bottle)"
+    elif feed_type == "nurse":
+        if side == "left":
+            return "Nurse (Left)"
+        elif side == "right":
+            return "Nurse (Right)"
+        else:
+            return "Nurse (Both)"
+    elif feed_type == "pump":
+        if side == "left":
+            return "Pump (Left)"
+        elif side == "right":
+            return "Pump (Right)"
+        else:
+            return "Pump (Both)"
+    elif feed_type == "diaper":
+        if side == "pee":
+            return "Diaper (Pee)"
+        elif side == "poop":
+            return "Diaper (Poop)"
+        elif side == "both":
+            return "Diaper (Both)"
+        else:
+            return "Diaper"
+    elif feed_type == "vitamin_d":
+        return "Vitamin D"
+    return feed_type
@@ -0,0 +1,479 @@
+"""
+In-memory copy of the feed workbook, with a binary snapshot and a change
+journal so the server can start without re-parsing feeds.xlsx.
+
+The workbook stays the source of truth. Every write saves the workbook
+first, then updates this table, then appends a journal record carrying the
+workbook's new (mtime, size) fingerprint. On boot the snapshot is loaded and
+the journal tail replayed; the result is only trusted if its fingerprint
+matches the file on disk, otherwise the workbook is parsed again.
+"""
+
+import bisect
+import json
+import os
+import struct
+import time
+from datetime import datetime
+
+SNAPSHOT_MAGIC = b"BFTS"
+SNAPSHOT_VERSION = 1
+
+# Journal records between automatic snapshots
+SNAPSHOT_EVERY = 500
+
+# magic, format version, journal seq, workbook mtime_ns, workbook size, row count
+_HEADER = struct.Struct("<4sHQqqI")
+_U8 = struct.Struct("<B")
+_U32 = struct.Struct("<I")
+_I64 = struct.Struct("<q")
+_F64 = struct.Struct("<d")
+
+_TAG_NONE, _TAG_STR, _TAG_INT, _TAG_FLOAT, _TAG_TRUE, _TAG_FALSE, _TAG_DATETIME = range(7)
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot can't be written or read."""
+
+
+def file_fingerprint(path):
+    """Cheap identity of a file's contents: (mtime_ns, size)."""
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def snapshot_path_for(feed_file):
+    return os.path.splitext(feed_file)[0] + ".snapshot"
+
+
+def journal_path_for(feed_file):
+    return os.path.splitext(feed_file)[0] + ".journal"
+
+
+def snapshot_seq(feed_file):
+    """Journal seq recorded in a snapshot's header, without decoding its rows (None if there is none)."""
+    try:
+        with open(snapshot_path_for(feed_file), "rb") as f:
+            magic, version, seq, _, _, _ = _HEADER.unpack(f.read(_HEADER.size))
+    except (OSError, struct.error):
+        return None
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+        return None
+    return seq
+
+
+def _encode_value(value, out):
+    if value is None:
+        out.append(_U8.pack(_TAG_NONE))
+    elif value is True:
+        out.append(_U8.pack(_TAG_TRUE))
+    elif value is False:
+        out.append(_U8.pack(_TAG_FALSE))
+    elif isinstance(value, str):
+        data = value.encode("utf-8")
+        out.append(_U8.pack(_TAG_STR) + _U32.pack(len(data)) + data)
+    elif isinstance(value, int):
+        out.append(_U8.pack(_TAG_INT) + _I64.pack(value))
+    elif isinstance(value, float):
+        out.append(_U8.pack(_TAG_FLOAT) + _F64.pack(value))
+    elif isinstance(value, datetime):
+        data = value.isoformat().encode("ascii")
+        out.append(_U8.pack(_TAG_DATETIME) + _U32.pack(len(data)) + data)
+    else:
+        raise SnapshotError(f"Can't snapshot value of type {type(value).__name__}")
+
+
+def encode_snapshot(rows, seq, fingerprint):
+    """Pack rows (tuples of cell values) into the versioned snapshot format."""
+    mtime_ns, size = fingerprint
+    out = [_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, seq, mtime_ns, size, len(rows))]
+    for row in rows:
+        out.append(_U8.pack(len(row)))
+        for value in row:
+            _encode_value(value, out)
+    return b"".join(out)
+
+
+def decode_snapshot(data):
+    """Inverse of encode_snapshot. Returns (rows, seq, fingerprint)."""
+    if len(data) < _HEADER.size:
+        raise SnapshotError("Snapshot truncated")
+    magic, version, seq, mtime_ns, size, count = _HEADER.unpack_from(data, 0)
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+        raise SnapshotError("Unknown snapshot format")
+
+    view = memoryview(data)
+    pos = _HEADER.size
+    rows = []
+    try:
+        for _ in range(count):
+            (width,) = _U8.unpack_from(data, pos)
+            pos += 1
+            row = []
+            for _ in range(width):
+                (tag,) = _U8.unpack_from(data, pos)
+                pos += 1
+                if tag == _TAG_NONE:
+                    row.append(None)
+                elif tag == _TAG_TRUE:
+                    row.append(True)
+                elif tag == _TAG_FALSE:
+                    row.append(False)
+                elif tag in (_TAG_STR, _TAG_DATETIME):
+                    (length,) = _U32.unpack_from(data, pos)
+                    pos += 4
+                    text = str(view[pos:pos + length], "utf-8")
+                    pos += length
+                    row.append(text if tag == _TAG_STR else datetime.fromisoformat(text))
+                elif tag == _TAG_INT:
+                    row.append(_I64.unpack_from(data, pos)[0])
+                    pos += 8
+                elif tag == _TAG_FLOAT:
+                    row.append(_F64.unpack_from(data, pos)[0])
+                    pos += 8
+                else:
+                    raise SnapshotError(f"Unknown value tag {tag}")
+            rows.append(tuple(row))
+    except struct.error as e:
+        raise SnapshotError(f"Snapshot truncated: {e}")
+
+    return rows, seq, (mtime_ns, size)
+
+
+def row_to_feed(row, feed_id):
+    """Turn a stored row into the dict shape the API returns."""
+    date_str, time_str, type_str, amount, duration, notes, logged_by, timestamp_str = row[:8]
+    return {
+        "id": feed_id,
+        "date": date_str,
+        "time": time_str,
+        "type": type_str,
+        "amount_ml": amount,
+        "duration_min": duration,
+        "notes": notes or "",
+        "logged_by": logged_by or "",
+        "timestamp": timestamp_str
+    }
+
+
+def entry_categories(type_str):
+    """
+    Categories an entry counts towards for the home-screen "last ..." pointers:
+    "feed" for anything but Vitamin D and pumping, "diaper" for diaper changes.
+    """
+    type_str = type_str if isinstance(type_str, str) else ""
+    categories = []
+    if "Vitamin D" not in type_str and "Pump" not in type_str:
+        categories.append("feed")
+    if "Diaper" in type_str:
+        categories.append("diaper")
+    return categories
+
+
+def timestamp_epoch(timestamp_str):
+    """Epoch seconds of a stored ISO timestamp (naive ones are local time), or None."""
+    if not isinstance(timestamp_str, str) or not timestamp_str:
+        return None
+    if timestamp_str.endswith("Z"):
+        timestamp_str = timestamp_str[:-1] + "+00:00"
+    try:
+        return datetime.fromisoformat(timestamp_str).timestamp()
+    except ValueError:
+        return None
+
+
+def _row_time(row):
+    timestamp = row[7] if len(row) >= 8 else None
+    return timestamp if isinstance(timestamp, str) else ""
+
+
+class FeedTable:
+    """
+    Rows of one feed workbook, in row order (feed id = position + 1).
+
+    Not thread-safe on its own; callers hold the workbook's file lock.
+    """
+
+    def __init__(self, path, rows=None, seq=0, fingerprint=None):
+        self.path = path
+        self.rows = list(rows or [])
+        self.seq = seq
+        self.fingerprint = fingerprint
+        # Keep compacted journals (feeds.journal.<seq>) for incremental backups
+        self.retain_journal = False
+        self._unsnapshotted = 0
+        # Latest row per entry category, maintained on write (None = not computed yet)
+        self._latest = None
+        # Rows sorted by time: (epochs, rows, ids), maintained on write (None = not built yet)
+        self._time_index = None
+
+    @property
+    def version(self):
+        """Data version: changes on every mutation and on every reload from the workbook."""
+        return self.seq
+
+    @classmethod
+    def from_worksheet(cls, path, ws, fingerprint, seq=0):
+        """Build a table from a loaded worksheet, starting a fresh snapshot + journal."""
+        rows = [tuple(row[:8]) for row in ws.iter_rows(min_row=2, values_only=True)]
+        table = cls(path, rows, seq=seq, fingerprint=fingerprint)
+        table.write_snapshot()
+        return table
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load the snapshot and replay the journal tail after it.
+        Returns None if there is no usable snapshot.
+        """
+        try:
+            with open(snapshot_path_for(path), "rb") as f:
+                rows, seq, fingerprint = decode_snapshot(f.read())
+        except (OSError, SnapshotError):
+            return None
+
+        table = cls(path, rows, seq, fingerprint)
+        for record in read_journal(journal_path_for(path), after_seq=seq):
+            table._apply(record)
+            table.seq = record["seq"]
+            table.fingerprint = tuple(record["fp"])
+            table._unsnapshotted += 1
+        return table
+
+    # --- Reads ---
+
+    def select(self, date_filter=None, min_date=None):
+        """Feeds for a specific date or from min_date onward, in row order."""
+        feeds = []
+        for idx, row in enumerate(self.rows):
+            if len(row) < 8:
+                continue
+            date_str = row[0]
+            if date_filter and date_str != date_filter:
+                continue
+            if min_date and not (isinstance(date_str, str) and date_str >= min_date):
+                continue
+            feeds.append(row_to_feed(row, idx + 1))
+        return feeds
+
+    def get(self, feed_id):
+        """Stored row for a feed id, or None."""
+        if 1 <= feed_id <= len(self.rows):
+            return self.rows[feed_id - 1]
+        return None
+
+    def latest(self, category):
+        """Row with the newest timestamp in a category ("feed" or "diaper"), or None."""
+        if self._latest is None:
+            self._latest = {}
+            for row in self.rows:
+                self._offer_latest(row)
+        return self._latest.get(category)
+
+    def time_index(self):
+        """
+        (epochs, rows, ids): rows with a timestamp, sorted by time, with their
+        epoch seconds and feed ids, for bisecting a time range. The lists are
+        shared; don't modify them.
+        """
+        if self._time_index is None:
+            entries = []
+            for idx, row in enumerate(self.rows):
+                epoch = timestamp_epoch(row[7]) if len(row) >= 8 else None
+                if epoch is not None:
+                    entries.append((epoch, idx, row))
+            entries.sort(key=lambda e: (e[0], e[1]))
+            self._time_index = ([e[0] for e in entries], [e[2] for e in entries], [e[1] + 1 for e in entries])
+        return self._time_index
+
+    def page_before(self, before_epoch, limit):
+        """
+        Feeds timestamped before before_epoch (None = any time), newest first:
+        at least limit of them if there are that many, extended so the page
+        always ends on a whole day. Returns (feeds, more), more being True if
+        older entries remain.
+        """
+        epochs, rows, ids = self.time_index()
+        pos = len(epochs) if before_epoch is None else bisect.bisect_left(epochs, before_epoch)
+        feeds = []
+        while pos > 0:
+            row = rows[pos - 1]
+            if len(feeds) >= limit and row[0] != feeds[-1]["date"]:
+                break
+            pos -= 1
+            feeds.append(row_to_feed(row, ids[pos]))
+        return feeds, pos > 0
+
+    def _index_add(self, row, feed_id):
+        epoch = timestamp_epoch(row[7]) if len(row) >= 8 else None
+        if epoch is None:
+            return
+        epochs, rows, ids = self._time_index
+        # Usually "now", so this lands at the end; equal times keep row order
+        pos = bisect.bisect_right(epochs, epoch)
+        while pos > 0 and epochs[pos - 1] == epoch and ids[pos - 1] > feed_id:
+            pos -= 1
+        epochs.insert(pos, epoch)
+        rows.insert(pos, row)
+        ids.insert(pos, feed_id)
+
+    def _index_remove(self, row):
+        epoch = timestamp_epoch(row[7]) if len(row) >= 8 else None
+        if epoch is None:
+            return
+        epochs, rows, ids = self._time_index
+        pos = bisect.bisect_left(epochs, epoch)
+        while pos < len(epochs) and epochs[pos] == epoch:
+            if rows[pos] is row:
+                del epochs[pos], rows[pos], ids[pos]
+                return
+            pos += 1
+
+    def _index_renumber(self, deleted_id):
+        """Rows after a deleted one move up a place."""
+        ids = self._time_index[2]
+        ids[:] = [i - 1 if i > deleted_id else i for i in ids]
+
+    def _offer_latest(self, row):
+        """Make row the latest of its categories if it is newer (ties keep the earlier row)."""
+        if len(row) < 8:
+            return
+        for category in entry_categories(row[2]):
+            current = self._latest.get(category)
+            if current is None or _row_time(row) > _row_time(current):
+                self._latest[category] = row
+
+    def _retract_latest(self, row):
+        """
+        row has left the table (and the time index): for each category it was
+        the latest of, fall back to the next newest, found by walking the time
+        index back from the end.
+        """
+        for category, latest in self._latest.items():
+            if latest is row:
+                self._latest[category] = self._newest_in(category)
+
+    def _newest_in(self, category):
+        """Newest row in a category by the time index (ties keep the earlier row), or None."""
+        epochs, rows, _ = self.time_index()
+        newest = None
+        for pos in range(len(rows) - 1, -1, -1):
+            if newest is not None and epochs[pos] < newest_epoch:
+                break
+            if len(rows[pos]) >= 8 and category in entry_categories(rows[pos][2]):
+                newest, newest_epoch = rows[pos], epochs[pos]
+        return newest
+
+    # --- Writes (called after the workbook has been saved) ---
+
+    def append(self, row, fingerprint):
+        self._record([{"op": "add", "row": list(row)}], fingerprint)
+
+    def append_many(self, rows, fingerprint):
+        """Append several rows saved in one workbook write, with one journal write."""
+        self._record([{"op": "add", "row": list(row)} for row in rows], fingerprint)
+
+    def update(self, feed_id, row, fingerprint):
+        self._record([{"op": "update", "id": feed_id, "row": list(row)}], fingerprint)
+
+    def delete(self, feed_id, fingerprint):
+        self._record([{"op": "delete", "id": feed_id}], fingerprint)
+
+    def replace_all(self, rows, fingerprint):
+        """Swap in a whole new set of rows (e.g. after archiving) and snapshot immediately."""
+        self.rows = [tuple(row[:8]) for row in rows]
+        self._latest = None
+        self._time_index = None
+        self.fingerprint = fingerprint
+        self.seq += 1
+        self.write_snapshot()
+
+    def _apply(self, record):
+        op = record["op"]
+        if op == "add":
+            row = tuple(record["row"])
+            self.rows.append(row)
+            if self._latest is not None:
+                self._offer_latest(row)
+            if self._time_index is not None:
+                self._index_add(row, len(self.rows))
+        elif op == "update":
+            row = tuple(record["row"])
+            old = self.rows[record["id"] - 1]
+            self.rows[record["id"] - 1] = row
+            if self._time_index is not None:
+                self._index_remove(old)
+                self._index_add(row, record["id"])
+            if self._latest is not None:
+                self._retract_latest(old)
+                self._offer_latest(row)
+        elif op == "delete":
+            removed = self.rows.pop(record["id"] - 1)
+            if self._time_index is not None:
+                self._index_remove(removed)
+                self._index_renumber(record["id"])
+            if self._latest is not None:
+                self._retract_latest(removed)
+
+    def _record(self, records, fingerprint):
+        now = time.time()
+        lines = []
+        for record in records:
+            self._apply(record)
+            self.seq += 1
+            record["seq"] = self.seq
+            record["fp"] = list(fingerprint)
+            record["at"] = now
+            lines.append(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        self.fingerprint = fingerprint
+
+        with open(journal_path_for(self.path), "a", encoding="utf-8") as f:
+            f.write("".join(lines))
+
+        self._unsnapshotted += len(records)
+        if self._unsnapshotted >= SNAPSHOT_EVERY:
+            self.write_snapshot()
+
+    # --- Persistence ---
+
+    def write_snapshot(self):
+        """Write the snapshot atomically, then truncate (or seal) the journal it covers."""
+        if self.fingerprint is None:
+            return False
+        try:
+            data = encode_snapshot(self.rows, self.seq, self.fingerprint)
+        except SnapshotError as e:
+            print(f"Skipping feed snapshot: {e}")
+            return False
+
+        path = snapshot_path_for(self.path)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        # Records up to self.seq are now in the snapshot; a crash before this
+        # truncate only leaves records that replay skips.
+        journal = journal_path_for(self.path)
+        if self.retain_journal and os.path.exists(journal) and os.path.getsize(journal):
+            os.replace(journal, f"{journal}.{self.seq:012d}")
+        else:
+            open(journal, "w").close()
+        self._unsnapshotted = 0
+        return True
+
+
+def read_journal(path, after_seq=0):
+    """Yield journal records with seq > after_seq, stopping at a torn final line."""
+    try:
+        f = open(path, encoding="utf-8")
+    except FileNotFoundError:
+        return
+    with f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            if record["seq"] > after_seq:
+                yield record
@@ -0,0 +1,158 @@
+"""
+Read-only follower: an in-memory copy of another instance's feed table, kept
+current by tailing its change journal.
+
+The source is either the primary's URL (polling GET /api/changes) or the
+path of its feed file on a shared directory (reading the snapshot and
+journal next to it directly). Each poll fetches only the journal records
+after the follower's seq; when those have been compacted away, or the
+primary re-read its workbook, the follower takes a full copy of the rows
+instead.
+"""
+
+import json
+import os
+import threading
+import time
+import urllib.request
+
+import msgpack_format
+from feed_table import FeedTable, journal_path_for, read_journal, snapshot_seq
+
+# Seconds between polls of the primary
+POLL_INTERVAL = 2.0
+
+
+class FollowerError(Exception):
+    """Raised when the primary's change log can't be read."""
+
+
+def changes_since(table, after_seq):
+    """
+    What a follower at after_seq (None = nothing yet) needs to catch up with
+    table: the journal records since then if they are all still there,
+    otherwise every row.
+    """
+    if after_seq == table.seq:
+        return {"seq": table.seq, "records": []}
+    if after_seq is not None and after_seq < table.seq and table.path:
+        records = list(read_journal(journal_path_for(table.path), after_seq))
+        if records and records[0]["seq"] == after_seq + 1 and records[-1]["seq"] == table.seq:
+            return {"seq": table.seq, "records": records}
+    return {"seq": table.seq, "rows": [list(row) for row in table.rows]}
+
+
+def read_changes(feed_file, after_seq):
+    """changes_since for a primary seen only through its files on a shared directory."""
+    if after_seq is not None:
+        records = list(read_journal(journal_path_for(feed_file), after_seq))
+        if records and records[0]["seq"] == after_seq + 1:
+            return {"seq": records[-1]["seq"], "records": records}
+        latest = snapshot_seq(feed_file)
+        if not records and latest is not None and latest <= after_seq:
+            return {"seq": after_seq, "records": []}
+
+    table = FeedTable.load(feed_file)
+    if table is None:
+        raise FollowerError(f"No feed snapshot next to {feed_file}")
+    return {"seq": table.seq, "rows": [list(row) for row in table.rows]}
+
+
+def fetch_changes(url):
+    """GET a change log from the primary, as MessagePack (smaller for a full resync), or JSON from older primaries."""
+    request = urllib.request.Request(url, headers={"Accept": f"{msgpack_format.MIMETYPE}, application/json;q=0.9"})
+    with urllib.request.urlopen(request, timeout=10) as response:
+        if response.headers.get_content_type() == msgpack_format.MIMETYPE:
+            return msgpack_format.unpackb(response.read())
+        return json.load(response)
+
+
+class Follower:
+    """
+    A feed table mirrored from source. Readers use .table under lock;
+    poll() applies new changes under the same lock.
+    """
+
+    def __init__(self, source, lock=None, fetch=fetch_changes, on_resync=None):
+        if not source.startswith(("http://", "https://")) and os.path.isdir(source):
+            source = os.path.join(source, "feeds.xlsx")
+        self.source = source
+        self.lock = lock or threading.Lock()
+        self.fetch = fetch
+        # Called after a full resync, whose seq may be lower than the old table's
+        self.on_resync = on_resync
+        self.table = FeedTable(None)
+        self.synced = False
+        self.primary_seq = None
+        self.last_sync_at = None
+        self.last_change_at = None
+        self.last_error = None
+        self.polls = 0
+        self.resyncs = 0
+
+    @property
+    def is_http(self):
+        return self.source.startswith(("http://", "https://"))
+
+    def read_changes(self, after_seq):
+        if self.is_http:
+            url = self.source.rstrip("/") + "/api/changes"
+            if after_seq is not None:
+                url += f"?after={after_seq}"
+            return self.fetch(url)
+        return read_changes(self.source, after_seq)
+
+    def poll(self):
+        """Fetch and apply whatever changed on the primary. Returns False on error."""
+        self.polls += 1
+        after_seq = self.table.seq if self.synced else None
+        try:
+            changes = self.read_changes(after_seq)
+        except (OSError, ValueError, FollowerError) as e:
+            self.last_error = str(e)
+            print(f"Follower poll failed: {e}")
+            return False
+
+        with self.lock:
+            if "rows" in changes:
+                # Swap in a new table so readers holding the old one are unaffected
+                self.table = FeedTable(None, [tuple(row) for row in changes["rows"]], seq=changes["seq"])
+                self.synced = True
+                self.resyncs += 1
+                if self.on_resync is not None:
+                    self.on_resync()
+            elif self.synced and self.table.seq == after_seq:
+                for record in changes["records"]:
+                    self.table._apply(record)
+                    self.table.seq = record["seq"]
+                    self.last_change_at = record.get("at")
+
+        self.primary_seq = changes["seq"]
+        self.last_sync_at = time.time()
+        self.last_error = None
+        return True
+
+    def run(self, interval=POLL_INTERVAL):
+        """Poll forever (background thread)."""
+        while True:
+            self.poll()
+            time.sleep(interval)
+
+    def start(self, interval=POLL_INTERVAL):
+        threading.Thread(target=self.run, args=(interval,), daemon=True).start()
+
+    def status(self):
+        """Replication lag: records behind the primary as of the last poll, and seconds since that poll."""
+        now = time.time()
+        return {
+            "role": "follower",
+            "source": self.source,
+            "seq": self.table.seq if self.synced else None,
+            "primary_seq": self.primary_seq,
+            "lag_records": (self.primary_seq - self.table.seq) if self.synced and self.primary_seq is not None else None,
+            "lag_seconds": round(now - self.last_sync_at, 3) if self.last_sync_at else None,
+            "last_change_at": self.last_change_at,
+            "last_error": self.last_error,
+            "polls": self.polls,
+            "resyncs": self.resyncs,
+        }
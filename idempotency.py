@@ -0,0 +1,63 @@
+"""
+Replay protection for writes.
+
+A client that retries a write it isn't sure went through (a flaky network,
+the offline outbox) sends the same Idempotency-Key each time. The first
+response is kept under that key, and a replay gets it back without anything
+being written again. Keys live in a bounded index: each expires ttl seconds
+after it was stored, and the oldest are dropped first once the index is full.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class IdempotencyIndex:
+    """key -> stored response. Lookups and inserts are O(1); expiry is amortized O(1)."""
+
+    def __init__(self, max_entries=10000, ttl=24 * 3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.replayed = 0
+        self.conflicts = 0
+        self._entries = OrderedDict()  # key -> (expires_at, value), oldest first
+        self._lock = threading.Lock()
+
+    def get(self, key, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            self._expire(now)
+            entry = self._entries.get(key)
+            return None if entry is None else entry[1]
+
+    def put(self, key, value, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            # Re-inserting moves the key to the end, keeping expiry order
+            self._entries.pop(key, None)
+            self._entries[key] = (now + self.ttl, value)
+            self._expire(now)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def count_replay(self):
+        """A stored response was sent again for a repeated key."""
+        with self._lock:
+            self.replayed += 1
+
+    def count_conflict(self):
+        """A key came back with a different request and was refused."""
+        with self._lock:
+            self.conflicts += 1
+
+    def _expire(self, now):
+        # Every entry has the same ttl, so insertion order is expiry order
+        while self._entries:
+            expires_at, _ = next(iter(self._entries.values()))
+            if expires_at > now:
+                break
+            self._entries.popitem(last=False)
+
+    def stats(self):
+        return {"entries": len(self._entries), "replayed": self.replayed, "conflicts": self.conflicts}
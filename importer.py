@@ -0,0 +1,171 @@
+"""
+Streaming readers for bulk imports.
+
+Each reader yields one entry at a time as a dict, so memory stays flat no
+matter how large the file is. Entries come out either in the stored shape
+(date, time, type, amount_ml, duration_min, notes, logged_by, timestamp -
+what the workbook holds and /api/feeds returns) or, for JSON/CSV written by
+hand, in the POST /api/feeds payload shape (type "bottle", side "left").
+app.import_feed_file turns both into workbook rows.
+"""
+
+import csv
+import json
+import os
+import re
+
+from openpyxl import load_workbook
+
+from feed_schema import FIELDS, HEADERS
+
+FORMATS = ("xlsx", "csv", "json", "ndjson")
+
+# Workbook column headers -> field names
+HEADER_ALIASES = dict(zip(HEADERS, FIELDS))
+
+# Bytes read at a time from JSON files
+CHUNK_SIZE = 64 * 1024
+
+_FEEDS_ARRAY = re.compile(r'"feeds"\s*:\s*\[')
+
+
+def detect_format(filename):
+    """Guess the import format from a file name, or None."""
+    ext = os.path.splitext(filename or "")[1].lower().lstrip(".")
+    if ext == "jsonl":
+        ext = "ndjson"
+    return ext if ext in FORMATS else None
+
+
+def _header_keys(header):
+    keys = [HEADER_ALIASES.get(h, h) for h in header]
+    return keys if set(keys) & set(FIELDS) else None
+
+
+def read_xlsx(path):
+    """Rows of the first sheet, parsed in openpyxl's streaming read-only mode."""
+    wb = load_workbook(path, read_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        first = next(rows, None)
+        if first is None:
+            return
+        keys = _header_keys(first)
+        if keys is None:
+            # No header row: assume the workbook column order
+            keys = FIELDS
+            yield dict(zip(keys, first))
+        for row in rows:
+            if any(value is not None for value in row):
+                yield dict(zip(keys, row))
+    finally:
+        wb.close()
+
+
+def _csv_number(value):
+    value = (value or "").strip()
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+
+def read_csv(path):
+    """Rows of a CSV with workbook headers or field-name headers."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        first = next(reader, None)
+        if first is None:
+            return
+        keys = _header_keys(first)
+        if keys is None:
+            keys = FIELDS
+            reader = _prepend(first, reader)
+        for row in reader:
+            if not any(row):
+                continue
+            entry = dict(zip(keys, row))
+            for field in ("amount_ml", "duration_min"):
+                if field in entry:
+                    entry[field] = _csv_number(entry[field])
+            for field in ("side", "timestamp", "date", "time"):
+                if entry.get(field) == "":
+                    entry[field] = None
+            yield entry
+
+
+def _prepend(first, rows):
+    yield first
+    yield from rows
+
+
+def read_json(path):
+    """
+    Objects of a JSON array - either the whole document or the "feeds" key of
+    an /api/feeds response - decoded one at a time from a sliding buffer.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, encoding="utf-8") as f:
+        buf = f.read(CHUNK_SIZE)
+
+        # Find where the array starts
+        while True:
+            stripped = buf.lstrip()
+            if stripped.startswith("["):
+                pos = len(buf) - len(stripped) + 1
+                break
+            match = _FEEDS_ARRAY.search(buf)
+            if match:
+                pos = match.end()
+                break
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                raise ValueError("No feed array found in JSON file")
+            buf += chunk
+
+        eof = False
+        while True:
+            # Skip separators
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buf) and buf[pos] == "]":
+                return
+
+            try:
+                if pos >= len(buf):
+                    raise json.JSONDecodeError("Need more data", buf, pos)
+                item, pos = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise ValueError("Truncated or malformed JSON array")
+                chunk = f.read(CHUNK_SIZE)
+                eof = not chunk
+                buf = buf[pos:] + chunk
+                pos = 0
+                continue
+
+            yield item
+
+            # Drop what has been consumed so the buffer stays small
+            if pos > CHUNK_SIZE:
+                buf = buf[pos:]
+                pos = 0
+
+
+def read_ndjson(path):
+    """One JSON object per line (the /api/export?format=ndjson shape)."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def read_feed_file(path, fmt=None):
+    """Stream entries from an import file, picking the reader by format or extension."""
+    fmt = fmt or detect_format(path)
+    readers = {"xlsx": read_xlsx, "csv": read_csv, "json": read_json, "ndjson": read_ndjson}
+    if fmt not in readers:
+        raise ValueError(f"Unsupported import format: {fmt!r}")
+    return readers[fmt](path)
@@ -0,0 +1,260 @@
+"""
+MessagePack response bodies (Accept: application/msgpack).
+
+The same payloads as the JSON API, packed as MessagePack: numbers travel as
+binary rather than digits, and entry lists get smaller still through
+compact_entries (type strings as small integers, timestamps as epoch
+seconds). Uses the msgpack package when it is installed and a pure-Python
+codec of the subset the API needs otherwise; both give the same bytes.
+"""
+
+import struct
+from datetime import date, datetime
+
+from feed_table import timestamp_epoch
+
+try:
+    import msgpack
+except ImportError:  # Optional: pure-Python packing
+    msgpack = None
+
+MIMETYPE = "application/msgpack"
+
+
+def _default(obj):
+    if isinstance(obj, (date, datetime)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not MessagePack serializable")
+
+
+def packb(obj):
+    """obj as MessagePack bytes."""
+    if msgpack is not None:
+        return msgpack.packb(obj, default=_default, use_bin_type=True)
+    out = bytearray()
+    _pack(obj, out)
+    return bytes(out)
+
+
+def unpackb(data):
+    """The object packed in data. Raises ValueError if it isn't one whole MessagePack value."""
+    if msgpack is not None:
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+    obj, end = _unpack(memoryview(data), 0)
+    if end != len(data):
+        raise ValueError(f"Extra data after MessagePack value at byte {end}")
+    return obj
+
+
+def extend_map(packed, extra):
+    """A packed map with the items of the dict extra added at the end (as splice_clock_fields does for JSON)."""
+    first = packed[0]
+    if 0x80 <= first <= 0x8f:
+        count, header = first & 0x0f, 1
+    elif first == 0xde:
+        count, header = struct.unpack_from(">H", packed, 1)[0], 3
+    elif first == 0xdf:
+        count, header = struct.unpack_from(">I", packed, 1)[0], 5
+    else:
+        raise ValueError("Not a packed map")
+    items = packb(extra)
+    extra_header = 1 if len(extra) < 16 else 3 if len(extra) < 0x10000 else 5
+    return _map_header(count + len(extra)) + packed[header:] + items[extra_header:]
+
+
+def compact_entries(payload):
+    """
+    A copy of a payload whose "feeds" (rows or columns) carry each type as
+    an index into a "types" list and each timestamp as epoch seconds.
+    Payloads without entries are returned as they are.
+    """
+    feeds = payload.get("feeds")
+    if feeds is None:
+        return payload
+    types = {}
+
+    def type_code(type_str):
+        code = types.get(type_str)
+        if code is None:
+            code = types[type_str] = len(types)
+        return code
+
+    def epoch(timestamp_str):
+        seconds = timestamp_epoch(timestamp_str)
+        return int(seconds) if seconds is not None and seconds.is_integer() else seconds
+
+    if isinstance(feeds, dict):
+        feeds = dict(feeds)
+        if "type" in feeds:
+            feeds["type"] = [type_code(type_str) for type_str in feeds["type"]]
+        if "timestamp" in feeds:
+            feeds["timestamp"] = [epoch(ts) for ts in feeds["timestamp"]]
+    else:
+        feeds = [dict(feed) for feed in feeds]
+        for feed in feeds:
+            if "type" in feed:
+                feed["type"] = type_code(feed["type"])
+            if "timestamp" in feed:
+                feed["timestamp"] = epoch(feed["timestamp"])
+    return dict(payload, feeds=feeds, types=list(types))
+
+
+def _map_header(count):
+    if count < 16:
+        return bytes([0x80 | count])
+    if count < 0x10000:
+        return struct.pack(">BH", 0xde, count)
+    return struct.pack(">BI", 0xdf, count)
+
+
+def _pack(obj, out):
+    if obj is None:
+        out.append(0xc0)
+    elif obj is True:
+        out.append(0xc3)
+    elif obj is False:
+        out.append(0xc2)
+    elif isinstance(obj, int):
+        _pack_int(obj, out)
+    elif isinstance(obj, float):
+        out += struct.pack(">Bd", 0xcb, obj)
+    elif isinstance(obj, str):
+        data = obj.encode("utf-8")
+        n = len(data)
+        if n < 32:
+            out.append(0xa0 | n)
+        elif n < 0x100:
+            out += struct.pack(">BB", 0xd9, n)
+        elif n < 0x10000:
+            out += struct.pack(">BH", 0xda, n)
+        else:
+            out += struct.pack(">BI", 0xdb, n)
+        out += data
+    elif isinstance(obj, (bytes, bytearray)):
+        n = len(obj)
+        if n < 0x100:
+            out += struct.pack(">BB", 0xc4, n)
+        elif n < 0x10000:
+            out += struct.pack(">BH", 0xc5, n)
+        else:
+            out += struct.pack(">BI", 0xc6, n)
+        out += obj
+    elif isinstance(obj, (list, tuple)):
+        n = len(obj)
+        if n < 16:
+            out.append(0x90 | n)
+        elif n < 0x10000:
+            out += struct.pack(">BH", 0xdc, n)
+        else:
+            out += struct.pack(">BI", 0xdd, n)
+        for item in obj:
+            _pack(item, out)
+    elif isinstance(obj, dict):
+        out += _map_header(len(obj))
+        for key, value in obj.items():
+            _pack(key, out)
+            _pack(value, out)
+    else:
+        _pack(_default(obj), out)
+
+
+def _pack_int(n, out):
+    if 0 <= n < 0x80:
+        out.append(n)
+    elif -32 <= n < 0:
+        out.append(n & 0xff)
+    elif n >= 0:
+        for code, fmt, limit in ((0xcc, ">BB", 0x100), (0xcd, ">BH", 0x10000),
+                                 (0xce, ">BI", 0x100000000), (0xcf, ">BQ", 0x10000000000000000)):
+            if n < limit:
+                out += struct.pack(fmt, code, n)
+                return
+        raise OverflowError("Integer too large for MessagePack")
+    else:
+        for code, fmt, limit in ((0xd0, ">Bb", 0x80), (0xd1, ">Bh", 0x8000),
+                                 (0xd2, ">Bi", 0x80000000), (0xd3, ">Bq", 0x8000000000000000)):
+            if n >= -limit:
+                out += struct.pack(fmt, code, n)
+                return
+        raise OverflowError("Integer too large for MessagePack")
+
+
+# Fixed-size types: first byte -> (struct format, size)
+_FIXED = {
+    0xca: (">f", 4), 0xcb: (">d", 8),
+    0xcc: (">B", 1), 0xcd: (">H", 2), 0xce: (">I", 4), 0xcf: (">Q", 8),
+    0xd0: (">b", 1), 0xd1: (">h", 2), 0xd2: (">i", 4), 0xd3: (">q", 8),
+}
+
+# Variable-size types: first byte -> (kind, length format, length size)
+_SIZED = {
+    0xd9: ("str", ">B", 1), 0xda: ("str", ">H", 2), 0xdb: ("str", ">I", 4),
+    0xc4: ("bin", ">B", 1), 0xc5: ("bin", ">H", 2), 0xc6: ("bin", ">I", 4),
+    0xdc: ("array", ">H", 2), 0xdd: ("array", ">I", 4),
+    0xde: ("map", ">H", 2), 0xdf: ("map", ">I", 4),
+}
+
+
+def _unpack(data, pos):
+    try:
+        first = data[pos]
+    except IndexError:
+        raise ValueError("Truncated MessagePack data") from None
+    pos += 1
+    if first < 0x80:
+        return first, pos
+    if first >= 0xe0:
+        return first - 0x100, pos
+    if first <= 0x8f:
+        return _unpack_map(data, pos, first & 0x0f)
+    if first <= 0x9f:
+        return _unpack_array(data, pos, first & 0x0f)
+    if first <= 0xbf:
+        return _unpack_str(data, pos, first & 0x1f)
+    if first == 0xc0:
+        return None, pos
+    if first in (0xc2, 0xc3):
+        return first == 0xc3, pos
+    if first in _FIXED:
+        fmt, size = _FIXED[first]
+        if pos + size > len(data):
+            raise ValueError("Truncated MessagePack data")
+        return struct.unpack_from(fmt, data, pos)[0], pos + size
+    if first in _SIZED:
+        kind, fmt, size = _SIZED[first]
+        if pos + size > len(data):
+            raise ValueError("Truncated MessagePack data")
+        n = struct.unpack_from(fmt, data, pos)[0]
+        pos += size
+        if kind == "str":
+            return _unpack_str(data, pos, n)
+        if kind == "bin":
+            if pos + n > len(data):
+                raise ValueError("Truncated MessagePack data")
+            return bytes(data[pos:pos + n]), pos + n
+        if kind == "array":
+            return _unpack_array(data, pos, n)
+        return _unpack_map(data, pos, n)
+    raise ValueError(f"Unsupported MessagePack type 0x{first:02x}")
+
+
+def _unpack_str(data, pos, n):
+    if pos + n > len(data):
+        raise ValueError("Truncated MessagePack data")
+    return str(data[pos:pos + n], "utf-8"), pos + n
+
+
+def _unpack_array(data, pos, n):
+    items = []
+    for _ in range(n):
+        item, pos = _unpack(data, pos)
+        items.append(item)
+    return items, pos
+
+
+def _unpack_map(data, pos, n):
+    result = {}
+    for _ in range(n):
+        key, pos = _unpack(data, pos)
+        result[key], pos = _unpack(data, pos)
+    return result, pos
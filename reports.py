@@ -0,0 +1,197 @@
+"""
+Formatted Excel reports, built in a worker process and cached on disk.
+
+Building a styled workbook is CPU-heavy, so it runs in a process pool
+instead of on the request thread, and the finished file is cached under a
+key that includes the data version. Asking for the same report again before
+anything changes returns the cached file immediately; the cache is bounded
+by entry count and total size, evicting the least recently used files.
+"""
+
+import hashlib
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from openpyxl import Workbook
+from openpyxl.styles import Font, Alignment
+
+from feed_schema import FIELDS, HEADERS
+
+FORMATS = {"xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"}
+
+# Same widths as the live feeds.xlsx
+COLUMN_WIDTHS = {"A": 12, "B": 12, "C": 18, "D": 12, "E": 14, "F": 30, "G": 12, "H": 20}
+
+SUMMARY_HEADERS = ["Date", "Feeds", "Bottle (ml)", "Nursing Sessions", "Pump (ml)", "Diaper Changes"]
+
+
+def _style_header(ws):
+    for cell in ws[1]:
+        cell.font = Font(bold=True)
+        cell.alignment = Alignment(horizontal="center")
+    ws.freeze_panes = "A2"
+
+
+def daily_summary(feeds):
+    """Per-day totals, oldest day first (same counting rules as /api/feeds)."""
+    days = {}
+    for feed in feeds:
+        type_str = feed["type"] or ""
+        day = days.setdefault(feed["date"], [0, 0, 0, 0, 0])
+        if "Feed (Bottle" in type_str or "Nurse" in type_str:
+            day[0] += 1
+        if "Feed (Bottle" in type_str and feed["amount_ml"]:
+            day[1] += feed["amount_ml"]
+        if "Nurse" in type_str:
+            day[2] += 1
+        if "Pump" in type_str and feed["amount_ml"]:
+            day[3] += feed["amount_ml"]
+        if "Diaper" in type_str:
+            day[4] += 1
+    return [[date, feeds_count, round(ml, 1), nursing, round(pump, 1), diapers]
+            for date, (feeds_count, ml, nursing, pump, diapers) in sorted(days.items())]
+
+
+def build_report(path, feeds):
+    """Write a styled report workbook to path. Runs in a worker process."""
+    wb = Workbook()
+
+    ws = wb.active
+    ws.title = "Feed Log"
+    ws.append(HEADERS)
+    for feed in feeds:
+        ws.append([feed[field] for field in FIELDS])
+    _style_header(ws)
+    for column, width in COLUMN_WIDTHS.items():
+        ws.column_dimensions[column].width = width
+
+    summary = wb.create_sheet("Daily Summary")
+    summary.append(SUMMARY_HEADERS)
+    for row in daily_summary(feeds):
+        summary.append(row)
+    _style_header(summary)
+    for column in "ABCDEF":
+        summary.column_dimensions[column].width = 16
+
+    wb.save(path)
+    return os.path.getsize(path)
+
+
+class ReportCache:
+    """
+    Report files keyed by (..., data version, range, format), evicted LRU when
+    there are more than max_entries or they add up to more than max_bytes.
+    Identical concurrent requests share one build.
+    """
+
+    def __init__(self, directory=None, max_entries=20, max_bytes=50 * 1024 * 1024, workers=1):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.workers = workers
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (path, size)
+        self._building = {}  # key -> (Future, path)
+        self._owns_directory = directory is None
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def _ensure_ready(self):
+        if self.directory is None:
+            self.directory = tempfile.mkdtemp(prefix="baby_oclock_reports_")
+        os.makedirs(self.directory, exist_ok=True)
+        if self._pool is None:
+            # Not fork: a child forked from a threaded server can inherit a lock another thread held
+            self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                             mp_context=multiprocessing.get_context("spawn"))
+
+    def get(self, key, load_feeds):
+        """
+        Return (path, cached) for key. load_feeds() is only called on a miss,
+        on the request thread and outside the cache's lock, so it doesn't hold
+        up hits; the workbook itself is built in the pool.
+        """
+        rows = None
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry and os.path.exists(entry[0]):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0], True
+
+                building = self._building.get(key)
+                if building is None and rows is not None:
+                    self._ensure_ready()
+                    self.misses += 1
+                    name = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:16]
+                    path = os.path.join(self.directory, f"report-{name}.{key[-1]}")
+                    future = self._pool.submit(build_report, path, rows)
+                    building = self._building[key] = (future, path)
+            if building is not None:
+                break
+            rows = list(load_feeds())
+
+        future, path = building
+        try:
+            size = future.result()
+        finally:
+            with self._lock:
+                self._building.pop(key, None)
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = (path, size)
+                self.total_bytes += size
+                self._evict()
+        return path, False
+
+    def forget(self, scope):
+        """Drop the reports built for a feed file (keys start with its path)."""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == scope]:
+                path, size = self._entries.pop(key)
+                self.total_bytes -= size
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def _evict(self):
+        """Drop least recently used files until within limits (keeping the newest)."""
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes
+        ):
+            _, (path, size) = self._entries.popitem(last=False)
+            self.total_bytes -= size
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def clear(self):
+        with self._lock:
+            for path, _ in self._entries.values():
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def close(self):
+        """Stop the worker pool and delete cached files (run on shutdown)."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        self.clear()
+        if self._owns_directory and self.directory:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self.directory = None
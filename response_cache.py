@@ -0,0 +1,74 @@
+"""
+Cache of fully serialized read responses.
+
+Clients poll /api/feeds and /api/stats far more often than anything is
+logged, so the encoded body is kept per (feed file, endpoint + parameters +
+local date) along with the data version it was built from. A lookup only
+hits at the current version; once a file's version moves on, its older
+entries are dropped, and a late put of a body built at an older version
+(by a request that started before the write) is ignored. The cache is bounded by total size, evicting the least
+recently used bodies.
+"""
+
+import threading
+from collections import OrderedDict
+
+
+class ResponseCache:
+    """Values are (body bytes, extra); only the body counts towards max_bytes."""
+
+    def __init__(self, max_bytes=8 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # (scope, key) -> (version, value)
+        self._versions = {}  # scope -> newest version stored
+        self._lock = threading.Lock()
+
+    def get(self, scope, key, version):
+        with self._lock:
+            entry = self._entries.get((scope, key))
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end((scope, key))
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def put(self, scope, key, version, value):
+        size = len(value[0])
+        with self._lock:
+            newest = self._versions.get(scope, version)
+            if version < newest:
+                return
+            if version != newest:
+                self._invalidate(scope)
+            self._versions[scope] = version
+
+            old = self._entries.pop((scope, key), None)
+            if old is not None:
+                self.total_bytes -= len(old[1][0])
+            if size > self.max_bytes:
+                return
+            self._entries[(scope, key)] = (version, value)
+            self.total_bytes += size
+
+            while self.total_bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.total_bytes -= len(evicted[0])
+
+    def forget(self, scope):
+        """Drop a feed file's entries and version, e.g. when its versions start over."""
+        with self._lock:
+            self._invalidate(scope)
+            self._versions.pop(scope, None)
+
+    def _invalidate(self, scope):
+        """Drop every entry for a feed file."""
+        for entry_key in [k for k in self._entries if k[0] == scope]:
+            _, value = self._entries.pop(entry_key)
+            self.total_bytes -= len(value[0])
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries), "bytes": self.total_bytes}
@@ -0,0 +1,140 @@
+"""
+Statistics over rolling windows ("the last 24 hours") instead of calendar days.
+
+A window is evaluated against the feed table's time-sorted index: two
+bisections find the first and last entry inside it, and a single pass
+between those pointers adds up the totals and the gaps between
+consecutive entries. The cost is proportional to the entries in the
+window, not the whole history. Windows that reach back past the archive
+cutoff merge the archived entries in that range into the pass.
+
+Results are cached per window until the data version changes or the
+clock crosses into the next minute bucket.
+"""
+
+import bisect
+import re
+import threading
+import time
+
+_WINDOW = re.compile(r"^(\d{1,4})([mhd])$")
+_UNIT_SECONDS = {"m": 60, "h": 3600, "d": 86400}
+
+# Longest window accepted
+MAX_WINDOW_SECONDS = 366 * 86400
+
+# Cached results are reused within one bucket of this many seconds
+BUCKET_SECONDS = 60
+
+
+def parse_window(text):
+    """Window length in seconds for "90m", "6h", "24h", "7d". Raises ValueError."""
+    match = _WINDOW.match((text or "").strip())
+    if not match:
+        raise ValueError("window must look like 90m, 6h, 24h or 7d")
+    seconds = int(match.group(1)) * _UNIT_SECONDS[match.group(2)]
+    if not 0 < seconds <= MAX_WINDOW_SECONDS:
+        raise ValueError("window must be between 1 minute and 366 days")
+    return seconds
+
+
+def window_totals(epochs, rows, start, end):
+    """
+    Totals for entries with start < time <= end, given rows sorted by time and
+    their epochs. Same counting rules as GET /api/stats.
+    """
+    lo = bisect.bisect_right(epochs, start)
+    hi = bisect.bisect_right(epochs, end)
+
+    total_ml = 0
+    total_feeds = 0
+    nursing_sessions = 0
+    pump_ml = 0
+    diaper_changes = 0
+    interval_sum = 0.0
+    interval_count = 0
+    previous = None
+
+    for i in range(lo, hi):
+        row = rows[i]
+        type_str = row[2] if isinstance(row[2], str) else ""
+        amount = row[3]
+
+        # Skip Vitamin D entries from feed stats
+        if "Vitamin D" in type_str:
+            continue
+
+        if "Bottle" in type_str:
+            total_feeds += 1
+            if amount:
+                total_ml += amount
+        if "Nurse" in type_str:
+            nursing_sessions += 1
+        if "Pump" in type_str and amount:
+            pump_ml += amount
+        if "Diaper" in type_str:
+            diaper_changes += 1
+
+        # Gap to the previous entry in the window
+        if previous is not None:
+            interval_sum += (epochs[i] - previous) / 60
+            interval_count += 1
+        previous = epochs[i]
+
+    return {
+        "total_ml": round(total_ml, 1),
+        "total_feeds": total_feeds,
+        "total_nursing_sessions": nursing_sessions,
+        "total_pump_ml": round(pump_ml, 1),
+        "avg_feed_interval_min": int(interval_sum / interval_count) if interval_count else None,
+        "total_diaper_changes": diaper_changes,
+        "entries": hi - lo,
+    }
+
+
+class RollingStats:
+    """Window results keyed by (scope, window), valid for one data version and time bucket."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._results = {}
+        self._lock = threading.Lock()
+
+    def forget(self, scope):
+        """Drop a feed file's results, e.g. when its data versions start over."""
+        with self._lock:
+            for key in [key for key in self._results if key[0] == scope]:
+                del self._results[key]
+
+    def get(self, scope, window_seconds, table, now=None, archived=None):
+        """
+        Totals for the window ending now. Caller holds the table's lock (the
+        time index is read in place). archived, if given, is called on a miss
+        with the window's start epoch and returns (epoch, row) pairs for the
+        archived entries that may fall inside it.
+        """
+        now = time.time() if now is None else now
+        bucket = int(now // BUCKET_SECONDS)
+        key = (scope, window_seconds)
+
+        with self._lock:
+            cached = self._results.get(key)
+            if cached is not None and cached[0] == table.version and cached[1] == bucket:
+                self.hits += 1
+                return cached[2]
+            self.misses += 1
+
+        start = now - window_seconds
+        epochs, rows, _ = table.time_index()
+        if archived is not None:
+            lo = bisect.bisect_right(epochs, start)
+            entries = sorted(list(archived(start)) + list(zip(epochs[lo:], rows[lo:])), key=lambda e: e[0])
+            epochs, rows = [e[0] for e in entries], [e[1] for e in entries]
+        totals = window_totals(epochs, rows, start, now)
+
+        with self._lock:
+            if len(self._results) > 256:
+                self._results.clear()
+            self._results[key] = (table.version, bucket, totals)
+        return totals
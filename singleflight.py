@@ -0,0 +1,63 @@
+"""
+Request coalescing for identical concurrent reads.
+
+When several devices open the app at once they ask for the same thing at
+the same data version. The first caller for a key computes the result;
+callers arriving while it runs wait for it and get the same object back
+instead of repeating the work. Nothing is kept once the computation
+finishes, so a later request always sees fresh data.
+"""
+
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    do(key, fn) runs fn once per key at a time. Results are shared between
+    callers and must be treated as read-only.
+    """
+
+    def __init__(self):
+        self.computed = 0
+        self.shared = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        """Return (result, shared): shared is True if another caller computed it."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.shared += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.computed += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def stats(self):
+        return {"computed": self.computed, "shared": self.shared}
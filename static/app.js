@@ -0,0 +1,2028 @@
+/*
+ * The single-page UI in templates/index.html. The page defines API_ROOT,
+ * CHART_WORKER_URL and MSGPACK_URL before loading this script.
+ */
+
+// Feature Flags
+const FEATURE_FLAGS = {
+    VOICE_INPUT_ENABLED: false  // Set to true to enable voice functionality
+};
+
+// State
+let currentWho = localStorage.getItem('currentWho') || 'Mom'; // Persist selection
+let lastCreatedFeedId = null;
+let editingFeedId = null;
+let pumpSelectedSide = null;
+let bottleSelectedSide = null; // New for bottle type
+let voiceParsedData = null;
+let editingFeedDate = null; // Store the original date when editing
+let dataVersion = null; // Version of the feed data last loaded (X-Data-Version)
+let homeRendered = false; // Whether the home screen has been drawn yet
+
+// Speech recognition
+let recognition = null;
+if ('SpeechRecognition' in window || 'webkitSpeechRecognition' in window) {
+    const SpeechRecognition = window.SpeechRecognition || window.webkitSpeechRecognition;
+    recognition = new SpeechRecognition();
+    recognition.continuous = false;
+    recognition.interimResults = true;
+    recognition.lang = 'en-US';
+}
+
+// Elements
+const bottleBtn = document.getElementById('bottleBtn');
+const nurseBtn = document.getElementById('nurseBtn');
+const pumpBtn = document.getElementById('pumpBtn');
+const voiceBtn = document.getElementById('voiceBtn');
+
+const bottleModal = document.getElementById('bottleModal');
+const nurseModal = document.getElementById('nurseModal');
+const pumpModal = document.getElementById('pumpModal');
+const diaperModal = document.getElementById('diaperModal');
+const voiceModal = document.getElementById('voiceModal');
+
+const toast = document.getElementById('toast');
+const toastMessage = document.getElementById('toastMessage');
+const toastUndo = document.getElementById('toastUndo');
+
+// Hide voice button if not supported or disabled
+if (!FEATURE_FLAGS.VOICE_INPUT_ENABLED || !recognition) {
+    voiceBtn.style.display = 'none';
+}
+
+// Who toggle
+document.querySelectorAll('.who-btn').forEach(btn => {
+    btn.addEventListener('click', () => {
+        document.querySelectorAll('.who-btn').forEach(b => b.classList.remove('active'));
+        btn.classList.add('active');
+        currentWho = btn.dataset.who;
+        localStorage.setItem('currentWho', currentWho); // Save to localStorage
+    });
+});
+
+// Initialize who toggle state from localStorage
+document.addEventListener('DOMContentLoaded', () => {
+    const storedWho = localStorage.getItem('currentWho');
+    if (storedWho) {
+        document.querySelectorAll('.who-btn').forEach(btn => {
+            if (btn.dataset.who === storedWho) {
+                btn.classList.add('active');
+                currentWho = storedWho;
+            } else {
+                btn.classList.remove('active');
+            }
+        });
+    }
+});
+
+// Expandable toggles
+document.getElementById('bottleMoreToggle').addEventListener('click', function () {
+    const content = document.getElementById('bottleMoreContent');
+    content.classList.toggle('active');
+    this.textContent = content.classList.contains('active') ? '− Less options' : '+ More options';
+});
+
+document.getElementById('nurseMoreToggle').addEventListener('click', function () {
+    const content = document.getElementById('nurseMoreContent');
+    content.classList.toggle('active');
+    this.textContent = content.classList.contains('active') ? '− Less options' : '+ More options';
+});
+
+document.getElementById('pumpMoreToggle').addEventListener('click', function () {
+    const content = document.getElementById('pumpMoreContent');
+    content.classList.toggle('active');
+    this.textContent = content.classList.contains('active') ? '− Less options' : '+ More options';
+});
+
+document.getElementById('diaperMoreToggle').addEventListener('click', function () {
+    const content = document.getElementById('diaperMoreContent');
+    content.classList.toggle('active');
+    this.textContent = content.classList.contains('active') ? '− Less options' : '+ More options';
+});
+
+// Modal open/close
+bottleBtn.addEventListener('click', () => {
+    editingFeedId = null;
+    editingFeedDate = null;
+    openModal(bottleModal);
+});
+nurseBtn.addEventListener('click', () => {
+    editingFeedId = null;
+    editingFeedDate = null;
+    openModal(nurseModal);
+});
+pumpBtn.addEventListener('click', () => {
+    editingFeedId = null;
+    editingFeedDate = null;
+    openModal(pumpModal);
+});
+document.getElementById('diaperBtn').addEventListener('click', () => {
+    editingFeedId = null;
+    editingFeedDate = null;
+    openModal(diaperModal);
+});
+voiceBtn.addEventListener('click', () => {
+    if (FEATURE_FLAGS.VOICE_INPUT_ENABLED && recognition) {
+        openModal(voiceModal);
+        startVoiceRecognition();
+    }
+});
+
+document.getElementById('bottleCancel').addEventListener('click', () => closeModal(bottleModal));
+document.getElementById('nurseCancel').addEventListener('click', () => closeModal(nurseModal));
+document.getElementById('pumpCancel').addEventListener('click', () => closeModal(pumpModal));
+document.getElementById('diaperCancel').addEventListener('click', () => closeModal(diaperModal));
+document.getElementById('voiceCancel').addEventListener('click', () => {
+    if (recognition) recognition.stop();
+    closeModal(voiceModal);
+});
+
+function openModal(modal, isEdit = false) {
+    modal.classList.add('active');
+    // Reset logic moved to button handlers
+
+
+    // Reset specific modal states
+    if (modal === bottleModal) {
+        initTumblers();
+        // Reset bottle side selection
+        bottleSelectedSide = null;
+        document.querySelectorAll('.bottle-type-btn').forEach(btn => btn.classList.remove('selected'));
+        validateBottleForm(); // Check validation
+
+        // Clear fields
+        document.getElementById('bottleCustomMl').value = '';
+        document.getElementById('bottleDuration').value = '';
+        document.getElementById('bottleNotes').value = '';
+        document.getElementById('bottleSelect').textContent = 'Log Feed';
+
+        // Set time to now
+        const now = new Date();
+        document.getElementById('bottleTime').value =
+            now.getHours().toString().padStart(2, '0') + ':' +
+            now.getMinutes().toString().padStart(2, '0');
+    } else if (modal === nurseModal) {
+        document.getElementById('nurseDuration').value = '';
+        document.getElementById('nurseNotes').value = '';
+        const now = new Date();
+        document.getElementById('nurseTime').value =
+            now.getHours().toString().padStart(2, '0') + ':' +
+            now.getMinutes().toString().padStart(2, '0');
+        document.querySelectorAll('#nurseModal .side-btn').forEach(b => b.classList.remove('selected'));
+    } else if (modal === pumpModal) {
+        pumpSelectedSide = null;
+        document.getElementById('pumpAmountSection').style.display = 'none';
+        document.getElementById('pumpInitialActions').style.display = 'flex';
+        document.getElementById('pumpCustomMl').value = '';
+        document.getElementById('pumpDuration').value = '';
+        document.getElementById('pumpNotes').value = '';
+        const now = new Date();
+        document.getElementById('pumpTime').value =
+            now.getHours().toString().padStart(2, '0') + ':' +
+            now.getMinutes().toString().padStart(2, '0');
+        document.querySelectorAll('#pumpModal .side-btn').forEach(b => b.classList.remove('selected'));
+    } else if (modal === voiceModal) {
+        document.getElementById('voiceTranscript').textContent = '';
+        document.getElementById('voiceParsedSection').style.display = 'none';
+        document.getElementById('voiceConfirm').style.display = 'none';
+        document.getElementById('voiceListening').style.display = 'block';
+    } else if (modal === diaperModal) {
+        document.getElementById('diaperNotes').value = '';
+        const now = new Date();
+        document.getElementById('diaperTime').value =
+            now.getHours().toString().padStart(2, '0') + ':' +
+            now.getMinutes().toString().padStart(2, '0');
+        document.querySelectorAll('#diaperModal .side-btn').forEach(b => b.classList.remove('selected'));
+    }
+}
+
+function closeModal(modal) {
+    modal.classList.remove('active');
+
+    // Reset edit state whenever a modal is closed
+    editingFeedId = null;
+    editingFeedDate = null;
+
+    // Reset button text
+    const bottleBtn = document.getElementById('bottleSelect');
+    if (bottleBtn) bottleBtn.textContent = 'Select';
+
+    const pumpBtn = document.getElementById('pumpSelect');
+    if (pumpBtn) pumpBtn.textContent = 'Select';
+
+    // Hide/Reset Save buttons for Nurse/Diaper
+    const nurseSave = document.getElementById('nurseSave');
+    if (nurseSave) nurseSave.style.display = 'none';
+
+    const diaperSave = document.getElementById('diaperSave');
+    if (diaperSave) diaperSave.style.display = 'none';
+}
+
+document.getElementById('bottleSelect').addEventListener('click', () => {
+    const customMl = parseFloat(document.getElementById('bottleCustomMl').value);
+    const ml = customMl || getTumblerValue('bottle');
+    logFeed('bottle', bottleSelectedSide, ml);
+});
+
+// Nurse side buttons
+document.querySelectorAll('#nurseModal .side-btn').forEach(btn => {
+    btn.addEventListener('click', () => {
+        const side = btn.dataset.side;
+        // Only log immediately if not editing, otherwise wait for Save
+        if (editingFeedId === null) {
+            logFeed('nurse', side);
+        } else {
+            // Just visually select it
+            document.querySelectorAll('#nurseModal .side-btn').forEach(b => b.classList.remove('selected'));
+            btn.classList.add('selected');
+        }
+    });
+});
+
+// Pump side buttons
+document.querySelectorAll('#pumpModal .side-btn').forEach(btn => {
+    btn.addEventListener('click', () => {
+        pumpSelectedSide = btn.dataset.side;
+        document.getElementById('pumpAmountSection').style.display = 'block';
+        document.getElementById('pumpInitialActions').style.display = 'none';
+
+        // Initialize tumbler if not already
+        initTumblers();
+    });
+});
+
+document.getElementById('pumpSelect').addEventListener('click', () => {
+    if (pumpSelectedSide) {
+        const customMl = parseFloat(document.getElementById('pumpCustomMl').value);
+        const ml = customMl || getTumblerValue('pump');
+        logFeed('pump', pumpSelectedSide, ml);
+    }
+});
+
+document.getElementById('pumpCancelInitial').addEventListener('click', () => closeModal(pumpModal));
+
+// Diaper action buttons
+document.querySelectorAll('#diaperModal .side-btn').forEach(btn => {
+    btn.addEventListener('click', () => {
+        const type = btn.dataset.type;
+        if (editingFeedId === null) {
+            logFeed('diaper', type);
+        } else {
+            document.querySelectorAll('#diaperModal .side-btn').forEach(b => b.classList.remove('selected'));
+            btn.classList.add('selected');
+        }
+    });
+});
+
+// Tumbler Logic
+function initTumblers() {
+    // Check if already initialized to avoid duplicate listeners
+    if (document.getElementById('bottleTens').children.length === 0) {
+        createTumbler('bottleTens', 'bottleCustomMl');
+        createTumbler('bottleOnes', 'bottleCustomMl');
+        createTumbler('pumpTens', 'pumpCustomMl');
+        createTumbler('pumpOnes', 'pumpCustomMl');
+    }
+}
+
+function createTumbler(elementId, clearInputId = null) {
+    const container = document.getElementById(elementId);
+    container.innerHTML = ''; // Clear existing
+
+    for (let i = 0; i <= 9; i++) {
+        const item = document.createElement('div');
+        item.className = 'tumbler-item';
+        item.textContent = i;
+        container.appendChild(item);
+    }
+
+    // Resolve input element once if ID provided
+    const inputToClear = clearInputId ? document.getElementById(clearInputId) : null;
+    const clearInput = () => {
+        if (inputToClear && inputToClear.value !== '') {
+            inputToClear.value = '';
+        }
+    };
+
+    // Scroll listener purely for haptic feedback potential or active class updates (optional)
+    // For now, relies on CSS scroll-snap
+    container.addEventListener('scroll', () => {
+        const scrollTop = container.scrollTop;
+        const index = Math.round(scrollTop / 60);
+
+        // Update active state
+        const items = container.querySelectorAll('.tumbler-item');
+        items.forEach((item, i) => {
+            if (i === index) item.classList.add('active');
+            else item.classList.remove('active');
+        });
+
+        // Clear input on scroll
+        clearInput();
+    });
+
+    // Also clear on direct interaction
+    container.addEventListener('click', clearInput);
+    container.addEventListener('touchstart', clearInput, { passive: true });
+
+    // Trigger initial active state
+    const items = container.querySelectorAll('.tumbler-item');
+    if (items.length > 0) items[0].classList.add('active');
+}
+
+function getTumblerValue(prefix) {
+    const tensEl = document.getElementById(prefix + 'Tens');
+    const onesEl = document.getElementById(prefix + 'Ones');
+
+    const tens = Math.round(tensEl.scrollTop / 60);
+    const ones = Math.round(onesEl.scrollTop / 60);
+
+    // Bounds check
+    return (Math.min(9, Math.max(0, tens)) * 10) + Math.min(9, Math.max(0, ones));
+}
+
+// Helper to get HH:MM AM/PM from Date object
+function formatTime(date) {
+    let hours = date.getHours();
+    const minutes = date.getMinutes().toString().padStart(2, '0');
+    const ampm = hours >= 12 ? 'PM' : 'AM';
+    hours = hours % 12;
+    hours = hours ? hours : 12; // the hour '0' should be '12'
+    return `${hours}:${minutes} ${ampm}`;
+}
+
+// Helper to get time string from ISO string
+function getTimeFromIso(isoString) {
+    const date = new Date(isoString);
+    return date.getHours().toString().padStart(2, '0') + ':' +
+        date.getMinutes().toString().padStart(2, '0');
+}
+
+// Helper to construct ISO string from date and time input
+function constructTimestamp(dateStr, timeInputStr) {
+    if (!timeInputStr) return new Date().toISOString();
+
+    // dateStr should be YYYY-MM-DD
+    // timeInputStr should be HH:MM
+
+    const [hours, minutes] = timeInputStr.split(':').map(Number);
+
+    let date;
+    if (dateStr) {
+        // Parse date parts to avoid timezone issues
+        const [year, month, day] = dateStr.split('-').map(Number);
+        date = new Date(year, month - 1, day);
+    } else {
+        date = new Date();
+    }
+
+    date.setHours(hours);
+    date.setMinutes(minutes);
+    date.setSeconds(0);
+    date.setMilliseconds(0);
+
+    return date.toISOString();
+}
+
+// Log feed
+async function logFeed(type, side = null, amountMl = null) {
+    let duration = null;
+    let notes = '';
+    let timeStr = '';
+
+    // Get optional fields based on type
+    if (type === 'bottle') {
+        if (!amountMl) {
+            amountMl = parseFloat(document.getElementById('bottleCustomMl').value) || null;
+        }
+        duration = parseInt(document.getElementById('bottleDuration').value) || null;
+        notes = document.getElementById('bottleNotes').value || '';
+        timeStr = document.getElementById('bottleTime').value;
+    } else if (type === 'nurse') {
+        duration = parseInt(document.getElementById('nurseDuration').value) || null;
+        notes = document.getElementById('nurseNotes').value || '';
+        timeStr = document.getElementById('nurseTime').value;
+    } else if (type === 'pump') {
+        if (!amountMl) {
+            amountMl = parseFloat(document.getElementById('pumpCustomMl').value) || null;
+        }
+        duration = parseInt(document.getElementById('pumpDuration').value) || null;
+        notes = document.getElementById('pumpNotes').value || '';
+        timeStr = document.getElementById('pumpTime').value;
+    } else if (type === 'diaper') {
+        notes = document.getElementById('diaperNotes').value || '';
+        timeStr = document.getElementById('diaperTime').value;
+    }
+
+    // Construct timestamp
+    // If editing, use the original date + new time
+    // If new, use current date + new time
+    const dateBase = editingFeedId !== null ? editingFeedDate : new Date().toLocaleDateString('en-CA');
+    const timestamp = constructTimestamp(dateBase, timeStr);
+
+    const feedData = {
+        type: type,
+        side: side,
+        amount_ml: amountMl,
+        duration_min: duration,
+        notes: notes,
+        logged_by: currentWho,
+        timestamp: timestamp
+    };
+
+    try {
+        let url = API_ROOT + '/api/feeds';
+        let method = 'POST';
+        if (editingFeedId !== null) {
+            url = `${API_ROOT}/api/feeds/${editingFeedId}`;
+            method = 'PUT';
+        }
+
+        const headers = { 'Content-Type': 'application/json' };
+        if (method === 'POST') headers['Idempotency-Key'] = requestKey('feed');
+
+        let response;
+        try {
+            response = await fetch(url, {
+                method: method,
+                headers: headers,
+                body: JSON.stringify(feedData)
+            });
+        } catch (networkError) {
+            // No connection: new entries wait in the outbox, edits can't
+            if (method !== 'POST') throw networkError;
+            settleRequestKey('feed');
+            await queueOffline(feedData, buildFeedSummary(type, side, amountMl, duration));
+            return;
+        }
+
+        const result = await response.json();
+        if (method === 'POST') settleRequestKey('feed', response);
+
+        if (result.success) {
+            if (method === 'POST') lastCreatedFeedId = result.id;
+
+            closeFeedModals();
+
+            // Show toast
+            // Only show undo for NEW feeds (POST), not edits (PUT)
+            showToast(buildFeedSummary(type, side, amountMl, duration), method === 'POST');
+
+            // Refresh feeds
+            loadFeeds();
+            if (method === 'PUT') olderHistory.refresh();
+        }
+    } catch (error) {
+        console.error('Error logging feed:', error);
+        showToast('Error logging feed', false);
+    }
+}
+
+function closeFeedModals() {
+    closeModal(bottleModal);
+    closeModal(nurseModal);
+    closeModal(pumpModal);
+    closeModal(diaperModal);
+    closeModal(voiceModal);
+}
+
+function buildFeedSummary(type, side, amountMl, duration) {
+    let summary = '';
+    if (type === 'bottle') {
+        summary = '🍼 Bottle';
+        if (side === 'formula') summary += ' (Formula)';
+        else if (side === 'milk') summary += ' (Milk)';
+    } else if (type === 'nurse') {
+        summary = '🤱 Nurse';
+        if (side) summary += ` (${side})`;
+    } else if (type === 'pump') {
+        summary = '💧 Pump';
+        if (side) summary += ` (${side})`;
+    } else if (type === 'diaper') {
+        summary = '🍑 Diaper';
+        if (side) summary += ` (${side})`;
+    }
+
+    if (amountMl) summary += ` — ${amountMl} ml`;
+    if (duration) summary += ` — ${duration} min`;
+
+    return summary + ' logged';
+}
+
+// New functions for bottle selection
+function selectBottleType(type) {
+    bottleSelectedSide = type;
+    document.querySelectorAll('.bottle-type-btn').forEach(btn => {
+        if (btn.dataset.type === type) btn.classList.add('selected');
+        else btn.classList.remove('selected');
+    });
+    validateBottleForm();
+}
+
+function validateBottleForm() {
+    const selectBtn = document.getElementById('bottleSelect');
+    if (bottleSelectedSide) {
+        selectBtn.disabled = false;
+        selectBtn.style.opacity = '1';
+        selectBtn.textContent = editingFeedId ? 'Save Changes' : 'Log Feed';
+    } else {
+        selectBtn.disabled = true;
+        selectBtn.style.opacity = '0.5';
+        selectBtn.textContent = 'Select Milk or Formula';
+    }
+}
+
+// Toast
+let toastTimeout = null;
+function showToast(message, showUndo = false) {
+    clearTimeout(toastTimeout);
+
+    toastMessage.textContent = message;
+    toastUndo.style.display = showUndo ? 'block' : 'none';
+    toast.classList.add('active');
+
+    toastTimeout = setTimeout(() => {
+        toast.classList.remove('active');
+        lastCreatedFeedId = null;
+    }, 5000);
+}
+
+// Undo
+toastUndo.addEventListener('click', async () => {
+    if (lastCreatedFeedId !== null) {
+        try {
+            const response = await fetch(`${API_ROOT}/api/feeds/${lastCreatedFeedId}`, {
+                method: 'DELETE'
+            });
+
+            const result = await response.json();
+
+            if (result.success) {
+                toast.classList.remove('active');
+                lastCreatedFeedId = null;
+                loadFeeds();
+            }
+        } catch (error) {
+            console.error('Error undoing feed:', error);
+        }
+    }
+});
+
+// Load feeds
+async function loadFeeds() {
+    let data;
+    try {
+        // Fetch 7 days of history as per requirements, together with
+        // today's stats and the vitamin status (one request per refresh)
+        const response = await fetch(API_ROOT + '/api/home?limit_days=7');
+        if (!response.ok) throw new Error(`HTTP ${response.status}`);
+        data = await response.json();
+        dataVersion = response.headers.get('X-Data-Version');
+    } catch (error) {
+        // Offline: keep what's on screen, or draw the copy saved on this device
+        console.error('Error loading feeds:', error);
+        renderSavedHome();
+        return;
+    }
+
+    offlineStore.putSnapshot('home', { data, savedAt: Date.now() }).catch(() => {});
+    renderHome(data);
+    syncOutbox();
+}
+
+// The home screen saved by the last successful load, with its timers
+// moved on to now. Only drawn if nothing is on screen yet.
+async function renderSavedHome() {
+    let saved;
+    try {
+        saved = await offlineStore.getSnapshot('home');
+    } catch (error) {
+        return; // No IndexedDB (e.g. some private browsing modes)
+    }
+    if (!saved || homeRendered) return;
+
+    const elapsed = Math.floor((Date.now() - saved.savedAt) / 60000);
+    const data = Object.assign({}, saved.data);
+    if (data.last_feed_minutes_ago !== null) data.last_feed_minutes_ago += elapsed;
+    if (data.last_diaper_minutes_ago !== null) data.last_diaper_minutes_ago += elapsed;
+    renderHome(data);
+}
+
+// Draw the home screen from a GET /api/home response
+function renderHome(data) {
+    homeRendered = true;
+    try {
+        currentFeeds = data.feeds; // Store feeds globally
+
+        // Update last feed
+        const lastFeedContainer = document.getElementById('lastFeedContainer');
+        if (data.last_feed_minutes_ago !== null) {
+            const timeAgo = formatTimeAgo(data.last_feed_minutes_ago);
+            lastFeedContainer.innerHTML = `
+                <div class="last-feed-time">${timeAgo}</div>
+                <div class="last-feed-details">${data.last_feed_summary}</div>
+            `;
+        } else {
+            lastFeedContainer.innerHTML = '<div class="last-feed-none">No feeds logged today</div>';
+        }
+
+        // Display last diaper change timer
+        if (data.last_diaper_minutes_ago !== null) {
+            const hours = Math.floor(data.last_diaper_minutes_ago / 60);
+            const mins = data.last_diaper_minutes_ago % 60;
+            let timeStr = hours > 0 ? `${hours}h ${mins}m ago` : `${mins}m ago`;
+
+            lastFeedContainer.innerHTML += `
+                <div style="margin-top: 16px; padding-top: 16px; border-top: 1px solid #404554;">
+                    <div style="font-size: 14px; color: #a8adb8;">Last diaper change</div>
+                    <div style="font-size: 24px; font-weight: 600; color: #9C87E8; margin-top: 4px;">
+                        ${timeStr}
+                    </div>
+                    <div style="font-size: 13px; color: #8a8f9e; margin-top: 2px;">
+                        ${data.last_diaper_summary}
+                    </div>
+                </div>
+            `;
+        }
+
+        // --- Next Feed Timer Logic ---
+        // Find most recent FEED (not diaper, not vitamin, NOT Pump) to calc next feed time
+        let lastFeedObj = null;
+        for (const feed of data.feeds) {
+            const type = feed.type.toLowerCase();
+            // Must be Bottle or Nurse (exclude Pump, Diaper, Vitamin)
+            if (type.includes('bottle') || type.includes('nurse')) {
+                lastFeedObj = feed;
+                break;
+            }
+        }
+
+        if (lastFeedObj) {
+            const lastFeedTime = new Date(lastFeedObj.timestamp);
+            const nextFeedTime = new Date(lastFeedTime.getTime() + 3 * 60 * 60 * 1000); // +3 hours
+            const now = new Date();
+            const diffMs = nextFeedTime - now;
+            const diffMins = Math.floor(diffMs / 60000);
+
+            let label = "Next feed in";
+            let valueClass = "next-feed-value";
+            let timeText = "";
+
+            if (diffMins < 0) {
+                label = "Next feed overdue by";
+                valueClass += " overdue";
+                timeText = formatTimeAgo(Math.abs(diffMins));
+            } else {
+                const h = Math.floor(diffMins / 60);
+                const m = diffMins % 60;
+                if (h > 0) timeText = `${h}h ${m}m`;
+                else timeText = `${m}m`;
+            }
+
+            // Append to container
+            lastFeedContainer.innerHTML += `
+                <div class="next-feed-timer">
+                    <div class="next-feed-label">${label}</div>
+                    <div class="${valueClass}">${timeText}</div>
+                    <div style="font-size: 13px; color: #8a8f9e; margin-top: 2px;">
+                        Target: ${formatTime(nextFeedTime)}
+                    </div>
+                </div>
+            `;
+        }
+
+
+        // --- Daily Goal Logic ---
+        // Filter feeds for TODAY (Local client time)
+        const nowLocal = new Date();
+        const year = nowLocal.getFullYear();
+        const month = String(nowLocal.getMonth() + 1).padStart(2, '0');
+        const day = String(nowLocal.getDate()).padStart(2, '0');
+        const todayKey = `${year}-${month}-${day}`;
+
+        // Calculate today's total ml
+        let todayMl = 0;
+        // create map if not exists
+        const groupsForGoal = groupFeedsByDate(data.feeds);
+        const todayFeeds = groupsForGoal[todayKey] || [];
+        todayFeeds.forEach(f => {
+            // Only count Bottle feeds (Milk/Formula)
+            // Exclude Pump, Nurse, Vitamin D
+            if (f.amount_ml && f.type.includes('Bottle') && !f.type.includes('Vitamin D')) {
+                todayMl += f.amount_ml;
+            }
+        });
+
+        // Update UI
+        const goalContainer = document.getElementById('dailyGoalContainer');
+        const goalValue = document.getElementById('dailyGoalValue');
+        const goalBar = document.getElementById('dailyGoalBar');
+        const goalStatus = document.getElementById('dailyGoalStatus');
+
+        goalContainer.style.display = 'block';
+        goalValue.textContent = `${Math.round(todayMl)} / 500 ml`;
+
+        // Calculate percentage (max 100 for width)
+        const percentage = Math.min(100, Math.max(5, (todayMl / 500) * 100)); // Min 5% so bar is visible
+        goalBar.style.width = `${percentage}%`;
+
+        // Classes
+        // Classes
+        goalBar.className = 'progress-bar-fill'; // Reset
+        let statusText = "";
+
+        if (todayMl >= 500) {
+            goalBar.classList.add('great');
+            statusText = "🎉 Goal Met!";
+        } else if (todayMl >= 450) {
+            goalBar.classList.add('great'); // Purple glow range
+            statusText = "💜 Almost there!";
+        } else if (todayMl >= 400) {
+            statusText = "✅ Minimum met";
+        } else if (todayMl >= 200) {
+            statusText = "On track";
+        } else {
+            statusText = "Keep going";
+        }
+        goalStatus.textContent = statusText;
+
+        // Update stats
+        const statsText = document.getElementById('statsText');
+        statsText.textContent = `${data.total_feeds_today} feeds • ${data.total_ml_today} ml`;
+
+        // Update feed list
+        // Update stats (global or just today?)
+        // API returns stats for "today" in top level fields still?
+        // Actually `total_feeds_today` comes from `get_feeds`.
+        // If we request limit_days, the backend calculates stats based on returned feeds?
+        // Wait, backend `get_feeds`:
+        // total_ml_today calculated from `feeds`. If `feeds` has 7 days, it sums 7 days?
+        // Let's verify backend logic.
+        // Backend: "for feed in feeds: total_ml_today += feed['amount_ml']"
+        // YES! Backend sums everything in the response!
+        // We likely want to calculate "Today's" stats in JS now if the API returns 7 days.
+        // Or we accept that "Today's Log" stats at the top might be misleading if we don't filter.
+        // Let's filter on frontend for the top stats.
+
+        // Filter feeds for today for stats
+        const todayStr = new Date().toLocaleDateString('en-CA'); // YYYY-MM-DD in local time (approx)
+        // Actually backend returns YYYY-MM-DD.
+        // Let's use the first group if it matches today.
+
+        // Group feeds
+        const groups = groupFeedsByDate(data.feeds);
+        const sortedDates = Object.keys(groups).sort().reverse();
+
+        // Render: only the days and entries that changed touch the page
+        const historyGroups = sortedDates.map(date => describeDay(date, groups[date]));
+        historyList.render(historyGroups,
+            '<div class="empty-state">No feeds logged in the last 7 days.<br>Tap a button above to start tracking!</div>');
+
+        // Older days continue below, from the oldest day shown (or today if none)
+        olderHistory.reset(sortedDates.length ? sortedDates[sortedDates.length - 1] : new Date().toLocaleDateString('en-CA'));
+
+        if (data.feeds.length > 0) {
+            // Update main stats text to show TODAY's stats specifically
+            // We can match "todayStr" from backend format.
+            // Actually, let's grab the group for today.
+            // The backend `total_ml_today` is now "Total ML in response".
+            // We should recalculate Today's stats here or update backend to separate them.
+            // Easiest is JS recalc.
+            // We effectively did it above for the group header.
+            // Let's update the global stats text if "Today" exists.
+            // Get today's date string from backend response? No, construct it.
+            // Backend returns `feed.date` as "YYYY-MM-DD".
+            // We need to match that.
+            // Just find the group that isToday.
+
+            // Find today group
+            // Helper to get YYYY-MM-DD local
+            const now = new Date();
+            const year = now.getFullYear();
+            const month = String(now.getMonth() + 1).padStart(2, '0');
+            const day = String(now.getDate()).padStart(2, '0');
+            const todayKey = `${year}-${month}-${day}`;
+
+            const todayGroup = groups[todayKey] || [];
+            let todayMl = 0;
+            let todayFeedCount = 0;
+            todayGroup.forEach(f => {
+                // Only count Bottle and Nurse as "feeds"
+                if (f.type.includes('Feed (Bottle') || f.type.includes('Nurse')) {
+                    todayFeedCount++;
+                }
+                // Only sum ml from Bottle feeds (baby's intake, not pump output)
+                if (f.type.includes('Feed (Bottle') && f.amount_ml) {
+                    todayMl += f.amount_ml;
+                }
+            });
+
+            // const statsText = document.getElementById('statsText');
+            statsText.textContent = `${todayFeedCount} feeds • ${Math.round(todayMl)} ml (Today)`;
+        }
+
+        // Vitamin status arrives with the feeds
+        renderVitaminStatus(data.vitamin);
+    } catch (error) {
+        console.error('Error rendering feeds:', error);
+    }
+}
+
+// Entries logged offline: how many are waiting, and sending them
+const offlineStore = new OfflineStore(API_ROOT);
+const outbox = new Outbox(offlineStore, API_ROOT);
+
+/*
+ * Idempotency keys for new entries. An entry keeps its key until the
+ * server has answered for it, so a double tap or a retry after a
+ * server error is written once (run_idempotent in app.py); the next
+ * entry gets a new key.
+ */
+const requestKeys = {};
+
+function requestKey(action) {
+    if (!requestKeys[action]) requestKeys[action] = newIdempotencyKey();
+    return requestKeys[action];
+}
+
+function settleRequestKey(action, response) {
+    if (!response || response.status < 500) delete requestKeys[action];
+}
+
+async function queueOffline(feedData, summary) {
+    await offlineStore.queue(feedData);
+    closeFeedModals();
+    showToast(`${summary} • saved offline, will sync`, false);
+    updateOutboxStatus();
+    // Let the service worker send it even if the page is closed first
+    if ('serviceWorker' in navigator) {
+        navigator.serviceWorker.ready
+            .then(registration => registration.sync && registration.sync.register('outbox'))
+            .catch(() => {});
+    }
+}
+
+async function updateOutboxStatus() {
+    const status = document.getElementById('outboxStatus');
+    let count = 0;
+    let rejected = 0;
+    try {
+        count = await offlineStore.pendingCount();
+        rejected = (await offlineStore.rejectedEntries()).length;
+    } catch (error) {
+        // No IndexedDB: nothing can be queued either
+    }
+    const lines = [];
+    if (count > 0) lines.push(`⏳ ${count} ${count === 1 ? 'entry' : 'entries'} waiting to sync`);
+    if (rejected > 0) lines.push(`⚠️ ${rejected} offline ${rejected === 1 ? 'entry was' : 'entries were'} rejected (tap to review)`);
+    status.style.display = lines.length > 0 ? 'block' : 'none';
+    status.style.cursor = rejected > 0 ? 'pointer' : '';
+    status.textContent = lines.join(' • ');
+}
+
+// Shows the entries the server rejected after an offline sync, and lets
+// the user dismiss them once they've been logged again by hand
+async function reviewRejectedEntries() {
+    const rejected = await offlineStore.rejectedEntries();
+    if (rejected.length === 0) return;
+    const lines = rejected.map(item => {
+        const when = item.feed.timestamp ? new Date(item.feed.timestamp).toLocaleString() : 'unknown time';
+        return `• ${item.feed.type || 'entry'} at ${when}: ${item.error || 'rejected'}`;
+    });
+    if (confirm(`These entries logged offline were not saved:\n\n${lines.join('\n')}\n\nDismiss them?`)) {
+        await offlineStore.clearRejected();
+        updateOutboxStatus();
+    }
+}
+
+document.getElementById('outboxStatus').addEventListener('click', reviewRejectedEntries);
+
+function outboxSynced(delivered, rejected) {
+    updateOutboxStatus();
+    if (rejected > 0) showToast(`${rejected} offline ${rejected === 1 ? 'entry was' : 'entries were'} rejected`, false);
+    if (delivered > 0) loadFeeds();
+}
+
+async function syncOutbox() {
+    let counts = { delivered: 0, rejected: 0 };
+    try {
+        counts = await outbox.sync();
+    } catch (error) {
+        console.error('Error syncing offline entries:', error);
+    }
+    outboxSynced(counts.delivered, counts.rejected);
+}
+
+window.addEventListener('online', syncOutbox);
+
+const historyList = new HistoryList(document.getElementById('feedList'));
+
+const olderHistory = new PagedHistory(
+    document.getElementById('olderFeedList'),
+    async before => (await fetch(`${API_ROOT}/api/feeds?limit=100&before=${before}`)).json(),
+    describeDay);
+
+// A day group for the history lists
+function describeDay(date, dayFeeds) {
+    const isRecent = isDateToday(date) || isDateYesterday(date);
+
+    // Recalculate stats for this group (only Bottle and Nurse feeds)
+    let groupMl = 0;
+    let groupCount = 0;
+    dayFeeds.forEach(f => {
+        // Only count Bottle and Nurse as "feeds"
+        if (f.type.includes('Feed (Bottle') || f.type.includes('Nurse')) {
+            groupCount++;
+        }
+        // Only sum ml from Bottle feeds (baby's intake, not pump output)
+        if (f.type.includes('Feed (Bottle') && f.amount_ml) {
+            groupMl += f.amount_ml;
+        }
+    });
+
+    return {
+        key: date,
+        label: formatDateLabel(date),
+        stats: `${groupCount} feeds • ${Math.round(groupMl)} ml`,
+        open: isRecent,
+        highlight: isRecent,
+        items: dayFeeds.map(feed => ({ key: feedKey(feed), html: renderFeedItem(feed) }))
+    };
+}
+
+// Archived entries have no id; their timestamp identifies them within a day
+function feedKey(feed) {
+    return feed.id !== null ? `id:${feed.id}` : `archived:${feed.timestamp}`;
+}
+
+function groupFeedsByDate(feeds) {
+    const groups = {};
+    feeds.forEach(feed => {
+        if (!groups[feed.date]) groups[feed.date] = [];
+        groups[feed.date].push(feed);
+    });
+    return groups;
+}
+
+function isDateToday(dateStr) {
+    const now = new Date();
+    const year = now.getFullYear();
+    const month = String(now.getMonth() + 1).padStart(2, '0');
+    const day = String(now.getDate()).padStart(2, '0');
+    return dateStr === `${year}-${month}-${day}`;
+}
+
+function isDateYesterday(dateStr) {
+    const yester = new Date();
+    yester.setDate(yester.getDate() - 1);
+    const year = yester.getFullYear();
+    const month = String(yester.getMonth() + 1).padStart(2, '0');
+    const day = String(yester.getDate()).padStart(2, '0');
+    return dateStr === `${year}-${month}-${day}`;
+}
+
+function formatDateLabel(dateStr) {
+    if (isDateToday(dateStr)) return 'Today';
+    if (isDateYesterday(dateStr)) return 'Yesterday';
+
+    // Format as "Monday, 02/10"
+    const parts = dateStr.split('-');
+    // parts[0] is year, parts[1] is month, parts[2] is day
+    // Construct date object safely (avoid timezone shifts)
+    const dateObj = new Date(parts[0], parts[1] - 1, parts[2]);
+    const options = { weekday: 'long', month: 'numeric', day: 'numeric' };
+    return dateObj.toLocaleDateString('en-US', options);
+}
+
+function renderFeedItem(feed) {
+    const isVitamin = feed.type.includes('Vitamin D');
+    // Archived entries are read-only
+    const editBtn = (isVitamin || feed.archived) ? '' : `<button class="feed-edit" onclick="editFeed(${feed.id})">✎</button>`;
+    const deleteBtn = feed.archived ? '' : `<button class="feed-delete" onclick="deleteFeed(${feed.id})">×</button>`;
+
+    return `
+        <div class="feed-item">
+            <div class="feed-info">
+                <div class="feed-time">${feed.time}</div>
+                <div class="feed-details">${buildFeedDetailsText(feed)}</div>
+            </div>
+            ${editBtn}
+            ${deleteBtn}
+        </div>
+    `;
+}
+
+
+function buildFeedDetailsText(feed) {
+    // Special display for Vitamin D entries
+    if (feed.type.includes('Vitamin D')) {
+        const administered = feed.notes === 'No' ? ' — Missed' : '';
+        const who = feed.notes === 'No' ? 'Auto-logged' : (feed.logged_by || '');
+        return `☀️ Vitamin D${administered}${who ? ' • ' + who : ''}`;
+    }
+
+    let details = feed.type
+        .replace('Feed (Bottle - Formula)', '🍼 Bottle (Formula)')
+        .replace('Feed (Bottle - Milk)', '🍼 Bottle (Milk)')
+        .replace('Feed (Bottle)', '🍼 Bottle'); // Old data fall back
+
+    if (feed.amount_ml) details += ` • ${feed.amount_ml} ml`;
+    if (feed.duration_min) details += ` • ${feed.duration_min} min`;
+    if (feed.logged_by) details += ` • ${feed.logged_by}`;
+    return details;
+}
+
+function editFeed(feedId) {
+    // Find feed in current data
+    const feed = currentFeeds.find(f => f.id === feedId) || olderHistory.findFeed(feedId);
+    if (!feed) return;
+
+    editingFeedId = feedId;
+    const originalType = feed.type.toLowerCase();
+
+    // Store original date for timestamp reconstruction
+    if (feed.timestamp) {
+        // feed.timestamp is ISO string
+        // Extract YYYY-MM-DD
+        editingFeedDate = feed.timestamp.split('T')[0];
+    } else {
+        // Fallback to today if missing (shouldn't happen)
+        editingFeedDate = new Date().toLocaleDateString('en-CA');
+    }
+
+    // Get time string HH:MM
+    const timeStr = feed.timestamp ? getTimeFromIso(feed.timestamp) : '';
+
+    // Determine type and side/state
+    let type = originalType;
+    let side = null;
+
+    if (originalType.includes('bottle')) {
+        type = 'bottle';
+    } else if (originalType.includes('nurse')) {
+        type = 'nurse';
+        if (originalType.includes('left')) side = 'left';
+        else if (originalType.includes('right')) side = 'right';
+        else if (originalType.includes('both')) side = 'both';
+    } else if (originalType.includes('pump')) {
+        type = 'pump';
+        if (originalType.includes('left')) side = 'left';
+        else if (originalType.includes('right')) side = 'right';
+        else if (originalType.includes('both')) side = 'both';
+    } else if (originalType.includes('diaper')) {
+        type = 'diaper';
+        if (originalType.includes('pee')) side = 'pee';
+        else if (originalType.includes('poop')) side = 'poop';
+        else if (originalType.includes('both')) side = 'both';
+    }
+
+    // Open modal and pre-fill
+    if (type === 'bottle') {
+        openModal(bottleModal, true);
+        // Set amount
+        if (feed.amount_ml) {
+            setTimeout(() => setTumblerValue('bottle', feed.amount_ml), 10);
+            document.getElementById('bottleCustomMl').value = feed.amount_ml;
+        }
+        // Set other fields
+        if (feed.duration_min) document.getElementById('bottleDuration').value = feed.duration_min;
+        if (feed.notes) document.getElementById('bottleNotes').value = feed.notes;
+        if (timeStr) document.getElementById('bottleTime').value = timeStr;
+
+        // Set type (Backward compatibility: if plain 'Feed (Bottle)', force selection)
+        if (originalType.includes('formula')) {
+            selectBottleType('formula');
+        } else if (originalType.includes('milk')) {
+            selectBottleType('milk');
+        } else {
+            // Pre-select nothing, force user to choose to save
+            validateBottleForm(); // Will disable button
+        }
+
+        // Change button to "Save Changes"
+        // handled in validateBottleForm()
+    } else if (type === 'nurse') {
+        openModal(nurseModal, true);
+        // Set side selection
+        document.querySelectorAll('#nurseModal .side-btn').forEach(btn => {
+            if (btn.dataset.side === side) btn.classList.add('selected');
+            else btn.classList.remove('selected');
+        });
+        // Set other fields
+        if (feed.duration_min) document.getElementById('nurseDuration').value = feed.duration_min;
+        if (feed.notes) document.getElementById('nurseNotes').value = feed.notes;
+        if (timeStr) document.getElementById('nurseTime').value = timeStr;
+
+        // Add Save button if not exists (Nurse modal is usually instant)
+        let saveBtn = document.getElementById('nurseSave');
+        if (!saveBtn) {
+            saveBtn = document.createElement('button');
+            saveBtn.id = 'nurseSave';
+            saveBtn.className = 'modal-btn';
+            saveBtn.textContent = 'Save Changes';
+            saveBtn.onclick = () => {
+                const selectedSide = document.querySelector('#nurseModal .side-btn.selected');
+                if (selectedSide) logFeed('nurse', selectedSide.dataset.side);
+            };
+            document.querySelector('#nurseModal .modal-actions').appendChild(saveBtn);
+        }
+        saveBtn.style.display = 'block';
+
+    } else if (type === 'pump') {
+        openModal(pumpModal, true);
+        // Set side
+        pumpSelectedSide = side;
+        document.querySelectorAll('#pumpModal .side-btn').forEach(btn => {
+            if (btn.dataset.side === side) btn.classList.add('selected');
+            else btn.classList.remove('selected');
+        });
+
+        // Show amount section immediately
+        document.getElementById('pumpInitialActions').style.display = 'none';
+        document.getElementById('pumpAmountSection').style.display = 'block';
+        initTumblers(); // Ensure tumblers exist
+
+        // Set amount
+        if (feed.amount_ml) {
+            // Need a small timeout for tumblers to render if they were just created
+            setTimeout(() => setTumblerValue('pump', feed.amount_ml), 10);
+            document.getElementById('pumpCustomMl').value = feed.amount_ml;
+        }
+
+        if (feed.duration_min) document.getElementById('pumpDuration').value = feed.duration_min;
+        if (feed.notes) document.getElementById('pumpNotes').value = feed.notes;
+        if (timeStr) document.getElementById('pumpTime').value = timeStr;
+
+        const selectBtn = document.getElementById('pumpSelect');
+        selectBtn.textContent = 'Save Changes';
+
+    } else if (type === 'diaper') {
+        openModal(diaperModal, true);
+        // Set type selection
+        document.querySelectorAll('#diaperModal .side-btn').forEach(btn => {
+            if (btn.dataset.type === side) btn.classList.add('selected');
+            else btn.classList.remove('selected');
+        });
+
+        if (feed.notes) document.getElementById('diaperNotes').value = feed.notes;
+        if (timeStr) document.getElementById('diaperTime').value = timeStr;
+
+        // Add Save button
+        let saveBtn = document.getElementById('diaperSave');
+        if (!saveBtn) {
+            saveBtn = document.createElement('button');
+            saveBtn.id = 'diaperSave';
+            saveBtn.className = 'modal-btn';
+            saveBtn.textContent = 'Save Changes';
+            saveBtn.onclick = () => {
+                const selectedType = document.querySelector('#diaperModal .side-btn.selected');
+                if (selectedType) logFeed('diaper', selectedType.dataset.type);
+            };
+            document.querySelector('#diaperModal .modal-actions').appendChild(saveBtn);
+        }
+        saveBtn.style.display = 'block';
+    }
+}
+
+function formatTimeAgo(minutes) {
+    if (minutes < 1) return 'Just now';
+    if (minutes < 60) return `${Math.floor(minutes)} min ago`;
+    const hours = Math.floor(minutes / 60);
+    const mins = minutes % 60;
+    if (hours === 1) return mins > 0 ? `${hours} hr ${Math.floor(mins)} min ago` : `${hours} hr ago`;
+    return mins > 0 ? `${hours} hrs ${Math.floor(mins)} min ago` : `${hours} hrs ago`;
+}
+
+async function deleteFeed(feedId) {
+    if (!confirm('Delete this entry?')) return;
+
+    try {
+        const response = await fetch(`${API_ROOT}/api/feeds/${feedId}`, {
+            method: 'DELETE'
+        });
+
+        const result = await response.json();
+
+        if (result.success) {
+            loadFeeds(); // This also refreshes the vitamin status
+            olderHistory.refresh();
+        }
+    } catch (error) {
+        console.error('Error deleting feed:', error);
+    }
+}
+
+// Voice recognition
+function startVoiceRecognition() {
+    if (!recognition) return;
+
+    voiceParsedData = null;
+    document.getElementById('voiceTranscript').textContent = '';
+    document.getElementById('voiceParsedSection').style.display = 'none';
+    document.getElementById('voiceConfirm').style.display = 'none';
+
+    recognition.start();
+
+    recognition.onresult = (event) => {
+        let transcript = '';
+        for (let i = event.resultIndex; i < event.results.length; i++) {
+            transcript += event.results[i][0].transcript;
+        }
+
+        document.getElementById('voiceTranscript').textContent = transcript;
+
+        // If final result, parse it
+        if (event.results[event.results.length - 1].isFinal) {
+            parseVoiceInput(transcript);
+        }
+    };
+
+    recognition.onerror = (event) => {
+        console.error('Speech recognition error:', event.error);
+        document.getElementById('voiceTranscript').textContent = 'Error: ' + event.error;
+    };
+
+    recognition.onend = () => {
+        document.getElementById('voiceListening').style.display = 'none';
+    };
+}
+
+function parseVoiceInput(transcript) {
+    const lower = transcript.toLowerCase();
+
+    // Parse type
+    let type = null;
+    if (lower.includes('bottle') || lower.includes('fed') || lower.includes('feed')) {
+        type = 'bottle';
+    } else if (lower.includes('nurse') || lower.includes('nursed') || lower.includes('breastfed') || lower.includes('breast')) {
+        type = 'nurse';
+    } else if (lower.includes('pump') || lower.includes('pumped')) {
+        type = 'pump';
+    }
+
+    // Parse side
+    let side = null;
+    if (lower.includes('left')) {
+        side = 'left';
+    } else if (lower.includes('right')) {
+        side = 'right';
+    } else if (lower.includes('both')) {
+        side = 'both';
+    }
+
+    // Parse amount (look for number + "ml" or "milliliter")
+    let amount = null;
+    const amountMatch = lower.match(/(\d+(?:\.\d+)?)\s*(?:ml|milliliter)/);
+    if (amountMatch) {
+        amount = parseFloat(amountMatch[1]);
+    } else {
+        // Try number words (simplified for ml)
+        const numberWords = {
+            'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5,
+            'six': 6, 'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10
+        };
+        for (const [word, num] of Object.entries(numberWords)) {
+            if (lower.includes(word + ' ml') || lower.includes(word + ' milliliter')) {
+                amount = num;
+                break;
+            }
+        }
+
+        // Fallback: look for large numbers (>=5) without units
+        if (!amount) {
+            const trailingNum = lower.match(/\b(\d+)\s*$/);
+            if (trailingNum) {
+                const val = parseInt(trailingNum[1]);
+                if (val >= 5) amount = val;
+            }
+        }
+    }
+
+    // Parse duration (look for number + "minute" or "min")
+    let duration = null;
+    const durationMatch = lower.match(/(\d+)\s*(?:minute|min)/);
+    if (durationMatch) {
+        duration = parseInt(durationMatch[1]);
+    }
+
+    // Store parsed data
+    voiceParsedData = { type, side, amount, duration };
+
+    // Show parsed result
+    const parsedHtml = `
+        <div class="voice-parsed-item"><span class="voice-parsed-label">Type:</span> ${type || 'Not detected'}</div>
+        ${side ? `<div class="voice-parsed-item"><span class="voice-parsed-label">Side:</span> ${side}</div>` : ''}
+        ${amount ? `<div class="voice-parsed-item"><span class="voice-parsed-label">Amount:</span> ${amount} ml</div>` : ''}
+        ${duration ? `<div class="voice-parsed-item"><span class="voice-parsed-label">Duration:</span> ${duration} min</div>` : ''}
+    `;
+
+    document.getElementById('voiceParsed').innerHTML = parsedHtml;
+    document.getElementById('voiceParsedSection').style.display = 'block';
+    document.getElementById('voiceConfirm').style.display = 'block';
+}
+
+document.getElementById('voiceConfirm').addEventListener('click', () => {
+    if (voiceParsedData && voiceParsedData.type) {
+        logFeed(voiceParsedData.type, voiceParsedData.side, voiceParsedData.amount);
+    }
+});
+
+// Auto-refresh last feed time every 30 seconds
+setInterval(loadFeeds, 30000);
+
+// Live Clock
+function updateClock() {
+    const now = new Date();
+    const timeString = now.toLocaleTimeString([], { hour: 'numeric', minute: '2-digit' });
+    document.getElementById('liveClock').textContent = timeString;
+}
+setInterval(updateClock, 1000);
+updateClock(); // Initial call
+
+// Vitamin D status check and logging
+let vitaminLogging = false; // Prevent double-tap
+
+function renderVitaminStatus(data) {
+    const reminder = document.getElementById('vitaminReminder');
+
+    if (data.given_today) {
+        // Already given — hide banner
+        reminder.style.display = 'none';
+        reminder.classList.remove('confirming', 'sliding-out');
+    } else {
+        // Not given — show banner
+        reminder.style.display = 'flex';
+        reminder.classList.remove('confirming', 'sliding-out');
+        document.getElementById('vitaminCheck').style.opacity = '0';
+    }
+}
+
+async function logVitamin() {
+    if (vitaminLogging) return; // Prevent double-tap
+    vitaminLogging = true;
+
+    const reminder = document.getElementById('vitaminReminder');
+
+    try {
+        let response;
+        try {
+            response = await fetch(API_ROOT + '/api/vitamin', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json', 'Idempotency-Key': requestKey('vitamin') },
+                body: JSON.stringify({ logged_by: currentWho })
+            });
+        } catch (networkError) {
+            // No connection: queue the same entry the server would log
+            settleRequestKey('vitamin');
+            await queueOffline({
+                type: 'vitamin_d',
+                side: null,
+                amount_ml: null,
+                duration_min: null,
+                notes: 'Yes',
+                logged_by: currentWho,
+                timestamp: new Date().toISOString()
+            }, '☀️ Vitamin D given');
+            hideVitaminReminder(reminder);
+            return;
+        }
+
+        const result = await response.json();
+        settleRequestKey('vitamin', response);
+
+        if (result.success) {
+            lastCreatedFeedId = result.id;
+            hideVitaminReminder(reminder);
+
+            // Show toast with undo
+            showToast('☀️ Vitamin D given', true);
+
+            // Refresh feeds
+            loadFeeds();
+        } else {
+            vitaminLogging = false;
+        }
+    } catch (error) {
+        console.error('Error logging vitamin:', error);
+        vitaminLogging = false;
+    }
+}
+
+function hideVitaminReminder(reminder) {
+    // Phase 1: Confirmation animation
+    reminder.querySelector('.vitamin-text').textContent = 'Vitamin D given ✓';
+    reminder.classList.add('confirming');
+
+    // Phase 2: Slide out after 1.5s
+    setTimeout(() => {
+        reminder.classList.add('sliding-out');
+
+        // Phase 3: Hide after slide animation completes
+        setTimeout(() => {
+            reminder.style.display = 'none';
+            reminder.classList.remove('confirming', 'sliding-out');
+            reminder.querySelector('.vitamin-text').textContent = 'Tap to give Vitamin D drops';
+            vitaminLogging = false;
+        }, 500);
+    }, 1500);
+}
+
+// ==========================================
+// CHARTS FUNCTIONALITY
+// ==========================================
+
+let currentChartRange = 7;
+let milkChartInstance = null;
+let diaperChartInstance = null;
+let pumpChartInstance = null;
+let timelineChartInstance = null;
+
+// Tab switching
+// Tab switching function
+function switchTab(tab) {
+    // Update buttons
+    document.querySelectorAll('.tab-btn').forEach(b => {
+        b.classList.remove('active');
+        if (b.dataset.tab === tab) b.classList.add('active');
+    });
+
+    // Update views
+    const trackerView = document.getElementById('trackerView');
+    const chartsView = document.getElementById('chartsView');
+
+    if (tab === 'tracker') {
+        trackerView.style.display = '';
+        chartsView.style.display = 'none';
+    } else {
+        trackerView.style.display = 'none';
+        chartsView.style.display = '';
+        loadChartData(currentChartRange);
+    }
+}
+
+// Click listeners
+document.querySelectorAll('.tab-btn').forEach(btn => {
+    btn.addEventListener('click', () => switchTab(btn.dataset.tab));
+});
+
+// Swipe Navigation Logic
+let touchStartX = 0;
+let touchStartY = 0;
+
+document.addEventListener('touchstart', e => {
+    touchStartX = e.changedTouches[0].screenX;
+    touchStartY = e.changedTouches[0].screenY;
+}, { passive: true });
+
+document.addEventListener('touchend', e => {
+    const touchEndX = e.changedTouches[0].screenX;
+    const touchEndY = e.changedTouches[0].screenY;
+    handleSwipe(touchStartX, touchStartY, touchEndX, touchEndY);
+}, { passive: true });
+
+function handleSwipe(startX, startY, endX, endY) {
+    const diffX = endX - startX;
+    const diffY = endY - startY;
+
+    // Threshold: 50px, Horizontal > Vertical
+    if (Math.abs(diffX) > 50 && Math.abs(diffX) > Math.abs(diffY)) {
+        const currentBtn = document.querySelector('.tab-btn.active');
+        if (!currentBtn) return;
+
+        const currentTab = currentBtn.dataset.tab;
+
+        // Swipe Left (Go to Charts)
+        if (diffX < 0 && currentTab === 'tracker') {
+            switchTab('charts');
+        }
+        // Swipe Right (Go to Tracker)
+        else if (diffX > 0 && currentTab === 'charts') {
+            switchTab('tracker');
+        }
+    }
+}
+
+// Range selector
+document.querySelectorAll('.range-btn').forEach(btn => {
+    btn.addEventListener('click', () => {
+        document.querySelectorAll('.range-btn').forEach(b => b.classList.remove('active'));
+        btn.classList.add('active');
+        currentChartRange = parseInt(btn.dataset.range);
+        loadChartData(currentChartRange);
+    });
+});
+
+// Chart data is aggregated in a worker and cached per (range, data version, day),
+// so switching tabs or ranges back and forth doesn't fetch or recompute anything
+const chartWorker = new Worker(CHART_WORKER_URL);
+const chartRequests = new Map();
+let nextChartRequest = 0;
+const chartCache = new Map();
+let displayedChartKey = null;
+let wantedChartKey = null;
+
+chartWorker.onmessage = event => {
+    const { id, result, error } = event.data;
+    const request = chartRequests.get(id);
+    chartRequests.delete(id);
+    if (error) request.reject(new Error(error));
+    else request.resolve(result);
+};
+
+function aggregateCharts(days, today) {
+    const id = nextChartRequest++;
+    const url = new URL(`${API_ROOT}/api/feeds?limit_days=${days}`, location.href).href;
+    return new Promise((resolve, reject) => {
+        chartRequests.set(id, { resolve, reject });
+        chartWorker.postMessage({ id, url, days, today, decoder: MSGPACK_URL });
+    });
+}
+
+async function loadChartData(days) {
+    const today = new Date().toLocaleDateString('en-CA');
+    const key = `${days}|${dataVersion}|${today}`;
+    wantedChartKey = key;
+    if (key === displayedChartKey) return; // Already on screen
+
+    try {
+        let data = chartCache.get(key);
+        if (!data) {
+            data = await aggregateCharts(days, today);
+            // Keep only results for the newest data
+            for (const [cachedKey, cached] of chartCache) {
+                if (cached.version !== data.version) chartCache.delete(cachedKey);
+            }
+            chartCache.set(`${days}|${data.version}|${today}`, data);
+            if (wantedChartKey !== key) return; // Range changed meanwhile
+        }
+        renderMilkChart(data);
+        renderDiaperChart(data);
+        renderPumpChart(data);
+        renderTimelineChart(data);
+        displayedChartKey = `${days}|${data.version}|${today}`;
+    } catch (error) {
+        console.error('Error loading chart data:', error);
+    }
+}
+
+// Format date label for chart axis
+function formatChartLabel(dateStr) {
+    const parts = dateStr.split('-');
+    const d = new Date(parts[0], parts[1] - 1, parts[2]); // Local time construction
+    const today = new Date();
+
+    // Check if Today
+    if (d.getDate() === today.getDate() &&
+        d.getMonth() === today.getMonth() &&
+        d.getFullYear() === today.getFullYear()) {
+        return 'Today';
+    }
+
+    // Check if Yesterday
+    const yesterday = new Date(today);
+    yesterday.setDate(yesterday.getDate() - 1);
+    if (d.getDate() === yesterday.getDate() &&
+        d.getMonth() === yesterday.getMonth() &&
+        d.getFullYear() === yesterday.getFullYear()) {
+        return 'Yest.';
+    }
+
+    const days = ['Sun', 'Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat'];
+    const months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+        'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'];
+    return days[d.getDay()] + ' ' + d.getDate();
+}
+
+// Render Daily Milk Intake bar chart
+function renderMilkChart(data) {
+    // Updated to Stacked Bar Chart for Formula vs Breast Milk
+    // Unspecified feeds (backward compatibility) are grouped into Breast Milk (see chart-worker.js)
+    const breastMilk = Array.from(data.milk.breastMilk);
+    const formula = Array.from(data.milk.formula);
+    const labels = data.dates.map(formatChartLabel);
+
+    if (milkChartInstance) {
+        milkChartInstance.destroy();
+    }
+
+    const ctx = document.getElementById('milkChart').getContext('2d');
+    milkChartInstance = new Chart(ctx, {
+        type: 'bar',
+        data: {
+            labels: labels,
+            datasets: [
+                {
+                    label: 'Breast Milk',
+                    data: breastMilk,
+                    backgroundColor: '#4A90D9', // Blue
+                    borderRadius: 6,
+                    borderSkipped: false,
+                    maxBarThickness: 40,
+                    stack: 'Stack 0'
+                },
+                {
+                    label: 'Formula',
+                    data: formula,
+                    backgroundColor: '#FFB86C', // Orange/Peach
+                    borderRadius: 6,
+                    borderSkipped: false,
+                    maxBarThickness: 40,
+                    stack: 'Stack 0'
+                }
+            ]
+        },
+        options: {
+            responsive: true,
+            maintainAspectRatio: false,
+            plugins: {
+                legend: {
+                    display: true,
+                    position: 'bottom',
+                    labels: { color: '#a8adb8', boxWidth: 12, padding: 10, font: { size: 11 } }
+                },
+                tooltip: {
+                    backgroundColor: '#252b3b',
+                    titleColor: '#e8eaed',
+                    bodyColor: '#a8adb8',
+                    borderColor: '#3d4556',
+                    borderWidth: 1,
+                    cornerRadius: 8,
+                    padding: 10,
+                    callbacks: {
+                        label: function (context) {
+                            return context.dataset.label + ': ' + context.parsed.y + ' ml';
+                        }
+                    }
+                },
+                // Goal line annotation (using a simple plugin)
+                annotation: undefined
+            },
+            scales: {
+                x: {
+                    stacked: true,
+                    ticks: {
+                        color: '#a8adb8',
+                        font: { size: 11 },
+                        maxRotation: 0
+                    },
+                    grid: { display: false },
+                    border: { display: false }
+                },
+                y: {
+                    stacked: true,
+                    beginAtZero: true,
+                    suggestedMax: 600,
+                    ticks: {
+                        color: '#a8adb8',
+                        font: { size: 11 },
+                        stepSize: 100,
+                        callback: function (val) { return val + ' ml'; }
+                    },
+                    grid: {
+                        color: '#2d3548',
+                        drawBorder: false
+                    },
+                    border: { display: false }
+                }
+            },
+            layout: {
+                padding: { top: 10, bottom: 5 }
+            }
+        },
+        plugins: [{
+            // Custom plugin to draw the 500ml goal line
+            id: 'goalLine',
+            afterDraw: function (chart) {
+                const yScale = chart.scales.y;
+                const goalY = yScale.getPixelForValue(500);
+                const ctx = chart.ctx;
+                ctx.save();
+                ctx.beginPath();
+                ctx.setLineDash([6, 4]);
+                ctx.strokeStyle = '#F5A623';
+                ctx.lineWidth = 2;
+                ctx.moveTo(chart.chartArea.left, goalY);
+                ctx.lineTo(chart.chartArea.right, goalY);
+                ctx.stroke();
+
+                // Label
+                ctx.fillStyle = '#F5A623';
+                ctx.font = '11px -apple-system, sans-serif';
+                ctx.textAlign = 'right';
+                ctx.fillText('500ml goal', chart.chartArea.right, goalY - 6);
+                ctx.restore();
+            }
+        }]
+    });
+}
+
+// Render Diaper Stacked Bar Chart
+function renderDiaperChart(chartData) {
+    const data = {
+        pee: Array.from(chartData.diapers.pee),
+        poop: Array.from(chartData.diapers.poop),
+        both: Array.from(chartData.diapers.both)
+    };
+    const labels = chartData.dates.map(formatChartLabel);
+
+    if (diaperChartInstance) {
+        diaperChartInstance.destroy();
+    }
+
+    const ctx = document.getElementById('diaperChart').getContext('2d');
+    diaperChartInstance = new Chart(ctx, {
+        type: 'bar',
+        data: {
+            labels: labels,
+            datasets: [
+                {
+                    label: 'Both',
+                    data: data.both,
+                    backgroundColor: '#5E4B8A', // Dark purple
+                    borderRadius: 4
+                },
+                {
+                    label: 'Poop',
+                    data: data.poop,
+                    backgroundColor: '#9C87E8', // Main purple
+                    borderRadius: 4
+                },
+                {
+                    label: 'Pee',
+                    data: data.pee,
+                    backgroundColor: '#D4C4FB', // Light purple
+                    borderRadius: 4
+                }
+            ]
+        },
+        options: {
+            responsive: true,
+            maintainAspectRatio: false,
+            scales: {
+                x: {
+                    stacked: true,
+                    ticks: {
+                        color: '#a8adb8',
+                        font: { size: 11 },
+                        maxRotation: 0
+                    },
+                    grid: { display: false },
+                    border: { display: false }
+                },
+                y: {
+                    stacked: true,
+                    beginAtZero: true,
+                    ticks: {
+                        stepSize: 1,
+                        color: '#a8adb8',
+                        font: { size: 11 }
+                    },
+                    grid: {
+                        color: '#2d3548',
+                        drawBorder: false
+                    },
+                    border: { display: false }
+                }
+            },
+            plugins: {
+                legend: {
+                    display: true,
+                    position: 'bottom',
+                    labels: {
+                        color: '#a8adb8',
+                        boxWidth: 12,
+                        padding: 20,
+                        font: { size: 11 }
+                    }
+                },
+                tooltip: {
+                    backgroundColor: '#252b3b',
+                    titleColor: '#e8eaed',
+                    bodyColor: '#a8adb8',
+                    borderColor: '#3d4556',
+                    borderWidth: 1,
+                    cornerRadius: 8,
+                    padding: 10
+                }
+            },
+            layout: {
+                padding: { top: 10, bottom: 5 }
+            }
+        }
+    });
+}
+
+// Render Pump Amount Chart
+function renderPumpChart(data) {
+    const amounts = Array.from(data.pump);
+    const labels = data.dates.map(formatChartLabel);
+
+    if (pumpChartInstance) {
+        pumpChartInstance.destroy();
+    }
+
+    const ctx = document.getElementById('pumpChart').getContext('2d');
+    pumpChartInstance = new Chart(ctx, {
+        type: 'bar',
+        data: {
+            labels: labels,
+            datasets: [{
+                label: 'Pumped Output',
+                data: amounts,
+                backgroundColor: '#5CB8B2', // Teal
+                borderRadius: 6,
+                borderSkipped: false,
+                maxBarThickness: 40
+            }]
+        },
+        options: {
+            responsive: true,
+            maintainAspectRatio: false,
+            plugins: {
+                legend: {
+                    display: false // Single series, no legend needed
+                },
+                tooltip: {
+                    backgroundColor: '#252b3b',
+                    titleColor: '#e8eaed',
+                    bodyColor: '#a8adb8',
+                    borderColor: '#3d4556',
+                    borderWidth: 1,
+                    cornerRadius: 8,
+                    padding: 10,
+                    callbacks: {
+                        label: function (context) {
+                            return context.parsed.y + ' ml';
+                        }
+                    }
+                }
+            },
+            scales: {
+                x: {
+                    ticks: {
+                        color: '#a8adb8',
+                        font: { size: 11 },
+                        maxRotation: 0
+                    },
+                    grid: { display: false },
+                    border: { display: false }
+                },
+                y: {
+                    beginAtZero: true,
+                    ticks: {
+                        color: '#a8adb8',
+                        font: { size: 11 },
+                        callback: function (val) { return val + ' ml'; }
+                    },
+                    grid: {
+                        color: '#2d3548',
+                        drawBorder: false
+                    },
+                    border: { display: false }
+                }
+            },
+            layout: {
+                padding: { top: 10, bottom: 5 }
+            }
+        }
+    });
+}
+
+// Render Feed Timeline Chart (Scatter)
+function renderTimelineChart(data) {
+    // Points were laid out by the worker: day column and decimal hour (0-24)
+    const dates = data.dates;
+    const points = series => Array.from(series.y, (y, i) => ({ x: dates[series.x[i]], y }));
+    const bottleData = points(data.timeline.breastMilk); // Milk/Breast Milk (Default)
+    const formulaData = points(data.timeline.formula);
+    const nurseData = points(data.timeline.nurse);
+    const pumpData = points(data.timeline.pump);
+
+    if (timelineChartInstance) timelineChartInstance.destroy();
+
+    const ctx = document.getElementById('timelineChart').getContext('2d');
+    timelineChartInstance = new Chart(ctx, {
+        type: 'scatter',
+        data: {
+            labels: dates, // X-axis categories
+            datasets: [
+                {
+                    label: 'Breast Milk',
+                    data: bottleData,
+                    backgroundColor: '#4A90D9', // Blue
+                    pointRadius: 6,
+                    pointHoverRadius: 8
+                },
+                {
+                    label: 'Formula',
+                    data: formulaData,
+                    backgroundColor: '#FFB86C', // Orange/Peach
+                    pointRadius: 6,
+                    pointHoverRadius: 8
+                },
+                {
+                    label: 'Nurse',
+                    data: nurseData,
+                    backgroundColor: '#E8877C', // Pink
+                    pointRadius: 6,
+                    pointHoverRadius: 8
+                },
+                {
+                    label: 'Pump',
+                    data: pumpData,
+                    backgroundColor: '#5CB8B2', // Teal
+                    pointRadius: 6,
+                    pointHoverRadius: 8
+                }
+            ]
+        },
+        options: {
+            responsive: true,
+            maintainAspectRatio: false,
+            scales: {
+                x: {
+                    type: 'category',
+                    offset: true,
+                    ticks: {
+                        color: '#a8adb8',
+                        font: { size: 11 },
+                        maxRotation: 0,
+                        callback: function (val, index) {
+                            // val is index? or label? Chart.js category scale usually passes index or label depending on version.
+                            // but we can access `this.getLabelForValue(val)`
+                            const label = this.getLabelForValue(val);
+                            const d = new Date(label + 'T12:00:00'); // Safe parsing
+                            const days = ['Sun', 'Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat'];
+                            return days[d.getDay()] + ' ' + d.getDate();
+                        }
+                    },
+                    grid: {
+                        color: '#2d3548',
+                        drawBorder: false
+                    }
+                },
+                y: {
+                    min: 0,
+                    max: 24,
+                    reverse: true, // 12 AM at top (0), 11 PM at bottom (23)? Or normal? Timeline usually runs down? 
+                    // Let's stick to normal graph behavior (0 bottom, 24 top) for now as requested in plan "12am - 11pm"
+                    // Plan diagram showed 11pm at TOP.
+                    // So reverse: false.
+                    ticks: {
+                        stepSize: 3,
+                        color: '#a8adb8',
+                        font: { size: 11 },
+                        callback: function (val) {
+                            if (val === 0 || val === 24) return '12 AM';
+                            if (val === 12) return '12 PM';
+                            if (val < 12) return val + ' AM';
+                            return (val - 12) + ' PM';
+                        }
+                    },
+                    grid: {
+                        color: '#2d3548',
+                        drawBorder: false
+                    },
+                    border: { display: false }
+                }
+            },
+            plugins: {
+                legend: {
+                    position: 'bottom',
+                    labels: { color: '#a8adb8', boxWidth: 10, padding: 20, font: { size: 11 } }
+                },
+                tooltip: {
+                    callbacks: {
+                        label: function (context) {
+                            const val = context.parsed.y;
+                            const h = Math.floor(val);
+                            const m = Math.floor((val - h) * 60);
+                            const ampm = h >= 12 && h < 24 ? 'PM' : 'AM'; // Fix 24->AM
+                            const h12 = h % 12 || 12;
+                            const mStr = m.toString().padStart(2, '0');
+                            return `${context.dataset.label}: ${h12}:${mStr} ${ampm}`;
+                        }
+                    }
+                }
+            },
+            layout: { padding: { top: 10, bottom: 5 } }
+        }
+    });
+}
+
+// Initial load: the copy saved on this device straight away, then fresh data
+renderSavedHome();
+loadFeeds();
+updateOutboxStatus();
+
+if ('serviceWorker' in navigator) {
+    navigator.serviceWorker.register(`${API_ROOT}/sw.js`).catch(error => {
+        console.error('Service worker not registered:', error);
+    });
+    // Entries the service worker sent in the background
+    navigator.serviceWorker.addEventListener('message', event => {
+        if (event.data && event.data.type === 'outbox-synced') {
+            outboxSynced(event.data.delivered || 0, event.data.rejected || 0);
+        }
+    });
+}
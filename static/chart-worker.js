@@ -0,0 +1,127 @@
+/*
+ * Chart aggregation for the Charts tab, off the main thread.
+ *
+ * Receives {id, url, days, today, decoder}: fetches the entries itself (so
+ * parsing the response doesn't block the page either), asking for just the
+ * fields the charts use, one array per field, as MessagePack (decoded by
+ * static/msgpack.js, loaded from the decoder URL). Buckets them by day
+ * through a Map from date to column index and replies with typed arrays
+ * whose buffers are transferred rather than copied. Counting rules are the
+ * ones the charts have always used.
+ */
+
+const FIELDS = 'date,type,amount_ml,timestamp';
+
+self.onmessage = async event => {
+    const { id, url, days, today, decoder } = event.data;
+    try {
+        if (typeof readApiResponse === 'undefined') importScripts(decoder);
+        const response = await fetch(`${url}&fields=${FIELDS}&shape=columns`, {
+            headers: { Accept: `${MSGPACK_TYPE}, application/json;q=0.9` }
+        });
+        if (!response.ok) throw new Error(`HTTP ${response.status}`);
+        const body = await readApiResponse(response);
+        const result = aggregate(body.feeds, days, today);
+        result.version = response.headers.get('X-Data-Version');
+        self.postMessage({ id, result }, buffersOf(result));
+    } catch (error) {
+        self.postMessage({ id, error: String(error) });
+    }
+};
+
+// The `days` dates ending with today (YYYY-MM-DD, local time), oldest first
+function dateRange(days, today) {
+    const [year, month, day] = today.split('-').map(Number);
+    const dates = [];
+    for (let i = days - 1; i >= 0; i--) {
+        const d = new Date(year, month - 1, day - i);
+        dates.push(`${d.getFullYear()}-${String(d.getMonth() + 1).padStart(2, '0')}-${String(d.getDate()).padStart(2, '0')}`);
+    }
+    return dates;
+}
+
+function timelineSeries() {
+    return { x: [], y: [] };
+}
+
+// feeds: {date: [...], type: [...], amount_ml: [...], timestamp: [...]}, timestamps
+// as ISO strings (JSON) or epoch milliseconds (MessagePack)
+function aggregate(feeds, days, today) {
+    const dates = dateRange(days, today);
+    const column = new Map(dates.map((date, i) => [date, i]));
+
+    const breastMilk = new Float64Array(days);
+    const formula = new Float64Array(days);
+    const pee = new Uint16Array(days);
+    const poop = new Uint16Array(days);
+    const both = new Uint16Array(days);
+    const pump = new Float64Array(days);
+    const timeline = {
+        breastMilk: timelineSeries(),
+        formula: timelineSeries(),
+        nurse: timelineSeries(),
+        pump: timelineSeries()
+    };
+
+    const count = feeds.date.length;
+    for (let n = 0; n < count; n++) {
+        const i = column.get(feeds.date[n]);
+        if (i === undefined) continue; // Outside range
+
+        const type = feeds.type[n] || '';
+        const typeLower = type.toLowerCase();
+        const amount = feeds.amount_ml[n] || 0;
+
+        // Daily intake: bottle feeds only
+        if (!type.includes('Diaper') && !type.includes('Vitamin') && !type.includes('Pump') && !type.includes('Nurse')) {
+            if (amount > 0 && amount <= 800) {
+                if (typeLower.includes('formula')) formula[i] += amount;
+                else breastMilk[i] += amount; // Milk, Breast Milk and unspecified bottles
+            }
+        }
+
+        if (type.includes('Diaper')) {
+            if (typeLower.includes('both')) both[i]++;
+            else if (typeLower.includes('poop')) poop[i]++;
+            else pee[i]++; // Generic "Diaper" counts as pee
+        }
+
+        if (type.includes('Pump') && amount) pump[i] += amount;
+
+        // Timeline: one point per feed at its time of day (decimal hours)
+        const timestamp = feeds.timestamp[n];
+        if (!timestamp) continue;
+        let series = null;
+        if (type.includes('Bottle')) series = typeLower.includes('formula') ? timeline.formula : timeline.breastMilk;
+        else if (type.includes('Nurse')) series = timeline.nurse;
+        else if (type.includes('Pump')) series = timeline.pump;
+        if (series) {
+            const dt = new Date(timestamp);
+            series.x.push(i);
+            series.y.push(dt.getHours() + dt.getMinutes() / 60);
+        }
+    }
+
+    for (const name of Object.keys(timeline)) {
+        timeline[name] = { x: Uint16Array.from(timeline[name].x), y: Float32Array.from(timeline[name].y) };
+    }
+
+    return {
+        days,
+        dates,
+        milk: { breastMilk, formula },
+        diapers: { pee, poop, both },
+        pump,
+        timeline
+    };
+}
+
+function buffersOf(result) {
+    const arrays = [
+        result.milk.breastMilk, result.milk.formula,
+        result.diapers.pee, result.diapers.poop, result.diapers.both,
+        result.pump
+    ];
+    for (const series of Object.values(result.timeline)) arrays.push(series.x, series.y);
+    return arrays.map(array => array.buffer);
+}
@@ -0,0 +1,300 @@
+/*
+ * Keyed, incremental rendering of the grouped feed history.
+ *
+ * Day groups and entries are matched to the nodes already on the page by
+ * key. Only groups and entries that were added, changed or removed touch the
+ * DOM, so a refresh keeps which days are open and costs nothing when nothing
+ * changed. A closed day's entries are only built when it is first opened.
+ *
+ * render() takes the groups newest first:
+ *   [{key, label, stats, open, highlight, items: [{key, html}]}]
+ * where open is the initial state of a newly created group and html is the
+ * markup of a single entry element.
+ */
+class HistoryList {
+    constructor(container) {
+        this.container = container;
+        this.groups = new Map(); // key -> {el, labelEl, statsEl, content, items, pending}
+    }
+
+    render(groups, emptyHtml) {
+        if (groups.length === 0) {
+            this.groups.clear();
+            this.container.innerHTML = emptyHtml || '';
+            return;
+        }
+
+        const seen = new Set();
+        let previous = null;
+        for (const spec of groups) {
+            seen.add(spec.key);
+            let group = this.groups.get(spec.key);
+            if (!group) {
+                group = this.createGroup(spec);
+                this.groups.set(spec.key, group);
+            }
+            this.updateGroup(group, spec);
+            placeAfter(this.container, group.el, previous);
+            previous = group.el;
+        }
+
+        for (const [key, group] of this.groups) {
+            if (!seen.has(key)) {
+                group.el.remove();
+                this.groups.delete(key);
+            }
+        }
+        // Drop anything else (loading or empty-state messages)
+        while (previous.nextSibling) previous.nextSibling.remove();
+    }
+
+    createGroup(spec) {
+        const el = document.createElement('details');
+        el.className = 'feed-group';
+        el.dataset.key = spec.key;
+        el.open = spec.open;
+        el.innerHTML = `
+            <summary class="group-header">
+                <span></span>
+                <span style="font-size: 14px; color: #a8adb8; font-weight: normal; margin-right: 10px;"></span>
+            </summary>
+            <div class="group-content"></div>
+        `;
+        const group = {
+            el,
+            labelEl: el.querySelector('summary > span:first-child'),
+            statsEl: el.querySelector('summary > span:last-child'),
+            content: el.querySelector('.group-content'),
+            items: new Map(), // key -> {el, html}
+            pending: null
+        };
+        // Entries of a closed day are built the first time it is opened
+        el.addEventListener('toggle', () => {
+            if (el.open && group.pending) this.syncItems(group);
+        });
+        return group;
+    }
+
+    updateGroup(group, spec) {
+        if (group.labelEl.textContent !== spec.label) group.labelEl.textContent = spec.label;
+        if (group.statsEl.textContent !== spec.stats) group.statsEl.textContent = spec.stats;
+        group.el.classList.toggle('highlight-group', !!spec.highlight);
+        group.pending = spec.items;
+        if (group.el.open) this.syncItems(group);
+    }
+
+    syncItems(group) {
+        const items = group.pending;
+        group.pending = null;
+
+        const seen = new Set();
+        let previous = null;
+        for (const item of items) {
+            // Keys must be unique within a day; repeat keys get a suffix
+            let key = item.key;
+            for (let n = 1; seen.has(key); n++) key = `${item.key}#${n}`;
+            seen.add(key);
+
+            let node = group.items.get(key);
+            if (!node || node.html !== item.html) {
+                const el = elementFromHtml(item.html);
+                if (node) node.el.replaceWith(el);
+                node = { el, html: item.html };
+                group.items.set(key, node);
+            }
+            placeAfter(group.content, node.el, previous);
+            previous = node.el;
+        }
+
+        for (const [key, node] of group.items) {
+            if (!seen.has(key)) {
+                node.el.remove();
+                group.items.delete(key);
+            }
+        }
+    }
+}
+
+/*
+ * History older than the home screen's window, loaded a page of whole days at
+ * a time as the list scrolls towards its end, and virtualized: a page far
+ * outside the viewport is swapped for an empty block of the same height and
+ * fetched again when it comes back, so the DOM and the entries held in memory
+ * stay the same size however far back the user scrolls.
+ *
+ * fetchPage(before) resolves to a GET /api/feeds?before=&limit= response;
+ * describeDay(date, feeds) returns a HistoryList group for one day.
+ */
+class PagedHistory {
+    constructor(container, fetchPage, describeDay) {
+        this.container = container;
+        this.fetchPage = fetchPage;
+        this.describeDay = describeDay;
+        this.pages = []; // {before, next, el, list, feeds, height, loading}
+        this.start = undefined;
+        this.done = true;
+        this.loading = false;
+        this.generation = 0;
+        this.openDays = new Set();
+
+        this.sentinel = document.createElement('div');
+        container.appendChild(this.sentinel);
+
+        this.nearEnd = new IntersectionObserver(entries => {
+            if (entries.some(entry => entry.isIntersecting)) this.loadNext();
+        }, { rootMargin: `${PagedHistory.PRELOAD_PX}px 0px` });
+        this.nearEnd.observe(this.sentinel);
+
+        this.visibility = new IntersectionObserver(entries => {
+            for (const entry of entries) {
+                const page = entry.target.historyPage;
+                if (entry.isIntersecting) this.show(page);
+                else this.hide(page);
+            }
+        }, { rootMargin: `${PagedHistory.KEEP_PX}px 0px` });
+
+        // Remember which days are open across re-renders ('toggle' doesn't bubble)
+        container.addEventListener('toggle', event => {
+            const key = event.target.dataset && event.target.dataset.key;
+            if (!key) return;
+            if (event.target.open) this.openDays.add(key);
+            else this.openDays.delete(key);
+        }, true);
+    }
+
+    // Start the list at entries dated before `before`; no-op if it already does
+    reset(before) {
+        if (before === this.start) return;
+        this.start = before;
+        this.generation++;
+        for (const page of this.pages) {
+            this.visibility.unobserve(page.el);
+            page.el.remove();
+        }
+        this.pages = [];
+        this.done = false;
+        this.loading = false;
+        this.loadNext();
+    }
+
+    async loadNext() {
+        if (this.loading || this.done) return;
+        const last = this.pages[this.pages.length - 1];
+        const before = last ? last.next : this.start;
+        const generation = this.generation;
+
+        this.loading = true;
+        let data;
+        try {
+            data = await this.fetchPage(before);
+        } finally {
+            if (generation === this.generation) this.loading = false;
+        }
+        if (generation !== this.generation) return;
+
+        if (data.feeds.length > 0) {
+            const el = document.createElement('div');
+            const page = { before, next: data.next_cursor, el, list: null, feeds: null, height: 0, loading: false };
+            el.historyPage = page;
+            this.container.insertBefore(el, this.sentinel);
+            this.pages.push(page);
+            this.render(page, data.feeds);
+            this.visibility.observe(el);
+        }
+        this.done = !data.next_cursor;
+
+        // The observer only fires on changes, so keep going while the end is still near
+        if (!this.done && this.sentinel.getBoundingClientRect().top < window.innerHeight + PagedHistory.PRELOAD_PX) {
+            this.loadNext();
+        }
+    }
+
+    render(page, feeds) {
+        const days = new Map();
+        for (const feed of feeds) {
+            if (!days.has(feed.date)) days.set(feed.date, []);
+            days.get(feed.date).push(feed);
+        }
+        const groups = [];
+        for (const [date, dayFeeds] of days) {
+            const group = this.describeDay(date, dayFeeds);
+            group.open = this.openDays.has(group.key);
+            groups.push(group);
+        }
+
+        page.feeds = feeds;
+        page.list = page.list || new HistoryList(page.el);
+        page.list.render(groups, '');
+        page.el.style.height = '';
+    }
+
+    hide(page) {
+        if (!page.feeds) return;
+        page.height = page.el.offsetHeight;
+        page.el.style.height = `${page.height}px`;
+        page.el.textContent = '';
+        page.list = null;
+        page.feeds = null;
+    }
+
+    async show(page) {
+        if (page.feeds || page.loading) return;
+        await this.reload(page);
+    }
+
+    async reload(page) {
+        const generation = this.generation;
+        page.loading = true;
+        let data;
+        try {
+            data = await this.fetchPage(page.before);
+        } finally {
+            page.loading = false;
+        }
+        if (generation !== this.generation || !this.pages.includes(page)) return;
+
+        this.render(page, data.feeds);
+        if (data.next_cursor !== page.next) {
+            // The page now ends on a different day: later pages no longer line up
+            for (const later of this.pages.splice(this.pages.indexOf(page) + 1)) {
+                this.visibility.unobserve(later.el);
+                later.el.remove();
+            }
+            page.next = data.next_cursor;
+            this.done = !page.next;
+            this.loadNext();
+        }
+    }
+
+    // Re-fetch the pages on screen, e.g. after an entry was edited or deleted
+    async refresh() {
+        for (const page of this.pages.slice()) {
+            // Skip pages dropped because an earlier one changed length
+            if (page.feeds && this.pages.includes(page)) await this.reload(page);
+        }
+    }
+
+    findFeed(id) {
+        for (const page of this.pages) {
+            const feed = page.feeds && page.feeds.find(f => f.id === id);
+            if (feed) return feed;
+        }
+        return null;
+    }
+}
+
+// Pages are fetched this far ahead of the viewport and kept this far around it
+PagedHistory.PRELOAD_PX = 800;
+PagedHistory.KEEP_PX = 2000;
+
+function placeAfter(parent, el, previous) {
+    const expected = previous ? previous.nextSibling : parent.firstChild;
+    if (expected !== el) parent.insertBefore(el, expected);
+}
+
+const htmlTemplate = document.createElement('template');
+
+function elementFromHtml(html) {
+    htmlTemplate.innerHTML = html.trim();
+    return htmlTemplate.content.firstElementChild;
+}
@@ -0,0 +1,138 @@
+/*
+ * MessagePack decoding for API responses sent with Accept: application/msgpack.
+ *
+ * decodeMsgpack() reads the subset of MessagePack the server writes (nil,
+ * booleans, integers, floats, strings, binary, arrays and maps; no
+ * extension types). expandEntries() undoes msgpack_format.compact_entries
+ * on a decoded payload: type codes become the type strings again and epoch
+ * seconds become epoch milliseconds, ready for new Date().
+ */
+
+const MSGPACK_TYPE = 'application/msgpack';
+
+function decodeMsgpack(buffer) {
+    const bytes = buffer instanceof Uint8Array ? buffer : new Uint8Array(buffer);
+    const view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+    const text = new TextDecoder();
+    let pos = 0;
+
+    function need(n) {
+        if (pos + n > bytes.length) throw new Error('Truncated MessagePack data');
+    }
+
+    // Short ASCII strings (keys, dates, times) are far quicker built directly than through TextDecoder
+    function str(n) {
+        need(n);
+        const end = pos + n;
+        if (n <= 32) {
+            let value = '';
+            let i = pos;
+            for (; i < end && bytes[i] < 0x80; i++) value += String.fromCharCode(bytes[i]);
+            if (i === end) {
+                pos = end;
+                return value;
+            }
+        }
+        const value = text.decode(bytes.subarray(pos, end));
+        pos = end;
+        return value;
+    }
+
+    function bin(n) {
+        need(n);
+        const value = bytes.slice(pos, pos + n);
+        pos += n;
+        return value;
+    }
+
+    function array(n) {
+        const items = new Array(n);
+        for (let i = 0; i < n; i++) items[i] = read();
+        return items;
+    }
+
+    function map(n) {
+        const result = {};
+        for (let i = 0; i < n; i++) {
+            const key = read();
+            result[key] = read();
+        }
+        return result;
+    }
+
+    // Reads a big-endian number of the given DataView type and size
+    function num(getter, size) {
+        need(size);
+        const value = view[getter](pos);
+        pos += size;
+        return value;
+    }
+
+    function read() {
+        const first = num('getUint8', 1);
+        if (first < 0x80) return first;
+        if (first >= 0xe0) return first - 0x100;
+        if (first <= 0x8f) return map(first & 0x0f);
+        if (first <= 0x9f) return array(first & 0x0f);
+        if (first <= 0xbf) return str(first & 0x1f);
+        switch (first) {
+            case 0xc0: return null;
+            case 0xc2: return false;
+            case 0xc3: return true;
+            case 0xc4: return bin(num('getUint8', 1));
+            case 0xc5: return bin(num('getUint16', 2));
+            case 0xc6: return bin(num('getUint32', 4));
+            case 0xca: return num('getFloat32', 4);
+            case 0xcb: return num('getFloat64', 8);
+            case 0xcc: return num('getUint8', 1);
+            case 0xcd: return num('getUint16', 2);
+            case 0xce: return num('getUint32', 4);
+            case 0xcf: return Number(num('getBigUint64', 8));
+            case 0xd0: return num('getInt8', 1);
+            case 0xd1: return num('getInt16', 2);
+            case 0xd2: return num('getInt32', 4);
+            case 0xd3: return Number(num('getBigInt64', 8));
+            case 0xd9: return str(num('getUint8', 1));
+            case 0xda: return str(num('getUint16', 2));
+            case 0xdb: return str(num('getUint32', 4));
+            case 0xdc: return array(num('getUint16', 2));
+            case 0xdd: return array(num('getUint32', 4));
+            case 0xde: return map(num('getUint16', 2));
+            case 0xdf: return map(num('getUint32', 4));
+        }
+        throw new Error(`Unsupported MessagePack type 0x${first.toString(16)}`);
+    }
+
+    const value = read();
+    if (pos !== bytes.length) throw new Error(`Extra data after MessagePack value at byte ${pos}`);
+    return value;
+}
+
+// Rows or columns, as in the JSON responses
+function expandEntries(payload) {
+    const feeds = payload.feeds;
+    if (!feeds) return payload;
+    const types = payload.types || [];
+    const typeName = code => (code === null ? null : types[code]);
+    const millis = seconds => (seconds === null ? null : seconds * 1000);
+
+    if (Array.isArray(feeds)) {
+        for (const feed of feeds) {
+            if ('type' in feed) feed.type = typeName(feed.type);
+            if ('timestamp' in feed) feed.timestamp = millis(feed.timestamp);
+        }
+    } else {
+        if (feeds.type) feeds.type = feeds.type.map(typeName);
+        if (feeds.timestamp) feeds.timestamp = feeds.timestamp.map(millis);
+    }
+    delete payload.types;
+    return payload;
+}
+
+// Decodes a fetch() response as MessagePack or JSON, whichever the server sent
+async function readApiResponse(response) {
+    const contentType = (response.headers.get('Content-Type') || '').split(';')[0].trim();
+    if (contentType === MSGPACK_TYPE) return expandEntries(decodeMsgpack(await response.arrayBuffer()));
+    return response.json();
+}
+
@@ -0,0 +1,185 @@
+/*
+ * Offline support, shared by the page and the service worker (sw.js).
+ *
+ * OfflineStore is a small IndexedDB database per app root (each tenant gets
+ * its own). It holds a copy of the last home screen, so the page can draw it
+ * before the server answers, the outbox: entries logged while the server
+ * couldn't be reached, and the entries the server rejected when they were
+ * finally sent, kept until the user has seen them.
+ *
+ * Outbox.sync() sends queued entries in batches to POST /api/feeds/batch.
+ * A batch is fixed and given an Idempotency-Key before it is first sent, then
+ * retried with the same entries and key until the server answers, so a retry
+ * after a lost response never logs anything twice. Entries the server
+ * rejects (400, or failed items of a 207) move to the rejected store rather
+ * than disappearing.
+ */
+
+const OUTBOX_BATCH_SIZE = 100;
+
+function idbRequest(request) {
+    return new Promise((resolve, reject) => {
+        request.onsuccess = () => resolve(request.result);
+        request.onerror = () => reject(request.error);
+    });
+}
+
+function idbDone(tx) {
+    return new Promise((resolve, reject) => {
+        tx.oncomplete = () => resolve();
+        tx.onerror = () => reject(tx.error);
+        tx.onabort = () => reject(tx.error);
+    });
+}
+
+// Random key for a batch (crypto.randomUUID needs a secure context; this doesn't)
+function newIdempotencyKey() {
+    return Array.from(crypto.getRandomValues(new Uint8Array(16)), b => b.toString(16).padStart(2, '0')).join('');
+}
+
+class OfflineStore {
+    constructor(root) {
+        this.name = `feed-tracker:${root || '/'}`;
+        this.db = null;
+    }
+
+    open() {
+        if (!this.db) {
+            const request = indexedDB.open(this.name, 2);
+            request.onupgradeneeded = () => {
+                const db = request.result;
+                if (!db.objectStoreNames.contains('snapshots')) db.createObjectStore('snapshots');
+                if (!db.objectStoreNames.contains('outbox')) db.createObjectStore('outbox', { keyPath: 'seq', autoIncrement: true });
+                db.createObjectStore('rejected', { keyPath: 'seq', autoIncrement: true });
+            };
+            this.db = idbRequest(request);
+        }
+        return this.db;
+    }
+
+    async getSnapshot(name) {
+        const db = await this.open();
+        return idbRequest(db.transaction('snapshots').objectStore('snapshots').get(name));
+    }
+
+    async putSnapshot(name, value) {
+        const db = await this.open();
+        const tx = db.transaction('snapshots', 'readwrite');
+        tx.objectStore('snapshots').put(value, name);
+        return idbDone(tx);
+    }
+
+    async queue(feed) {
+        const db = await this.open();
+        const tx = db.transaction('outbox', 'readwrite');
+        tx.objectStore('outbox').add({ feed, batchKey: null, queuedAt: Date.now() });
+        return idbDone(tx);
+    }
+
+    async pendingCount() {
+        const db = await this.open();
+        return idbRequest(db.transaction('outbox').objectStore('outbox').count());
+    }
+
+    /*
+     * The batch to send next: one that was sent without an answer, if any,
+     * otherwise up to `size` of the oldest entries under a new key. Decided in
+     * one transaction, so the page and the service worker can't split the same
+     * entries into different batches.
+     */
+    async claimBatch(size) {
+        const db = await this.open();
+        const tx = db.transaction('outbox', 'readwrite');
+        const store = tx.objectStore('outbox');
+        let batch = [];
+
+        store.getAll().onsuccess = event => {
+            const entries = event.target.result;
+            const unanswered = entries.find(entry => entry.batchKey);
+            if (unanswered) {
+                batch = entries.filter(entry => entry.batchKey === unanswered.batchKey);
+                return;
+            }
+            const key = newIdempotencyKey();
+            batch = entries.slice(0, size);
+            for (const entry of batch) {
+                entry.batchKey = key;
+                store.put(entry);
+            }
+        };
+        await idbDone(tx);
+        return batch;
+    }
+
+    // Takes an answered batch off the outbox, keeping the entries the server
+    // rejected ({ entry, error } pairs) in the rejected store
+    async settle(entries, rejected) {
+        const db = await this.open();
+        const tx = db.transaction(['outbox', 'rejected'], 'readwrite');
+        for (const entry of entries) tx.objectStore('outbox').delete(entry.seq);
+        for (const { entry, error } of rejected) {
+            tx.objectStore('rejected').add({ feed: entry.feed, error, queuedAt: entry.queuedAt, rejectedAt: Date.now() });
+        }
+        return idbDone(tx);
+    }
+
+    async rejectedEntries() {
+        const db = await this.open();
+        return idbRequest(db.transaction('rejected').objectStore('rejected').getAll());
+    }
+
+    async clearRejected() {
+        const db = await this.open();
+        const tx = db.transaction('rejected', 'readwrite');
+        tx.objectStore('rejected').clear();
+        return idbDone(tx);
+    }
+}
+
+class Outbox {
+    constructor(store, root) {
+        this.store = store;
+        this.root = root;
+        this.running = null;
+    }
+
+    // Send everything queued. Resolves to { delivered, rejected }, the number
+    // of entries the server answered for and how many of those it rejected;
+    // anything left (offline, server error) stays queued for the next call.
+    sync() {
+        if (!this.running) {
+            this.running = this.drain().finally(() => { this.running = null; });
+        }
+        return this.running;
+    }
+
+    async drain() {
+        const counts = { delivered: 0, rejected: 0 };
+        for (;;) {
+            const batch = await this.store.claimBatch(OUTBOX_BATCH_SIZE);
+            if (batch.length === 0) return counts;
+
+            let response;
+            try {
+                response = await fetch(`${this.root}/api/feeds/batch`, {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json', 'Idempotency-Key': batch[0].batchKey },
+                    body: JSON.stringify({ feeds: batch.map(entry => entry.feed) })
+                });
+            } catch (error) {
+                return counts; // Still offline
+            }
+
+            // 201/207 are answers, and so is 400 (every entry rejected); anything
+            // else (server error, read-only follower) is retried later
+            if (!response.ok && response.status !== 400) return counts;
+            const result = await response.json();
+            const rejected = result.results
+                ? result.results.filter(item => !item.success).map(item => ({ entry: batch[item.index], error: item.error }))
+                : batch.map(entry => ({ entry, error: result.error }));
+            await this.store.settle(batch, rejected);
+            counts.delivered += batch.length;
+            counts.rejected += rejected.length;
+        }
+    }
+}
@@ -0,0 +1,123 @@
+"""
+Fingerprinted, precompressed static files.
+
+At startup each script and stylesheet in static/ is read once, hashed and
+compressed (gzip, plus brotli when the optional brotli package is
+installed). Pages link to them as assets/<name>.<hash>.<ext>: the name
+changes whenever the content does, so browsers can keep them for a year
+without revalidating, and each response is sent as the precompressed
+bytes the client accepts.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import zlib
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip only
+    brotli = None
+
+DIGEST_LENGTH = 12
+
+
+def digest(data):
+    """Short content hash used as the fingerprint."""
+    return hashlib.sha256(data).hexdigest()[:DIGEST_LENGTH]
+
+
+def compress(data, encoding, fast=False):
+    """
+    data encoded with "gzip" or "br", deterministically. Files compressed
+    once get the smallest output; fast is for bodies compressed per response.
+    """
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=6 if fast else 9, mtime=0)
+    if encoding == "br" and brotli is not None:
+        return brotli.compress(data, quality=5 if fast else 11)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def compress_stream(chunks, encoding):
+    """
+    Compress a stream of byte chunks with "gzip" or "br", at the fast level.
+    Each chunk is flushed as it arrives, so the client can decode everything
+    sent so far.
+    """
+    if encoding == "gzip":
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        for chunk in chunks:
+            yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush()
+    elif encoding == "br" and brotli is not None:
+        compressor = brotli.Compressor(quality=5)
+        for chunk in chunks:
+            yield compressor.process(chunk) + compressor.flush()
+        yield compressor.finish()
+    else:
+        raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def available_encodings():
+    """Content codings this server can produce, best first."""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+class Asset:
+    """One static file: its fingerprint and a body per content coding ("identity" is the file itself)."""
+
+    def __init__(self, name, data):
+        self.name = name
+        self.digest = digest(data)
+        stem, ext = os.path.splitext(name)
+        self.url_name = f"{stem}.{self.digest}{ext}"
+        self.mimetype = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        self.bodies = {"identity": data}
+        for encoding in available_encodings():
+            encoded = compress(data, encoding)
+            if len(encoded) < len(data):
+                self.bodies[encoding] = encoded
+
+    @property
+    def encodings(self):
+        return [encoding for encoding in self.bodies if encoding != "identity"]
+
+
+class AssetTable:
+    """The fingerprinted files of a directory, by file name and by URL name."""
+
+    def __init__(self, directory, extensions=(".css", ".js")):
+        self.assets = {}
+        self._by_stem = {}
+        for name in sorted(os.listdir(directory)):
+            path = os.path.join(directory, name)
+            if not name.endswith(extensions) or not os.path.isfile(path):
+                continue
+            with open(path, "rb") as f:
+                asset = Asset(name, f.read())
+            self.assets[name] = asset
+            stem, ext = os.path.splitext(name)
+            self._by_stem[(stem, ext)] = asset
+
+    def url_name(self, name):
+        """The fingerprinted name to link to for a file in the directory."""
+        return self.assets[name].url_name
+
+    def manifest(self):
+        """{file name: fingerprinted name} for every asset."""
+        return {name: asset.url_name for name, asset in self.assets.items()}
+
+    def lookup(self, url_name):
+        """
+        (asset, current) for a fingerprinted name, or (None, False). A name
+        with another fingerprint (a page from before a deploy) finds the
+        current file with current False, so it can be sent uncached.
+        """
+        stem, ext = os.path.splitext(url_name)
+        stem, _, digest = stem.rpartition(".")
+        asset = self._by_stem.get((stem, ext))
+        if asset is None:
+            return None, False
+        return asset, digest == asset.digest
@@ -0,0 +1,108 @@
+/*
+ * Offline service worker, rendered at <root>/sw.js (see the /sw.js route).
+ *
+ * Keeps the app shell (the page, its fingerprinted scripts and styles, and
+ * Chart.js) in the cache, so the app opens without a network: the page and
+ * Chart.js are served stale-while-revalidate, the fingerprinted files (which
+ * never change) straight from the cache. API requests and writes go to the
+ * network; the page keeps its own copy of the last data and queues writes in
+ * the outbox (static/offline.js), which this worker also flushes from a
+ * background sync.
+ *
+ * ASSETS changes with every deploy that changes a file, and so does this
+ * script, which makes the browser install the new version.
+ */
+
+const ASSETS = {{ assets|tojson }}; // File name -> fingerprinted path, relative to the scope
+
+importScripts(ASSETS['offline.js']);
+
+const CACHE = 'feed-tracker-v1';
+const CHART_JS = 'https://cdn.jsdelivr.net/npm/chart.js@4/dist/chart.umd.min.js';
+
+const SCOPE = self.registration.scope; // Ends with '/'
+const ROOT = new URL(SCOPE).pathname.replace(/\/$/, '');
+const FINGERPRINTED = new Set(Object.values(ASSETS).map(path => new URL(path, SCOPE).href));
+const ASSET_PREFIX = new URL('assets/', SCOPE).href;
+const REVALIDATED = new Set([SCOPE, new URL('static/manifest.json', SCOPE).href, CHART_JS]);
+const SHELL = [SCOPE, new URL('static/manifest.json', SCOPE).href].concat(Array.from(FINGERPRINTED));
+
+const outbox = new Outbox(new OfflineStore(ROOT), ROOT);
+
+self.addEventListener('install', event => {
+    event.waitUntil((async () => {
+        const cache = await caches.open(CACHE);
+        await cache.addAll(SHELL);
+        // Chart.js is a nice-to-have offline; don't fail the install over it
+        try {
+            await cache.add(new Request(CHART_JS, { mode: 'cors' }));
+        } catch (error) {
+            console.warn('Chart.js not cached:', error);
+        }
+        await self.skipWaiting();
+    })());
+});
+
+self.addEventListener('activate', event => {
+    event.waitUntil((async () => {
+        for (const name of await caches.keys()) {
+            if (name.startsWith('feed-tracker-') && name !== CACHE) await caches.delete(name);
+        }
+        // Drop this scope's files from earlier versions
+        const cache = await caches.open(CACHE);
+        for (const request of await cache.keys()) {
+            if (request.url.startsWith(ASSET_PREFIX) && !FINGERPRINTED.has(request.url)) await cache.delete(request);
+        }
+        await self.clients.claim();
+    })());
+});
+
+self.addEventListener('fetch', event => {
+    const request = event.request;
+    if (request.method !== 'GET') return;
+
+    const url = new URL(request.url);
+    url.search = '';
+    if (request.mode === 'navigate' && url.href === SCOPE) {
+        event.respondWith(staleWhileRevalidate(event, SCOPE));
+    } else if (FINGERPRINTED.has(request.url)) {
+        event.respondWith(cacheFirst(request.url));
+    } else if (REVALIDATED.has(request.url)) {
+        event.respondWith(staleWhileRevalidate(event, request.url));
+    }
+});
+
+async function cacheFirst(key) {
+    const cache = await caches.open(CACHE);
+    const cached = await cache.match(key);
+    if (cached) return cached;
+    const response = await fetch(key);
+    if (response.ok) cache.put(key, response.clone());
+    return response;
+}
+
+async function staleWhileRevalidate(event, key) {
+    const cache = await caches.open(CACHE);
+    const cached = await cache.match(key);
+    const network = fetch(key, key === CHART_JS ? { mode: 'cors' } : {}).then(response => {
+        if (response.ok) cache.put(key, response.clone());
+        return response;
+    });
+    if (!cached) return network;
+    event.waitUntil(network.catch(() => {}));
+    return cached;
+}
+
+self.addEventListener('sync', event => {
+    if (event.tag !== 'outbox') return;
+    event.waitUntil((async () => {
+        const { delivered, rejected } = await outbox.sync();
+        if (delivered > 0) {
+            for (const client of await self.clients.matchAll()) {
+                client.postMessage({ type: 'outbox-synced', delivered, rejected });
+            }
+        }
+        // Entries still queued: fail so the browser retries the sync later
+        if (await outbox.store.pendingCount() > 0) throw new Error('Outbox not empty');
+    })());
+});
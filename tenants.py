@@ -0,0 +1,46 @@
+"""
+Several children or households on one server.
+
+Each tenant has its own feed workbook under the tenants directory
+(tenants/<key>/feeds.xlsx), and with it its own lock, in-memory table,
+snapshot, journal, archive and backups. A request picks its tenant with a
+/t/<key>/ URL prefix (so the whole UI can be opened per child) or an
+X-Tenant header; requests with neither use the default feed file.
+"""
+
+import os
+import re
+
+TENANT_HEADER = "X-Tenant"
+ENVIRON_KEY = "baby_oclock.tenant"
+
+_TENANT_KEY = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+_URL_PREFIX = re.compile(r"^/t/([A-Za-z0-9_-]{1,64})(?=/|$)")
+
+
+def is_valid_tenant(key):
+    return bool(key) and _TENANT_KEY.match(key) is not None
+
+
+def tenant_feed_file(tenants_dir, key):
+    """Workbook path for a tenant key (already validated)."""
+    return os.path.join(tenants_dir, key, "feeds.xlsx")
+
+
+class TenantPrefixMiddleware:
+    """
+    WSGI middleware serving /t/<key>/... as tenant <key>: the prefix moves
+    into SCRIPT_NAME, so routes, url_for and request.script_root all work
+    unchanged under it.
+    """
+
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ, start_response):
+        match = _URL_PREFIX.match(environ.get("PATH_INFO", ""))
+        if match:
+            environ[ENVIRON_KEY] = match.group(1)
+            environ["SCRIPT_NAME"] = environ.get("SCRIPT_NAME", "") + match.group(0)
+            environ["PATH_INFO"] = environ["PATH_INFO"][match.end():] or "/"
+        return self.wsgi_app(environ, start_response)
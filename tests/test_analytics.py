@@ -0,0 +1,99 @@
+"""
+Test /api/analytics - NumPy per-day / per-hour matrices.
+"""
+
+import os
+
+import pytest
+from openpyxl import load_workbook
+
+import app as app_module
+from feed_table import journal_path_for, snapshot_path_for
+
+
+@pytest.fixture
+def analytics_data(client):
+    feeds = [
+        {"type": "bottle", "amount_ml": 90.0, "timestamp": "2026-02-09T01:00:00"},
+        {"type": "nurse", "side": "left", "duration_min": 12, "timestamp": "2026-02-09T04:00:00"},
+        {"type": "pump", "side": "both", "amount_ml": 120.0, "timestamp": "2026-02-09T04:30:00"},
+        {"type": "diaper", "side": "pee", "timestamp": "2026-02-09T05:00:00"},
+        {"type": "bottle", "amount_ml": 60.5, "timestamp": "2026-02-10T01:00:00"},
+        {"type": "vitamin_d", "timestamp": "2026-02-10T09:00:00"},
+    ]
+    for feed in feeds:
+        client.post('/api/feeds', json=feed)
+
+
+class TestAnalytics:
+    """Test GET /api/analytics"""
+
+    def test_per_day(self, client, analytics_data):
+        data = client.get('/api/analytics?from=2026-02-08&to=2026-02-10').get_json()
+
+        assert data['days'] == ["2026-02-08", "2026-02-09", "2026-02-10"]
+        assert data['per_day'] == {
+            "intake_ml": [0.0, 90.0, 60.5],
+            "feeds": [0, 2, 1],
+            "diapers": [0, 1, 0],
+            "pump_ml": [0.0, 120.0, 0.0],
+        }
+
+    def test_per_hour_of_day(self, client, analytics_data):
+        per_hour = client.get('/api/analytics?from=2026-02-09&to=2026-02-10').get_json()['per_hour']
+
+        assert len(per_hour['feeds']) == 24
+        assert per_hour['feeds'][1] == 2
+        assert per_hour['intake_ml'][1] == 150.5
+        assert per_hour['feeds'][4] == 1
+        assert per_hour['pump_ml'][4] == 120.0
+        assert per_hour['diapers'][5] == 1
+        assert sum(per_hour['feeds']) == 3
+
+    def test_interval_percentiles(self, client, analytics_data):
+        intervals = client.get('/api/analytics?from=2026-02-09&to=2026-02-10').get_json()['intervals_min']
+
+        # Feeds at 01:00, 04:00 and 01:00 the next day: gaps of 180 and 1260 minutes
+        assert intervals['count'] == 2
+        assert intervals['p50'] == 720.0
+        assert intervals['p10'] == 288.0
+
+    def test_updates_after_write(self, client, analytics_data):
+        client.get('/api/analytics?from=2026-02-10&to=2026-02-10')
+        client.post('/api/feeds', json={"type": "diaper", "side": "poop", "timestamp": "2026-02-10T10:00:00"})
+
+        data = client.get('/api/analytics?from=2026-02-10&to=2026-02-10').get_json()
+        assert data['per_day']['diapers'] == [1]
+
+    def test_empty_range(self, client):
+        data = client.get('/api/analytics?from=2026-02-01&to=2026-02-02').get_json()
+        assert data['per_day']['feeds'] == [0, 0]
+        assert data['intervals_min'] == {"p10": None, "p25": None, "p50": None, "p75": None, "p90": None, "count": 0}
+
+    def test_defaults_to_last_30_days(self, client):
+        assert len(client.get('/api/analytics').get_json()['days']) == 30
+
+    @pytest.mark.parametrize("query", ["from=2026-02-10&to=2026-02-01", "from=bad", "from=2000-01-01&to=2026-01-01"])
+    def test_invalid_range(self, client, query):
+        response = client.get(f'/api/analytics?{query}')
+        assert response.status_code == 400
+        assert response.get_json()['success'] is False
+
+    def test_workbook_edited_outside_the_app(self, client, temp_xlsx):
+        """A table rebuilt without its snapshot starts its versions over; cached columns don't survive that"""
+        def add_outside_app(hour):
+            wb = load_workbook(temp_xlsx)
+            wb.active.append(["2026-02-10", f"{hour:02d}:00 AM", "Feed (Bottle)", 90, None, "", "Dad",
+                              f"2026-02-10T{hour:02d}:00:00"])
+            wb.save(temp_xlsx)
+            for path in (snapshot_path_for(temp_xlsx), journal_path_for(temp_xlsx)):
+                if os.path.exists(path):
+                    os.remove(path)
+            app_module.feed_tables.clear()
+
+        query = '/api/analytics?from=2026-02-10&to=2026-02-10'
+        add_outside_app(1)
+        assert client.get(query).get_json()['per_day']['feeds'] == [1]
+        add_outside_app(2)
+        assert client.get(query).get_json()['per_day']['feeds'] == [2]
+
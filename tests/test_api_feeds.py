@@ -395,3 +395,55 @@ class TestUpdateFeed:
             "amount_ml": 90.0
         })
         assert response.status_code == 404
+
+
+class TestHomeEndpoint:
+    """Test the combined GET /api/home endpoint"""
+
+    def log_today(self, client):
+        now = datetime.now()
+        client.post('/api/feeds', json={"type": "bottle", "amount_ml": 90, "timestamp": (now - timedelta(minutes=30)).isoformat()})
+        client.post('/api/feeds', json={"type": "diaper", "notes": "wet", "timestamp": (now - timedelta(minutes=20)).isoformat()})
+        client.post('/api/feeds', json={"type": "pump", "amount_ml": 60, "timestamp": (now - timedelta(minutes=10)).isoformat()})
+
+    def test_matches_separate_endpoints(self, client):
+        """Feeds, stats and vitamin status agree with the endpoints the home screen used to call"""
+        self.log_today(client)
+        client.post('/api/vitamin', json={"logged_by": "Mom"})
+
+        home = client.get('/api/home').get_json()
+        feeds = client.get('/api/feeds?limit_days=7').get_json()
+        assert home['stats'] == client.get('/api/stats').get_json()
+        assert home['vitamin'] == client.get('/api/vitamin-status').get_json()
+        assert home['vitamin']['given_today'] is True
+        for key, value in feeds.items():
+            assert home[key] == value
+        assert len(home['feeds']) == 4
+        assert home['stats']['today']['total_ml'] == 90
+        assert home['last_feed_minutes_ago'] in (19, 20)
+
+    def test_vitamin_not_given(self, client):
+        self.log_today(client)
+        home = client.get('/api/home').get_json()
+        assert home['vitamin'] == {"given_today": False, "vitamin_feed_id": None, "time_given": None}
+
+    def test_refreshes_after_write(self, client):
+        assert client.get('/api/home').get_json()['feeds'] == []
+        self.log_today(client)
+        assert len(client.get('/api/home').get_json()['feeds']) == 3
+
+    def test_logs_missed_dose_once(self, client, yesterday_str):
+        client.post('/api/feeds', json={"type": "bottle", "amount_ml": 100,
+                                        "timestamp": (datetime.now() - timedelta(days=1)).isoformat()})
+        client.get('/api/home')
+        home = client.get('/api/home').get_json()
+
+        missed = [f for f in home['feeds'] if 'Vitamin D' in f['type']]
+        assert len(missed) == 1
+        assert missed[0]['date'] == yesterday_str
+        assert missed[0]['logged_by'] == 'Auto'
+
+    def test_rejects_bad_limit(self, client):
+        response = client.get('/api/home?limit_days=0')
+        assert response.status_code == 400
+        assert response.get_json()['success'] is False
@@ -76,3 +76,118 @@ class TestHistoryFeeds:
         
         # Should NOT include yesterday
         assert yesterday.strftime("%Y-%m-%d") not in dates
+
+
+class TestHistoryPages:
+    """Test GET /api/feeds?before=&limit= cursor pagination"""
+
+    def log_days(self, client, days, per_day=3, start=datetime(2026, 1, 1)):
+        for day in range(days):
+            for k in range(per_day):
+                client.post('/api/feeds', json={
+                    "type": "bottle",
+                    "amount_ml": 10 * (k + 1),
+                    "timestamp": (start + timedelta(days=day, hours=2 + 6 * k)).isoformat()
+                })
+
+    def walk(self, client, limit, before=None):
+        pages = []
+        while True:
+            url = f'/api/feeds?limit={limit}' + (f'&before={before}' if before else '')
+            data = client.get(url).get_json()
+            pages.append(data['feeds'])
+            before = data['next_cursor']
+            if before is None:
+                return pages
+            assert before == data['feeds'][-1]['date']
+
+    def test_pages_cover_history_once(self, client):
+        self.log_days(client, 10)
+        pages = self.walk(client, limit=5)
+
+        feeds = [f for page in pages for f in page]
+        assert len(feeds) == 30
+        assert [f['timestamp'] for f in feeds] == sorted((f['timestamp'] for f in feeds), reverse=True)
+        # At least `limit` entries, always whole days
+        assert [len(page) for page in pages] == [6, 6, 6, 6, 6]
+        assert feeds[0]['date'] == '2026-01-10'
+        assert feeds[-1]['date'] == '2026-01-01'
+
+    def test_before_excludes_that_day(self, client):
+        self.log_days(client, 5)
+        data = client.get('/api/feeds?before=2026-01-03&limit=100').get_json()
+        assert {f['date'] for f in data['feeds']} == {'2026-01-01', '2026-01-02'}
+        assert data['next_cursor'] is None
+
+    def test_ids_match_date_query(self, client):
+        """Paged entries can be edited and deleted like any other"""
+        self.log_days(client, 3)
+        page = client.get('/api/feeds?before=2026-01-03&limit=1').get_json()['feeds']
+        by_date = client.get('/api/feeds?date=2026-01-02').get_json()['feeds']
+        assert sorted(f['id'] for f in page) == sorted(f['id'] for f in by_date)
+
+        client.delete(f"/api/feeds/{page[0]['id']}")
+        pages = self.walk(client, limit=2)
+        assert sum(len(p) for p in pages) == 8
+
+    def test_empty_history(self, client):
+        data = client.get('/api/feeds?limit=10').get_json()
+        assert data == {"feeds": [], "next_cursor": None}
+
+    def test_rejects_bad_parameters(self, client):
+        assert client.get('/api/feeds?limit=0').status_code == 400
+        assert client.get('/api/feeds?limit=100000').status_code == 400
+        response = client.get('/api/feeds?before=yesterday')
+        assert response.status_code == 400
+        assert response.get_json()['success'] is False
+
+    def test_pages_continue_into_archive(self, client):
+        from app import archive_feeds_before
+        self.log_days(client, 10)
+        expected = [f['timestamp'] for page in self.walk(client, limit=4) for f in page]
+
+        archive_feeds_before('2026-01-04')
+        archive_feeds_before('2026-01-07')
+        pages = self.walk(client, limit=4)
+        feeds = [f for page in pages for f in page]
+
+        assert [f['timestamp'] for f in feeds] == expected
+        assert all(f.get('archived') for f in feeds if f['date'] < '2026-01-07')
+        assert not any(f.get('archived') for f in feeds if f['date'] >= '2026-01-07')
+
+    def test_archived_days_merge_with_backdated_entries(self, client):
+        """Entries logged after archiving but dated inside it are paged in order"""
+        from app import archive_feeds_before
+        self.log_days(client, 6)
+        archive_feeds_before('2026-01-05')
+        client.post('/api/feeds', json={"type": "diaper", "timestamp": "2026-01-02T23:00:00"})
+
+        feeds = [f for page in self.walk(client, limit=2) for f in page]
+        assert len(feeds) == 19
+        assert [f['timestamp'] for f in feeds] == sorted((f['timestamp'] for f in feeds), reverse=True)
+
+    def test_overlapping_archive_segments(self, client):
+        from app import archive_feeds_before
+        self.log_days(client, 6)
+        archive_feeds_before('2026-01-05')
+        client.post('/api/feeds', json={"type": "diaper", "timestamp": "2026-01-02T23:00:00"})
+        archive_feeds_before('2026-01-06')
+
+        feeds = [f for page in self.walk(client, limit=2) for f in page]
+        assert len(feeds) == 19
+        assert [f['timestamp'] for f in feeds] == sorted((f['timestamp'] for f in feeds), reverse=True)
+        assert sum(1 for f in feeds if f.get('archived')) == 16
+
+    def test_hot_entries_older_than_archive(self, client):
+        """A backdated hot entry before the archive doesn't pull every archived day onto one page"""
+        from app import archive_feeds_before
+        self.log_days(client, 30)
+        archive_feeds_before('2026-01-29')
+        client.post('/api/feeds', json={"type": "diaper", "timestamp": "2025-12-01T08:00:00"})
+
+        pages = self.walk(client, limit=5)
+        feeds = [f for page in pages for f in page]
+        assert len(feeds) == 91
+        assert [f['timestamp'] for f in feeds] == sorted((f['timestamp'] for f in feeds), reverse=True)
+        assert all(len(page) == 6 for page in pages[:-1])
+        assert [f['date'] for f in pages[-1]] == ['2025-12-01']
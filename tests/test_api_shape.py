@@ -0,0 +1,93 @@
+"""
+Test ?fields= projection, ?shape=columns and compression of JSON responses.
+"""
+
+import gzip
+
+import pytest
+
+import app as app_module
+
+
+class TestFieldProjection:
+    """Test ?fields= and ?shape= on the entry endpoints"""
+
+    def test_fields_selects_keys(self, client, seed_data):
+        feeds = client.get('/api/feeds?date=2026-02-10&fields=id,type').get_json()['feeds']
+        assert len(feeds) == 2
+        assert all(set(feed) == {"id", "type"} for feed in feeds)
+
+    def test_default_is_every_field(self, client, seed_data):
+        feed = client.get('/api/feeds?date=2026-02-10').get_json()['feeds'][0]
+        assert set(feed) == set(app_module.FEED_FIELDS)
+
+    def test_columns(self, client, seed_data):
+        rows = client.get('/api/feeds?date=2026-02-10').get_json()
+        cols = client.get('/api/feeds?date=2026-02-10&shape=columns').get_json()
+
+        assert set(cols['feeds']) == set(app_module.FEED_FIELDS)
+        assert cols['feeds']['id'] == [feed['id'] for feed in rows['feeds']]
+        assert cols['feeds']['amount_ml'] == [feed['amount_ml'] for feed in rows['feeds']]
+        # Only the entry list changes shape
+        assert cols['last_feed_summary'] == rows['last_feed_summary']
+
+    def test_columns_with_fields(self, client, seed_data):
+        feeds = client.get('/api/feeds?date=2026-02-10&fields=date,amount_ml&shape=columns').get_json()['feeds']
+        assert set(feeds) == {"date", "amount_ml"}
+        assert feeds['date'] == ["2026-02-10"] * 2
+
+    def test_history_page(self, client, seed_data):
+        data = client.get('/api/feeds?limit=2&fields=timestamp&shape=columns').get_json()
+        assert list(data['feeds']) == ["timestamp"]
+        assert [ts[:16] for ts in data['feeds']['timestamp']] == ["2026-02-10T03:02", "2026-02-10T01:15"]
+        assert data['next_cursor'] == "2026-02-10"
+
+    def test_home(self, client, seed_data):
+        data = client.get('/api/home?limit_days=3650&fields=type').get_json()
+        assert all(set(feed) == {"type"} for feed in data['feeds'])
+        # Stats are worked out from the full entries
+        assert "stats" in data and "vitamin" in data
+
+    def test_unknown_field(self, client):
+        resp = client.get('/api/feeds?fields=id,color')
+        assert resp.status_code == 400
+        assert "color" in resp.get_json()['error']
+
+    def test_unknown_shape(self, client):
+        assert client.get('/api/home?shape=grid').status_code == 400
+
+    def test_shapes_cached_separately(self, client, seed_data):
+        client.get('/api/feeds?date=2026-02-10')
+        feeds = client.get('/api/feeds?date=2026-02-10&fields=id').get_json()['feeds']
+        assert set(feeds[0]) == {"id"}
+
+
+class TestCompression:
+    """Test negotiated compression of JSON responses"""
+
+    def test_large_json_is_compressed(self, client, seed_data, monkeypatch):
+        monkeypatch.setattr(app_module, "COMPRESS_MIN_BYTES", 100)
+        plain = client.get('/api/feeds?date=2026-02-10')
+        resp = client.get('/api/feeds?date=2026-02-10', headers={"Accept-Encoding": "gzip, deflate"})
+
+        assert "Content-Encoding" not in plain.headers
+        assert resp.headers["Content-Encoding"] == "gzip"
+        assert resp.headers["Vary"] == "Accept, Accept-Encoding"
+        body = gzip.decompress(resp.get_data())
+        assert body.startswith(plain.get_data()[:100])
+        assert int(resp.headers["Content-Length"]) == len(resp.get_data())
+
+    def test_small_json_is_not(self, client):
+        resp = client.get('/api/stats', headers={"Accept-Encoding": "gzip"})
+        assert "Content-Encoding" not in resp.headers
+
+    def test_refused_coding(self, client, seed_data, monkeypatch):
+        monkeypatch.setattr(app_module, "COMPRESS_MIN_BYTES", 100)
+        resp = client.get('/api/feeds?date=2026-02-10', headers={"Accept-Encoding": "gzip;q=0"})
+        assert "Content-Encoding" not in resp.headers
+
+    def test_streamed_export_untouched(self, client, seed_data, monkeypatch):
+        monkeypatch.setattr(app_module, "COMPRESS_MIN_BYTES", 1)
+        resp = client.get('/api/export?format=ndjson', headers={"Accept-Encoding": "gzip"})
+        assert "Content-Encoding" not in resp.headers
+        assert resp.get_data().count(b"\n") == 5
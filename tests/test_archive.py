@@ -0,0 +1,78 @@
+"""
+Test the cold-tier archive of old entries.
+"""
+
+import gzip
+import json
+import os
+import pytest
+from openpyxl import load_workbook
+
+from app import archive_feeds_before, get_archive_dir, get_feeds_from_excel
+
+
+class TestArchive:
+    """Test moving old entries out of the workbook"""
+
+    def test_archive_moves_old_rows(self, client, temp_xlsx, seed_data):
+        """Entries before the cutoff leave the workbook and land in a segment"""
+        moved = archive_feeds_before("2026-02-10")
+        assert moved == 3
+
+        wb = load_workbook(temp_xlsx)
+        dates = [row[0] for row in wb.active.iter_rows(min_row=2, values_only=True)]
+        assert dates == ["2026-02-10", "2026-02-10"]
+
+        with open(os.path.join(get_archive_dir(), "index.json")) as f:
+            index = json.load(f)
+        assert index["archived_before"] == "2026-02-10"
+        segment = index["segments"][0]
+        assert segment["count"] == 3
+        assert segment["first_date"] == segment["last_date"] == "2026-02-09"
+        assert segment["total_bottle_ml"] == 0
+        assert segment["total_feeds"] == 2
+
+        with gzip.open(os.path.join(get_archive_dir(), segment["file"]), "rt") as f:
+            assert len(f.readlines()) == 3
+
+    def test_nothing_to_archive(self, client, seed_data):
+        """No segment is written when nothing is old enough"""
+        assert archive_feeds_before("2020-01-01") == 0
+        assert not os.path.exists(get_archive_dir())
+
+    def test_history_merges_archive(self, client, seed_data):
+        """Date queries reaching back into the archive still return the entries"""
+        archive_feeds_before("2026-02-10")
+
+        feeds = client.get('/api/feeds?date=2026-02-09').get_json()['feeds']
+        assert len(feeds) == 3
+        assert all(f['archived'] and f['id'] is None for f in feeds)
+        assert [f['time'] for f in feeds] == ['11:30 PM', '09:00 PM', '06:45 PM']
+
+        # Hot tier alone no longer has them
+        assert len(get_feeds_from_excel()) == 2
+
+    def test_segments_are_immutable(self, client, seed_data):
+        """A second archive run adds a new segment instead of rewriting"""
+        archive_feeds_before("2026-02-10")
+        archive_feeds_before("2026-02-11")
+
+        with open(os.path.join(get_archive_dir(), "index.json")) as f:
+            index = json.load(f)
+        assert [s["file"] for s in index["segments"]] == [
+            "feeds-2026-001.jsonl.gz",
+            "feeds-2026-002.jsonl.gz",
+        ]
+        assert index["archived_before"] == "2026-02-11"
+
+        feeds = client.get('/api/feeds?limit_days=100000').get_json()['feeds']
+        assert len(feeds) == 5
+
+    def test_deletes_still_work_after_archive(self, client, seed_data):
+        """Hot-tier ids are row numbers of the shrunken workbook"""
+        archive_feeds_before("2026-02-10")
+
+        feeds = client.get('/api/feeds?date=2026-02-10').get_json()['feeds']
+        resp = client.delete(f"/api/feeds/{feeds[0]['id']}")
+        assert resp.status_code == 200
+        assert len(get_feeds_from_excel()) == 1
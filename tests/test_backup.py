@@ -0,0 +1,130 @@
+"""
+Test incremental backups and point-in-time restore.
+"""
+
+import glob
+import os
+import pytest
+import time
+from openpyxl import load_workbook
+
+import app as app_module
+import backup
+import feed_table
+from feed_table import journal_path_for
+
+
+def bottle(timestamp, amount_ml=60.0):
+    return {"type": "bottle", "amount_ml": amount_ml, "timestamp": timestamp, "logged_by": "Dad"}
+
+
+def kinds(backup_dir):
+    return [e["kind"] for e in backup.load_manifest(backup_dir)["entries"]]
+
+
+class TestBackup:
+    """Test base snapshots and incremental segments"""
+
+    def test_first_backup_is_base_then_incremental(self, client, temp_xlsx, seed_data):
+        """Later runs only write the records since the previous one"""
+        first = app_module.backup_feeds()
+        assert first["kind"] == "base"
+        assert first["records"] == 5
+
+        client.post('/api/feeds', json=bottle("2026-02-11T08:00:00"))
+        client.delete('/api/feeds/1')
+
+        second = app_module.backup_feeds()
+        assert second["kind"] == "incremental"
+        assert second["records"] == 2
+        assert kinds(app_module.get_backup_dir()) == ["base", "incremental"]
+
+    def test_no_changes_writes_nothing(self, client, temp_xlsx, seed_data):
+        app_module.backup_feeds()
+        assert app_module.backup_feeds()["kind"] == "none"
+        assert kinds(app_module.get_backup_dir()) == ["base"]
+
+    def test_sealed_journals_are_consumed(self, client, temp_xlsx, seed_data, monkeypatch):
+        """Compaction keeps the journal for the next backup, which then deletes it"""
+        app_module.backup_feeds()
+        monkeypatch.setattr(feed_table, "SNAPSHOT_EVERY", 2)
+
+        for hour in range(10, 15):
+            client.post('/api/feeds', json=bottle(f"2026-02-11T{hour}:00:00"))
+        assert glob.glob(journal_path_for(temp_xlsx) + ".*")
+
+        stats = app_module.backup_feeds()
+        assert stats["kind"] == "incremental"
+        assert stats["records"] == 5
+        assert not glob.glob(journal_path_for(temp_xlsx) + ".*")
+
+    def test_gap_in_journal_forces_base(self, client, temp_xlsx, seed_data):
+        """Archiving rewrites the workbook without journal records, so the next backup is a base"""
+        app_module.backup_feeds()
+        app_module.archive_feeds_before("2026-02-10")
+
+        assert app_module.backup_feeds()["kind"] == "base"
+
+    def test_seq_going_backwards_forces_base(self, client, temp_xlsx, seed_data):
+        """A table rebuilt without its snapshot restarts at seq 0, behind the last backup"""
+        app_module.backup_feeds()
+        with app_module.get_file_lock():
+            table = app_module.get_feed_table()
+        rebuilt = feed_table.FeedTable(temp_xlsx, list(table.rows), seq=0, fingerprint=table.fingerprint)
+
+        stats = backup.run_backup(rebuilt, app_module.get_backup_dir())
+        assert stats["kind"] == "base"
+        assert stats["records"] == 5
+        assert kinds(app_module.get_backup_dir()) == ["base", "base"]
+
+    def test_base_is_retaken_weekly(self, client, temp_xlsx, seed_data):
+        app_module.backup_feeds()
+        client.post('/api/feeds', json=bottle("2026-02-11T08:00:00"))
+
+        with app_module.get_file_lock():
+            table = app_module.get_feed_table()
+            later = time.time() + (backup.FULL_EVERY_DAYS + 1) * 86400
+            stats = backup.run_backup(table, app_module.get_backup_dir(), now=later)
+        assert stats["kind"] == "base"
+
+
+class TestRestore:
+    """Test rebuilding the feed log as of a point in time"""
+
+    def test_restore_as_of_time(self, client, temp_xlsx, seed_data):
+        app_module.backup_feeds()
+        time.sleep(0.01)
+        client.post('/api/feeds', json=bottle("2026-02-11T08:00:00", 70.0))
+        time.sleep(0.01)
+        between = time.time()
+        time.sleep(0.01)
+        client.delete('/api/feeds/1')
+        app_module.backup_feeds()
+
+        with app_module.get_file_lock():
+            current = list(app_module.get_feed_table().rows)
+
+        rows = backup.restore_rows(app_module.get_backup_dir(), between)
+        assert len(rows) == 6
+        assert rows[-1][3] == 70.0
+
+        assert backup.restore_rows(app_module.get_backup_dir(), time.time()) == current
+
+    def test_restore_before_first_backup_fails(self, client, temp_xlsx, seed_data):
+        app_module.backup_feeds()
+        with pytest.raises(ValueError):
+            backup.restore_rows(app_module.get_backup_dir(), 0)
+
+    def test_restore_command_writes_workbook(self, app, client, temp_xlsx, seed_data, tmp_path):
+        runner = app.test_cli_runner()
+        assert runner.invoke(args=["backup"]).exit_code == 0
+
+        output = str(tmp_path / "restored.xlsx")
+        as_of = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(time.time() + 1))
+        result = runner.invoke(args=["restore", "--as-of", as_of, "--output", output])
+        assert result.exit_code == 0, result.output
+
+        original = [r for r in load_workbook(temp_xlsx).active.iter_rows(values_only=True)]
+        restored = [r for r in load_workbook(output).active.iter_rows(values_only=True)]
+        assert restored == original
+        assert os.path.exists(temp_xlsx)
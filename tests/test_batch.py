@@ -0,0 +1,88 @@
+"""
+Test POST /api/feeds/batch - many entries in one write.
+"""
+
+import pytest
+from openpyxl import load_workbook
+
+import app as app_module
+
+
+class TestBatchFeeds:
+    """Test the batch write endpoint"""
+
+    def test_batch_creates_all_entries(self, client, temp_xlsx):
+        """Every valid entry is written and gets its row id"""
+        feeds = [
+            {"type": "bottle", "side": "milk", "amount_ml": 90, "timestamp": "2026-02-10T03:00:00"},
+            {"type": "nurse", "side": "left", "duration_min": 12, "timestamp": "2026-02-10T06:00:00"},
+            {"type": "diaper", "side": "pee", "timestamp": "2026-02-10T06:05:00"},
+        ]
+        resp = client.post('/api/feeds/batch', json=feeds)
+
+        assert resp.status_code == 201
+        data = resp.get_json()
+        assert data['created'] == 3
+        assert [r['id'] for r in data['results']] == [1, 2, 3]
+
+        types = [f['type'] for f in client.get('/api/feeds?date=2026-02-10').get_json()['feeds']]
+        assert types == ["Diaper (Pee)", "Nurse (Left)", "Feed (Bottle - Milk)"]
+
+    def test_accepts_wrapped_list(self, client):
+        resp = client.post('/api/feeds/batch', json={"feeds": [{"type": "vitamin_d"}]})
+        assert resp.status_code == 201
+
+    def test_ids_follow_existing_rows(self, client, seed_data):
+        resp = client.post('/api/feeds/batch', json=[{"type": "bottle"}, {"type": "pump"}])
+        assert [r['id'] for r in resp.get_json()['results']] == [6, 7]
+
+    def test_partial_failure_reports_per_item(self, client, temp_xlsx):
+        """Invalid entries are reported by index and the rest are still written"""
+        resp = client.post('/api/feeds/batch', json=[
+            {"type": "bottle", "amount_ml": 60},
+            {"type": "sandwich"},
+            {"type": "bottle", "timestamp": "yesterday-ish"},
+            {"type": "bottle", "amount_ml": "lots"},
+            "not an object",
+            {"type": "nurse", "side": "right"},
+        ])
+
+        assert resp.status_code == 207
+        data = resp.get_json()
+        assert data['created'] == 2
+        assert data['failed'] == 4
+        assert [r['success'] for r in data['results']] == [True, False, False, False, False, True]
+        assert data['results'][5]['id'] == 2
+        assert 'sandwich' in data['results'][1]['error']
+
+        assert load_workbook(temp_xlsx).active.max_row == 3
+
+    def test_all_invalid_writes_nothing(self, client, temp_xlsx):
+        resp = client.post('/api/feeds/batch', json=[{"type": None}])
+        assert resp.status_code == 400
+        assert load_workbook(temp_xlsx).active.max_row == 1
+
+    def test_rejects_non_list(self, client):
+        resp = client.post('/api/feeds/batch', json={"type": "bottle"})
+        assert resp.status_code == 400
+
+    def test_rejects_oversized_batch(self, client, monkeypatch):
+        monkeypatch.setattr(app_module, "MAX_BATCH_SIZE", 2)
+        resp = client.post('/api/feeds/batch', json=[{"type": "bottle"}] * 3)
+        assert resp.status_code == 413
+
+    def test_single_workbook_save(self, client, monkeypatch):
+        """A 500-entry batch loads and saves the workbook once"""
+        loads = []
+        real_load = app_module.load_workbook
+
+        def counting_load(*args, **kwargs):
+            loads.append(args)
+            return real_load(*args, **kwargs)
+        monkeypatch.setattr(app_module, "load_workbook", counting_load)
+
+        resp = client.post('/api/feeds/batch', json=[{"type": "bottle", "amount_ml": 30}] * 500)
+
+        assert resp.status_code == 201
+        assert resp.get_json()['results'][-1]['id'] == 500
+        assert len(loads) == 1
@@ -0,0 +1,111 @@
+"""
+Test the memory-mapped event log storage engine.
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from app import get_feeds_from_excel
+from event_log import EventLogStore, INITIAL_CAPACITY
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = EventLogStore(str(tmp_path / "feeds.log"))
+    yield store
+    store.close()
+
+
+class TestEventLog:
+    """Test EventLogStore against the workbook functions"""
+
+    def test_same_shape_as_workbook(self, client, store):
+        """An entry reads back exactly as the workbook returns it (apart from the id)"""
+        feed = {
+            "type": "pump", "side": "left", "amount_ml": 75.5, "duration_min": 15,
+            "notes": "宝宝 🍼", "logged_by": "Mom", "timestamp": "2026-02-10T14:30:00"
+        }
+        client.post('/api/feeds', json=feed)
+        store.add_feed(feed)
+
+        assert store.get_feeds() == get_feeds_from_excel()
+
+    def test_int_and_none_preserved(self, store):
+        feed_id = store.add_feed({"type": "bottle", "amount_ml": 90, "timestamp": "2026-02-10T10:00:00"})
+        feed = store.get_feeds()[0]
+
+        assert feed["id"] == feed_id
+        assert feed["amount_ml"] == 90 and isinstance(feed["amount_ml"], int)
+        assert feed["duration_min"] is None
+        assert feed["notes"] == ""
+
+    def test_unknown_type_kept_verbatim(self, store):
+        store.add_feed({"type": "bath", "timestamp": "2026-02-10T10:00:00"})
+        assert store.get_feeds()[0]["type"] == "bath"
+
+    def test_date_filters(self, store):
+        for ts in ["2026-02-08T23:59:00", "2026-02-09T00:01:00", "2026-02-09T22:00:00", "2026-02-10T08:00:00"]:
+            store.add_feed({"type": "bottle", "amount_ml": 60, "timestamp": ts})
+
+        assert [f["time"] for f in store.get_feeds(date_filter="2026-02-09")] == ["12:01 AM", "10:00 PM"]
+        assert len(store.get_feeds(min_date="2026-02-09")) == 3
+
+    def test_backdated_entry_keeps_time_order(self, store):
+        later = store.add_feed({"type": "bottle", "timestamp": "2026-02-10T10:00:00"})
+        earlier = store.add_feed({"type": "nurse", "side": "left", "timestamp": "2026-02-10T08:00:00"})
+
+        assert [f["id"] for f in store.get_feeds()] == [earlier, later]
+        assert store.delete_feed(later)
+        assert [f["id"] for f in store.get_feeds()] == [earlier]
+
+    def test_update_in_place_and_moved(self, store):
+        feed_id = store.add_feed({"type": "bottle", "amount_ml": 60, "timestamp": "2026-02-10T10:00:00"})
+        store.add_feed({"type": "diaper", "side": "pee", "timestamp": "2026-02-10T11:00:00"})
+
+        # Same time: overwritten in place, timestamp preserved when omitted
+        assert store.update_feed(feed_id, {"type": "bottle", "amount_ml": 120})
+        assert store.get_feeds()[0]["amount_ml"] == 120
+        assert store.get_feeds()[0]["time"] == "10:00 AM"
+
+        # New time: moved to its sorted position
+        assert store.update_feed(feed_id, {"type": "bottle", "amount_ml": 120, "timestamp": "2026-02-10T12:00:00"})
+        assert [f["type"] for f in store.get_feeds()] == ["Diaper (Pee)", "Feed (Bottle)"]
+
+    def test_missing_ids(self, store):
+        assert not store.update_feed(99, {"type": "bottle"})
+        assert not store.delete_feed(99)
+
+    def test_paused_reader_does_not_block_writes(self, store):
+        store.add_feed({"type": "bottle", "timestamp": "2026-02-10T01:00:00"})
+        store.add_feed({"type": "bottle", "timestamp": "2026-02-10T02:00:00"})
+        reader = store.iter_range()
+        next(reader)
+
+        assert store.lock.acquire(timeout=1)
+        store.lock.release()
+        store.add_feed({"type": "diaper", "timestamp": "2026-02-10T00:30:00"})
+        assert len(list(reader)) == 1  # the slice taken when iteration started
+
+    def test_does_not_import_the_app(self):
+        code = "import sys, event_log; assert 'app' not in sys.modules and 'flask' not in sys.modules"
+        subprocess.run([sys.executable, "-c", code], check=True,
+                       cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    def test_persists_and_grows(self, tmp_path):
+        path = str(tmp_path / "feeds.log")
+        store = EventLogStore(path)
+        for i in range(INITIAL_CAPACITY + 10):
+            store.add_feed({"type": "bottle", "amount_ml": i, "logged_by": "Dad",
+                            "timestamp": f"2026-02-10T{i // 60 % 24:02d}:{i % 60:02d}:00"})
+        store.delete_feed(1)
+        store.close()
+
+        reopened = EventLogStore(path)
+        feeds = reopened.get_feeds()
+        assert len(feeds) == INITIAL_CAPACITY + 9
+        assert all(f["logged_by"] == "Dad" for f in feeds)
+        assert reopened.add_feed({"type": "bottle"}) == INITIAL_CAPACITY + 11
+        reopened.close()
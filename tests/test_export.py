@@ -0,0 +1,65 @@
+"""
+Test the streaming /api/export endpoint.
+"""
+
+import csv
+import io
+import json
+import pytest
+from openpyxl import load_workbook
+
+from app import archive_feeds_before, iter_feeds_snapshot
+
+
+class TestExport:
+    """Test GET /api/export"""
+
+    def test_csv_export(self, client, seed_data):
+        resp = client.get('/api/export?format=csv')
+
+        assert resp.status_code == 200
+        assert resp.mimetype == 'text/csv'
+        assert 'attachment; filename="feeds.csv"' == resp.headers['Content-Disposition']
+
+        rows = list(csv.reader(io.StringIO(resp.get_data(as_text=True))))
+        assert rows[0][0] == "Date"
+        # Oldest first
+        assert [r[1] for r in rows[1:]] == ['06:45 PM', '09:00 PM', '11:30 PM', '01:15 AM', '03:02 AM']
+
+    def test_ndjson_export_with_range(self, client, seed_data):
+        resp = client.get('/api/export?format=ndjson&from=2026-02-10&to=2026-02-10')
+
+        lines = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+        assert [f['type'] for f in lines] == ["Nurse (Left)", "Feed (Bottle)"]
+        assert all(f['id'] for f in lines)
+
+    def test_xlsx_export(self, client, seed_data):
+        resp = client.get('/api/export?format=xlsx&to=2026-02-09')
+
+        ws = load_workbook(io.BytesIO(resp.get_data())).active
+        assert ws.max_row == 4  # header + 3 entries from Feb 9
+        assert ws.cell(row=2, column=3).value == "Nurse (Right)"
+
+    def test_export_includes_archive(self, client, seed_data):
+        archive_feeds_before("2026-02-10")
+
+        resp = client.get('/api/export?format=ndjson')
+        lines = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+        assert len(lines) == 5
+        assert [bool(f.get('archived')) for f in lines] == [True, True, True, False, False]
+
+    def test_snapshot_ignores_later_writes(self, client, seed_data):
+        """Writes made while an export is streaming don't appear in it"""
+        feeds = iter_feeds_snapshot()
+        first = next(feeds)
+
+        resp = client.post('/api/feeds', json={"type": "bottle", "amount_ml": 60.0})
+        assert resp.status_code == 201
+
+        assert len([first] + list(feeds)) == 5
+
+    def test_bad_format(self, client):
+        assert client.get('/api/export?format=pdf').status_code == 400
+
+    def test_bad_date(self, client):
+        assert client.get('/api/export?from=last-week').status_code == 400
@@ -0,0 +1,112 @@
+"""
+Test the JSON provider and streamed GET /api/feeds?limit_days= responses.
+"""
+
+import gzip
+import json
+from datetime import date, datetime, timezone
+
+import pytest
+
+import app as app_module
+import fast_json
+from fast_json import FastJSONProvider
+
+
+@pytest.fixture(params=["orjson", "json"])
+def provider(request, app, monkeypatch):
+    if request.param == "orjson" and fast_json.orjson is None:
+        pytest.skip("orjson not installed")
+    if request.param == "json":
+        monkeypatch.setattr(fast_json, "orjson", None)
+    return FastJSONProvider(app)
+
+
+def baseline_body(app, limit_days):
+    """The body build_feeds_payload gives, without the clock fields."""
+    with app.test_request_context():
+        body, _ = app_module.serialize_payload(app_module.build_feeds_payload(limit_days))
+    return body[:-1]
+
+
+def without_clock(body):
+    return body.split(b',"last_diaper_minutes_ago"')[0]
+
+
+class TestProvider:
+    """Test FastJSONProvider gives the same JSON with or without orjson"""
+
+    def test_compact_sorted_bytes(self, provider):
+        obj = {"b": [1, 2.5, None], "a": {"z": True, "y": "bébé — 🍼"}}
+        assert provider.dumpb(obj) == json.dumps(obj, sort_keys=True, separators=(",", ":"),
+                                                 ensure_ascii=False).encode("utf-8")
+
+    def test_dates_as_flask_writes_them(self, provider):
+        when = datetime(2026, 2, 10, 3, 2, tzinfo=timezone.utc)
+        assert json.loads(provider.dumpb({"at": when, "on": date(2026, 2, 10)})) == {
+            "at": "Tue, 10 Feb 2026 03:02:00 GMT", "on": "Tue, 10 Feb 2026 00:00:00 GMT"}
+
+    def test_unserializable(self, provider):
+        with pytest.raises(TypeError):
+            provider.dumpb({"value": object()})
+
+    def test_response(self, provider, app):
+        with app.test_request_context():
+            response = provider.response({"success": True})
+        assert response.mimetype == "application/json"
+        assert json.loads(response.get_data()) == {"success": True}
+
+
+class TestStreamedFeeds:
+    """Test long ?limit_days= ranges are streamed with the same body"""
+
+    def test_small_ranges_are_cached(self, client, seed_data):
+        resp = client.get('/api/feeds?limit_days=3650')
+        assert "Content-Length" in resp.headers
+
+    def test_same_body_streamed(self, app, client, seed_data, monkeypatch):
+        monkeypatch.setattr(app_module, "STREAM_MIN_ENTRIES", 1)
+        resp = client.get('/api/feeds?limit_days=3650')
+
+        assert "Content-Length" not in resp.headers
+        assert resp.headers["X-Data-Version"]
+        body = resp.get_data()
+        assert without_clock(body) == baseline_body(app, 3650)
+        data = json.loads(body)
+        assert len(data['feeds']) == 5
+        assert "last_feed_minutes_ago" in data
+
+    def test_many_chunks(self, app, client, seed_data, monkeypatch):
+        monkeypatch.setattr(app_module, "STREAM_MIN_ENTRIES", 1)
+        monkeypatch.setattr(app_module.exporter, "ROWS_PER_CHUNK", 2)
+        body = client.get('/api/feeds?limit_days=3650').get_data()
+        assert without_clock(body) == baseline_body(app, 3650)
+
+    def test_fields(self, client, seed_data, monkeypatch):
+        monkeypatch.setattr(app_module, "STREAM_MIN_ENTRIES", 1)
+        data = client.get('/api/feeds?limit_days=3650&fields=id,type').get_json()
+        assert len(data['feeds']) == 5
+        assert all(set(feed) == {"id", "type"} for feed in data['feeds'])
+
+    def test_columns_not_streamed(self, client, seed_data, monkeypatch):
+        monkeypatch.setattr(app_module, "STREAM_MIN_ENTRIES", 1)
+        resp = client.get('/api/feeds?limit_days=3650&shape=columns')
+        assert "Content-Length" in resp.headers
+        assert len(resp.get_json()['feeds']['id']) == 5
+
+    def test_ranges_reaching_archive(self, app, client, seed_data):
+        app_module.archive_feeds_before('2026-02-10')
+        resp = client.get('/api/feeds?limit_days=3650')
+
+        assert "Content-Length" not in resp.headers
+        assert without_clock(resp.get_data()) == baseline_body(app, 3650)
+        assert sum(1 for feed in json.loads(resp.get_data())['feeds'] if feed.get('archived')) == 3
+
+    def test_gzip(self, client, seed_data, monkeypatch):
+        monkeypatch.setattr(app_module, "STREAM_MIN_ENTRIES", 1)
+        plain = client.get('/api/feeds?limit_days=3650').get_data()
+        resp = client.get('/api/feeds?limit_days=3650', headers={"Accept-Encoding": "gzip"})
+
+        assert resp.headers["Content-Encoding"] == "gzip"
+        assert resp.headers["Vary"] == "Accept, Accept-Encoding"
+        assert without_clock(gzip.decompress(resp.get_data())) == without_clock(plain)
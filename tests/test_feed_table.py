@@ -0,0 +1,181 @@
+"""
+Test the in-memory feed table, its binary snapshot and the change journal.
+"""
+
+import os
+import pytest
+from datetime import datetime
+from openpyxl import load_workbook
+
+import app as app_module
+import feed_schema
+import feed_table
+from feed_table import FeedTable, decode_snapshot, encode_snapshot, journal_path_for, snapshot_path_for
+
+
+def restart(temp_xlsx):
+    """Forget in-memory state as if the server had restarted."""
+    app_module.feed_tables.pop(temp_xlsx, None)
+
+
+class TestSnapshotFormat:
+    """Test the struct-packed snapshot encoding"""
+
+    def test_round_trip_preserves_types(self):
+        rows = [
+            ("2026-02-10", "03:02 AM", "Feed (Bottle)", 90, None, "", "Dad", "2026-02-10T03:02:00"),
+            ("2026-02-10", "04:00 AM", "Pump (Both)", 75.5, 15, "宝宝 🍼", None, "2026-02-10T04:00:00"),
+            (datetime(2026, 2, 11, 8, 0), None, True, False, None, None, None, None),
+        ]
+        decoded, seq, fingerprint = decode_snapshot(encode_snapshot(rows, 42, (123, 456)))
+
+        assert decoded == rows
+        assert isinstance(decoded[0][3], int)
+        assert isinstance(decoded[1][3], float)
+        assert seq == 42
+        assert fingerprint == (123, 456)
+
+    def test_rejects_unknown_format(self):
+        with pytest.raises(feed_table.SnapshotError):
+            decode_snapshot(b"NOPE" + b"\0" * 40)
+
+
+class TestSchema:
+    """Test every reader and writer uses the same columns"""
+
+    def test_columns_match_schema(self, temp_xlsx, client):
+        """Workbook headers, stored rows and API entries all follow feed_schema's column list"""
+        header = next(load_workbook(temp_xlsx).active.iter_rows(max_row=1, values_only=True))
+        assert header == feed_schema.HEADERS
+        feed = feed_table.row_to_feed(tuple(range(len(feed_schema.FIELDS))), 1)
+        assert tuple(feed) == app_module.FEED_FIELDS == ("id",) + feed_schema.FIELDS
+        assert [feed[field] for field in feed_schema.FIELDS] == list(range(len(feed_schema.FIELDS)))
+
+
+class TestStartup:
+    """Test loading the table on startup"""
+
+    def test_restart_uses_snapshot_and_journal(self, client, temp_xlsx, seed_data, monkeypatch):
+        """After a restart, reads replay the journal instead of parsing the workbook"""
+        client.delete('/api/feeds/2')
+        client.put('/api/feeds/1', json={"type": "bottle", "amount_ml": 200.0,
+                                         "timestamp": "2026-02-10T03:02:00"})
+        expected = client.get('/api/feeds?limit_days=100000').get_json()['feeds']
+
+        restart(temp_xlsx)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("workbook should not be parsed")
+        monkeypatch.setattr(app_module, "load_workbook", fail)
+
+        assert client.get('/api/feeds?limit_days=100000').get_json()['feeds'] == expected
+
+    def test_external_edit_triggers_reparse(self, client, temp_xlsx, seed_data):
+        """Editing feeds.xlsx outside the app invalidates the snapshot"""
+        client.get('/api/feeds')
+        restart(temp_xlsx)
+
+        wb = load_workbook(temp_xlsx)
+        wb.active["F2"] = "edited in Excel"
+        wb.save(temp_xlsx)
+
+        feeds = client.get('/api/feeds?date=2026-02-10').get_json()['feeds']
+        assert "edited in Excel" in [f['notes'] for f in feeds]
+
+    def test_torn_journal_line_is_ignored(self, client, temp_xlsx, seed_data):
+        """A half-written final journal record doesn't break loading"""
+        with open(journal_path_for(temp_xlsx), "a") as f:
+            f.write('{"seq": 99, "op": "ad')
+
+        table = FeedTable.load(temp_xlsx)
+        assert len(table.rows) == 5
+
+    def test_snapshot_compacts_journal(self, client, temp_xlsx, monkeypatch):
+        """Every SNAPSHOT_EVERY writes the journal is folded into the snapshot"""
+        monkeypatch.setattr(feed_table, "SNAPSHOT_EVERY", 3)
+        for i in range(4):
+            client.post('/api/feeds', json={"type": "bottle", "amount_ml": 30.0})
+
+        with open(journal_path_for(temp_xlsx)) as f:
+            assert len(f.readlines()) == 1
+        rows, seq, _ = decode_snapshot(open(snapshot_path_for(temp_xlsx), "rb").read())
+        assert len(rows) == 3
+
+    def test_shutdown_snapshot(self, client, temp_xlsx, seed_data):
+        """save_feed_snapshots leaves an empty journal and a complete snapshot"""
+        app_module.save_feed_snapshots()
+
+        assert os.path.getsize(journal_path_for(temp_xlsx)) == 0
+        restart(temp_xlsx)
+        assert len(FeedTable.load(temp_xlsx).rows) == 5
+
+
+class TestLatestPointers:
+    """Test the latest feed / diaper pointers maintained on write"""
+
+    def rows(self):
+        return [
+            ("2026-02-10", "01:00 AM", "Feed (Bottle)", 90, None, "", "Dad", "2026-02-10T01:00:00"),
+            ("2026-02-10", "02:00 AM", "Diaper (Pee)", None, None, "", "Mom", "2026-02-10T02:00:00"),
+            ("2026-02-10", "03:00 AM", "Pump (Both)", 120, 15, "", "Mom", "2026-02-10T03:00:00"),
+            ("2026-02-10", "04:00 AM", "Vitamin D", None, None, "Yes", "Mom", "2026-02-10T04:00:00"),
+        ]
+
+    def test_skips_pump_and_vitamin(self):
+        table = FeedTable(None, self.rows())
+        assert table.latest("feed")[2] == "Diaper (Pee)"
+        assert table.latest("diaper")[2] == "Diaper (Pee)"
+
+    def test_updated_on_add_and_backdated_add(self):
+        table = FeedTable(None, self.rows())
+        table.latest("feed")
+        table._apply({"op": "add", "row": ["2026-02-10", "05:00 AM", "Nurse (Left)", None, 10, "", "Mom", "2026-02-10T05:00:00"]})
+        table._apply({"op": "add", "row": ["2026-02-09", "11:00 PM", "Feed (Bottle)", 60, None, "", "Dad", "2026-02-09T23:00:00"]})
+        assert table.latest("feed")[2] == "Nurse (Left)"
+
+    def test_falls_back_when_latest_is_deleted(self):
+        table = FeedTable(None, self.rows())
+        table.latest("diaper")
+        table._apply({"op": "delete", "id": 2})
+        assert table.latest("diaper") is None
+        assert table.latest("feed")[2] == "Feed (Bottle)"
+
+    def test_falls_back_when_latest_is_backdated(self):
+        table = FeedTable(None, self.rows())
+        table.latest("feed")
+        table._apply({"op": "update", "id": 2, "row": ["2026-02-09", "11:00 PM", "Diaper (Poop)", None, None, "", "Mom", "2026-02-09T23:00:00"]})
+        assert table.latest("feed")[2] == "Feed (Bottle)"
+        assert table.latest("diaper")[2] == "Diaper (Poop)"
+
+    def test_fallback_keeps_other_categories(self):
+        """Deleting the latest diaper only recomputes the categories it was latest of"""
+        table = FeedTable(None, self.rows() + [
+            ("2026-02-10", "05:00 AM", "Feed (Bottle)", 60, None, "", "Dad", "2026-02-10T05:00:00"),
+        ])
+        latest_feed = table.latest("feed")
+        table._apply({"op": "delete", "id": 2})
+        assert table._latest["feed"] is latest_feed
+        assert table.latest("diaper") is None
+
+    def test_time_index_maintained_on_update_and_delete(self):
+        table = FeedTable(None, self.rows())
+        table.time_index()
+        table.latest("feed")
+        table._apply({"op": "update", "id": 3, "row": ["2026-02-10", "12:30 AM", "Diaper (Poop)", None, None, "", "Mom", "2026-02-10T00:30:00"]})
+        table._apply({"op": "delete", "id": 1})
+        table._apply({"op": "add", "row": ["2026-02-10", "12:30 AM", "Nurse (Left)", None, 10, "", "Mom", "2026-02-10T00:30:00"]})
+        table._apply({"op": "delete", "id": 1})
+
+        assert table.time_index() == FeedTable(None, table.rows).time_index()
+        # The poop and the nursing tie; the earlier row wins, as on a full scan
+        assert table.latest("feed")[2] == "Diaper (Poop)"
+        assert table.latest("diaper")[2] == "Diaper (Poop)"
+
+    def test_summary_reaches_beyond_requested_range(self, client):
+        """The last feed is reported even when it is older than limit_days"""
+        client.post('/api/feeds', json={"type": "bottle", "amount_ml": 90, "timestamp": "2026-01-01T08:00:00"})
+        data = client.get('/api/feeds?limit_days=1').get_json()
+
+        assert data['feeds'] == []
+        assert data['last_feed_summary'].startswith("Feed (Bottle")
+        assert data['last_feed_minutes_ago'] > 0
@@ -0,0 +1,203 @@
+"""
+Test the read-only follower that tails the primary's change log.
+"""
+
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from contextlib import contextmanager
+
+import pytest
+
+import app as app_module
+import feed_table
+from follower import Follower
+
+REPO_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+@contextmanager
+def as_follower(follower):
+    """Serve requests from the follower's table instead of the workbook."""
+    app_module.follower = follower
+    try:
+        yield
+    finally:
+        app_module.follower = None
+
+
+@pytest.fixture
+def http_follower(client):
+    """A follower polling the primary over HTTP (the test client stands in for the network)."""
+    def fetch(url):
+        return client.get(url[len("http://primary"):]).get_json()
+    return Follower("http://primary", fetch=fetch)
+
+
+class TestChangesEndpoint:
+    """Test GET /api/changes on the primary"""
+
+    def test_full_copy_then_records(self, client, seed_data):
+        first = client.get('/api/changes').get_json()
+        assert len(first['rows']) == 5
+
+        client.delete('/api/feeds/2')
+        changes = client.get(f"/api/changes?after={first['seq']}").get_json()
+        assert [r['op'] for r in changes['records']] == ["delete"]
+        assert changes['seq'] == first['seq'] + 1
+
+        assert client.get(f"/api/changes?after={changes['seq']}").get_json()['records'] == []
+
+    def test_compacted_records_fall_back_to_rows(self, client, seed_data, monkeypatch):
+        seq = client.get('/api/changes').get_json()['seq']
+        monkeypatch.setattr(feed_table, "SNAPSHOT_EVERY", 1)
+        client.post('/api/feeds', json={"type": "diaper", "timestamp": "2026-02-11T08:00:00"})
+
+        assert len(client.get(f"/api/changes?after={seq}").get_json()['rows']) == 6
+
+
+class TestFollower:
+    """Test serving reads from a follower"""
+
+    def test_follows_writes_over_http(self, client, seed_data, http_follower):
+        http_follower.poll()
+        client.post('/api/feeds', json={"type": "diaper", "side": "pee", "timestamp": "2026-02-10T05:00:00"})
+        client.put('/api/feeds/1', json={"type": "bottle", "amount_ml": 120.0, "timestamp": "2026-02-10T03:02:00"})
+        client.delete('/api/feeds/5')
+        primary = client.get('/api/feeds?date=2026-02-10').get_json()
+
+        assert http_follower.poll()
+        assert http_follower.resyncs == 1
+
+        with as_follower(http_follower):
+            assert client.get('/api/feeds?date=2026-02-10').get_json() == primary
+            assert "Diaper (Pee)" in [f['type'] for f in primary['feeds']]
+            status = client.get('/api/replication').get_json()
+
+        assert status['role'] == "follower"
+        assert status['lag_records'] == 0
+        assert status['seq'] == client.get('/api/replication').get_json()['seq']
+
+    def test_writes_are_rejected(self, client, seed_data, http_follower):
+        http_follower.poll()
+        with as_follower(http_follower):
+            response = client.post('/api/feeds', json={"type": "diaper", "timestamp": "2026-02-11T08:00:00"})
+            assert response.status_code == 409
+            assert response.get_json()['success'] is False
+            assert client.delete('/api/feeds/1').status_code == 409
+            assert client.get('/api/stats').status_code == 200
+
+    def test_resync_forgets_cached_versions(self, client, seed_data):
+        """A full resync may go back to a lower seq, so version-keyed caches start over"""
+        resynced = []
+        follower = Follower("http://primary", fetch=lambda url: client.get(url[len("http://primary"):]).get_json(),
+                            on_resync=lambda: resynced.append(True))
+        follower.poll()
+        follower.poll()
+        assert resynced == [True]
+
+    def test_tenants_are_unknown(self, client, seed_data, http_follower):
+        """A follower mirrors only the default feed file, never another tenant's"""
+        http_follower.poll()
+        with as_follower(http_follower):
+            for response in (client.get('/t/nobody/api/feeds'),
+                             client.get('/api/feeds', headers={"X-Tenant": "nobody"}),
+                             client.get('/t/alice/api/stats')):
+                assert response.status_code == 404
+                assert response.get_json()['success'] is False
+            assert len(client.get('/api/feeds?date=2026-02-10').get_json()['feeds']) == 2
+
+    def test_follows_shared_directory(self, client, temp_xlsx, seed_data, monkeypatch):
+        """A follower on the same files survives the primary compacting its journal"""
+        follower = Follower(temp_xlsx)
+        follower.poll()
+        assert len(follower.table.rows) == 5
+
+        client.post('/api/feeds', json={"type": "diaper", "timestamp": "2026-02-11T08:00:00"})
+        follower.poll()
+        assert len(follower.table.rows) == 6
+        assert follower.resyncs == 1
+
+        monkeypatch.setattr(feed_table, "SNAPSHOT_EVERY", 1)
+        client.post('/api/feeds', json={"type": "diaper", "timestamp": "2026-02-11T09:00:00"})
+        client.delete('/api/feeds/1')
+        follower.poll()
+
+        with app_module.get_file_lock():
+            assert follower.table.rows == app_module.get_feed_table().rows
+
+    def test_unreachable_primary_is_reported(self):
+        def fetch(url):
+            raise OSError("connection refused")
+        follower = Follower("http://primary", fetch=fetch)
+
+        assert follower.poll() is False
+        assert follower.status()['last_error'] == "connection refused"
+        assert follower.status()['seq'] is None
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def call(url, method="GET", payload=None):
+    data = json.dumps(payload).encode() if payload is not None else None
+    request = urllib.request.Request(url, data=data, method=method, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=5) as response:
+        return json.load(response)
+
+
+@pytest.fixture
+def primary_process(tmp_path):
+    """The app running as a separate primary process on a free local port; yields its URL."""
+    port = free_port()
+    env = dict(os.environ, FEED_FILE=str(tmp_path / "feeds.xlsx"), PORT=str(port),
+               REPORT_CACHE_DIR=str(tmp_path / "reports"))
+    env.pop("FOLLOW", None)
+    process = subprocess.Popen([sys.executable, "app.py"], cwd=REPO_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.time() + 20
+        while True:
+            try:
+                call(url + "/api/replication")
+                break
+            except OSError:
+                if process.poll() is not None or time.time() > deadline:
+                    pytest.fail("Primary process didn't start")
+                time.sleep(0.1)
+        yield url
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+class TestTwoProcesses:
+    """Test a follower replicating a primary running in another process, over real HTTP"""
+
+    def test_follows_primary_process(self, primary_process):
+        for hour in range(3, 6):
+            call(primary_process + "/api/feeds", "POST",
+                 {"type": "bottle", "amount_ml": 90, "timestamp": f"2026-02-10T0{hour}:00:00"})
+
+        follower = Follower(primary_process)
+        assert follower.poll()
+        assert len(follower.table.rows) == 3
+        assert follower.resyncs == 1
+
+        call(primary_process + "/api/feeds", "POST", {"type": "diaper", "timestamp": "2026-02-10T07:00:00"})
+        call(primary_process + "/api/feeds/1", "DELETE")
+        assert follower.poll()
+
+        assert follower.resyncs == 1  # caught up from journal records, not a second full copy
+        assert follower.table.seq == call(primary_process + "/api/replication")["seq"]
+        assert follower.status()["lag_records"] == 0
+        assert [row[2] for row in follower.table.rows if len(row) >= 8] == [
+            "Feed (Bottle)", "Feed (Bottle)", "Diaper"]
@@ -0,0 +1,216 @@
+"""
+Test Idempotency-Key replay protection and the offline service worker route.
+"""
+
+import threading
+
+import pytest
+
+import app as app_module
+from idempotency import IdempotencyIndex
+
+
+class TestIdempotencyIndex:
+    """Test the bounded key index"""
+
+    def test_get_returns_stored_value(self):
+        index = IdempotencyIndex()
+        index.put("a", "first", now=0)
+        assert index.get("a", now=1) == "first"
+        assert index.get("b", now=1) is None
+        assert index.stats() == {"entries": 1, "replayed": 0, "conflicts": 0}
+
+    def test_keys_expire_after_ttl(self):
+        index = IdempotencyIndex(ttl=60)
+        index.put("a", 1, now=0)
+        index.put("b", 2, now=30)
+        assert index.get("a", now=59) == 1
+        assert index.get("a", now=60) is None
+        assert index.get("b", now=60) == 2
+        assert index.stats()["entries"] == 1
+
+    def test_oldest_keys_dropped_when_full(self):
+        index = IdempotencyIndex(max_entries=3)
+        for i, key in enumerate("abcd"):
+            index.put(key, i, now=i)
+        assert index.get("a", now=4) is None
+        assert [index.get(key, now=4) for key in "bcd"] == [1, 2, 3]
+
+    def test_put_again_refreshes_expiry(self):
+        index = IdempotencyIndex(ttl=60)
+        index.put("a", 1, now=0)
+        index.put("b", 2, now=10)
+        index.put("a", 3, now=20)
+        assert index.get("b", now=70) is None
+        assert index.get("a", now=70) == 3
+
+
+class TestBatchReplay:
+    """Test Idempotency-Key on POST /api/feeds/batch"""
+
+    FEEDS = [
+        {"type": "bottle", "side": "milk", "amount_ml": 90, "timestamp": "2026-02-10T03:00:00"},
+        {"type": "diaper", "side": "pee", "timestamp": "2026-02-10T03:05:00"},
+    ]
+
+    def post(self, client, key, feeds=None):
+        return client.post('/api/feeds/batch', json=feeds or self.FEEDS,
+                           headers={"Idempotency-Key": key})
+
+    def test_replay_returns_first_response_without_writing(self, client, temp_xlsx):
+        first = self.post(client, "batch-1")
+        again = self.post(client, "batch-1")
+
+        assert first.status_code == again.status_code == 201
+        assert again.get_json() == first.get_json()
+        assert "Idempotent-Replayed" not in first.headers
+        assert again.headers["Idempotent-Replayed"] == "true"
+        assert len(client.get('/api/feeds?date=2026-02-10').get_json()['feeds']) == 2
+
+    def test_different_keys_both_write(self, client, temp_xlsx):
+        self.post(client, "batch-1")
+        resp = self.post(client, "batch-2")
+
+        assert [r['id'] for r in resp.get_json()['results']] == [3, 4]
+        assert len(client.get('/api/feeds?date=2026-02-10').get_json()['feeds']) == 4
+
+    def test_without_key_every_request_writes(self, client, temp_xlsx):
+        client.post('/api/feeds/batch', json=self.FEEDS)
+        client.post('/api/feeds/batch', json=self.FEEDS)
+        assert len(client.get('/api/feeds?date=2026-02-10').get_json()['feeds']) == 4
+
+    def test_client_errors_are_replayed(self, client, temp_xlsx):
+        first = self.post(client, "bad", feeds=[{"type": "sandwich"}])
+        again = self.post(client, "bad", feeds=[{"type": "sandwich"}])
+
+        assert first.status_code == again.status_code == 400
+        assert again.headers["Idempotent-Replayed"] == "true"
+
+    def test_server_errors_are_not_kept(self, client, temp_xlsx, monkeypatch):
+        def fail(*args, **kwargs):
+            raise OSError("disk full")
+        real = app_module.add_feeds_to_excel
+        monkeypatch.setattr(app_module, "add_feeds_to_excel", fail)
+        assert self.post(client, "retry-me").status_code == 500
+
+        monkeypatch.setattr(app_module, "add_feeds_to_excel", real)
+        resp = self.post(client, "retry-me")
+        assert resp.status_code == 201
+        assert "Idempotent-Replayed" not in resp.headers
+
+    def test_key_reused_with_different_body(self, client, temp_xlsx):
+        before = client.get('/api/metrics').get_json()["idempotency"]
+        self.post(client, "batch-1")
+        resp = self.post(client, "batch-1", feeds=self.FEEDS[:1])
+
+        assert resp.status_code == 422
+        after = client.get('/api/metrics').get_json()["idempotency"]
+        assert after["replayed"] == before["replayed"]
+        assert after["conflicts"] == before["conflicts"] + 1
+        assert resp.get_json()["success"] is False
+        assert len(client.get('/api/feeds?date=2026-02-10').get_json()['feeds']) == 2
+
+    def test_replay_keeps_handler_headers(self, app, temp_xlsx):
+        def handler():
+            return app_module.jsonify({"success": True}), 201, {"Location": "/api/feeds/1"}
+
+        responses = []
+        for _ in range(2):
+            with app.test_request_context('/api/feeds', method="POST", data=b"{}",
+                                          headers={"Idempotency-Key": "headers"}):
+                responses.append(app_module.run_idempotent(handler))
+
+        assert [r.headers["Location"] for r in responses] == ["/api/feeds/1"] * 2
+        assert responses[1].mimetype == "application/json"
+        assert responses[1].headers["Idempotent-Replayed"] == "true"
+
+    def test_key_too_long(self, client, temp_xlsx):
+        assert self.post(client, "k" * 256).status_code == 400
+
+    def test_metrics_count_replays(self, client, temp_xlsx):
+        before = client.get('/api/metrics').get_json()["idempotency"]["replayed"]
+        self.post(client, "counted")
+        self.post(client, "counted")
+        assert client.get('/api/metrics').get_json()["idempotency"]["replayed"] == before + 1
+
+
+class TestFeedReplay:
+    """Test Idempotency-Key on POST /api/feeds and POST /api/vitamin"""
+
+    FEED = {"type": "bottle", "side": "formula", "amount_ml": 120, "logged_by": "Dad",
+            "timestamp": "2026-02-10T18:04:00"}
+
+    def count(self, client):
+        return len(client.get('/api/feeds?date=2026-02-10').get_json()['feeds'])
+
+    def test_double_tap_logs_once(self, client, temp_xlsx):
+        headers = {"Idempotency-Key": "tap-1"}
+        first = client.post('/api/feeds', json=self.FEED, headers=headers)
+        again = client.post('/api/feeds', json=self.FEED, headers=headers)
+
+        assert first.status_code == again.status_code == 201
+        assert again.get_json()["id"] == first.get_json()["id"]
+        assert again.headers["Idempotent-Replayed"] == "true"
+        assert self.count(client) == 1
+
+    def test_concurrent_repeats_share_one_write(self, client, temp_xlsx, monkeypatch):
+        started = threading.Event()
+        release = threading.Event()
+        real = app_module.add_feeds_to_excel
+
+        def slow_add(feed_list):
+            started.set()
+            release.wait(5)
+            return real(feed_list)
+        monkeypatch.setattr(app_module, "add_feeds_to_excel", slow_add)
+
+        def post():
+            with app_module.app.test_client() as c:
+                return c.post('/api/feeds', json=self.FEED, headers={"Idempotency-Key": "tap-2"})
+
+        results = [None, None]
+        threads = [threading.Thread(target=lambda i=i: results.__setitem__(i, post())) for i in range(2)]
+        shared = app_module.write_flight.shared
+        threads[0].start()
+        assert started.wait(5)
+        threads[1].start()
+        # Let the second request join the first before it finishes
+        while app_module.write_flight.shared == shared and threads[1].is_alive():
+            threads[1].join(0.005)
+        release.set()
+        for t in threads:
+            t.join(5)
+
+        assert [r.get_json()["id"] for r in results] == [1, 1]
+        assert app_module.write_flight.shared == shared + 1
+        assert self.count(client) == 1
+
+    def test_keys_are_scoped_per_endpoint(self, client, temp_xlsx):
+        headers = {"Idempotency-Key": "same"}
+        client.post('/api/feeds', json=self.FEED, headers=headers)
+        resp = client.post('/api/vitamin', json={"logged_by": "Mom"}, headers=headers)
+
+        assert resp.status_code == 201
+        assert "Idempotent-Replayed" not in resp.headers
+        assert resp.get_json()["id"] == 2
+
+    def test_vitamin_replay_logs_once(self, client, temp_xlsx):
+        headers = {"Idempotency-Key": "vit-1"}
+        first = client.post('/api/vitamin', json={"logged_by": "Mom"}, headers=headers)
+        again = client.post('/api/vitamin', json={"logged_by": "Mom"}, headers=headers)
+
+        assert again.get_json()["id"] == first.get_json()["id"]
+        assert again.headers["Idempotent-Replayed"] == "true"
+        assert client.get('/api/vitamin-status').get_json()["given_today"] is True
+        assert len(client.get('/api/feeds').get_json()['feeds']) == 1
+
+
+class TestServiceWorker:
+    """Test the service worker is served from the app root"""
+
+    def test_served_uncached(self, client):
+        resp = client.get('/sw.js')
+        assert resp.status_code == 200
+        assert "javascript" in resp.mimetype
+        assert resp.headers["Cache-Control"] == "no-cache"
+        assert b"importScripts" in resp.get_data()
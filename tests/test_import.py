@@ -0,0 +1,169 @@
+"""
+Test bulk import from workbook, CSV and JSON files.
+"""
+
+import io
+import json
+import os
+import shutil
+from datetime import datetime, timedelta
+
+import pytest
+from openpyxl import load_workbook
+
+import app as app_module
+import importer
+from app import import_feed_file
+
+REPO_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def run_import(path, **kwargs):
+    return list(import_feed_file(str(path), **kwargs))
+
+
+class TestReaders:
+    """Test the streaming readers"""
+
+    def test_json_reader_streams_api_dump(self, monkeypatch):
+        """The checked-in /api/feeds dump parses even with a tiny buffer"""
+        monkeypatch.setattr(importer, "CHUNK_SIZE", 16)
+        feeds = list(importer.read_json(os.path.join(REPO_DIR, "feeds.json")))
+
+        assert len(feeds) == 9
+        assert feeds[0]["timestamp"] == "2026-02-12T18:04:00-05:00"
+        assert feeds[-1]["amount_ml"] == 100
+
+    def test_json_reader_plain_array(self, tmp_path):
+        path = tmp_path / "feeds.json"
+        path.write_text(json.dumps([{"type": "bottle"}, {"type": "nurse"}]))
+        assert [f["type"] for f in importer.read_json(str(path))] == ["bottle", "nurse"]
+
+    def test_json_reader_rejects_truncated_file(self, tmp_path):
+        path = tmp_path / "feeds.json"
+        path.write_text('{"feeds": [{"type": "bottle"}, {"type": ')
+        with pytest.raises(ValueError):
+            list(importer.read_json(str(path)))
+
+    def test_detect_format(self):
+        assert importer.detect_format("backup.XLSX") == "xlsx"
+        assert importer.detect_format("export.jsonl") == "ndjson"
+        assert importer.detect_format("notes.txt") is None
+
+
+class TestImport:
+    """Test importing into the workbook"""
+
+    def test_import_api_dump_skips_double_taps(self, client, temp_xlsx):
+        """Entries logged twice at the same minute are imported once"""
+        stats = run_import(os.path.join(REPO_DIR, "feeds.json"))[-1]
+
+        assert stats == {"read": 9, "imported": 7, "skipped": 2, "errors": 0, "done": True}
+        feeds = client.get('/api/feeds?date=2026-02-12').get_json()['feeds']
+        assert len(feeds) == 7
+
+    def test_reimporting_workbook_is_a_no_op(self, client, temp_xlsx, seed_data, tmp_path):
+        backup = tmp_path / "backup.xlsx"
+        shutil.copy(temp_xlsx, backup)
+
+        stats = run_import(backup)[-1]
+
+        assert stats["read"] == 5
+        assert stats["skipped"] == 5
+        assert load_workbook(temp_xlsx).active.max_row == 6
+
+    def test_import_csv_with_payload_rows(self, client, tmp_path):
+        """CSV rows in the POST payload shape are formatted like API writes"""
+        path = tmp_path / "feeds.csv"
+        path.write_text(
+            "type,side,amount_ml,duration_min,notes,logged_by,timestamp\n"
+            "bottle,formula,90,,,Dad,2026-02-10T03:00:00\n"
+            "nurse,left,,12,sleepy,Mom,2026-02-10T05:00:00\n"
+            "sandwich,,,,,,2026-02-10T06:00:00\n"
+        )
+        stats = run_import(path)[-1]
+
+        assert stats["imported"] == 2
+        assert stats["errors"] == 1
+        feeds = client.get('/api/feeds?date=2026-02-10').get_json()['feeds']
+        assert [(f['type'], f['amount_ml'], f['duration_min']) for f in feeds] == [
+            ("Nurse (Left)", None, 12),
+            ("Feed (Bottle - Formula)", 90, None),
+        ]
+
+    def test_stored_rows_are_validated(self, client, tmp_path):
+        """Stored-shape rows need a string type and a date that agrees with the timestamp"""
+        path = tmp_path / "feeds.ndjson"
+        rows = [
+            {"date": "2026-02-10", "time": "whenever", "type": "Diaper (Pee)", "timestamp": "2026-02-10T04:00:00"},
+            {"type": "Vitamin D", "timestamp": "2026-02-10T09:00:00"},
+            {"date": "2026-02-10", "type": 3, "timestamp": "2026-02-10T05:00:00"},
+            {"date": "2026-02-10", "type": ["Nurse"], "timestamp": "2026-02-10T06:00:00"},
+            {"date": "2026-03-01", "type": "Nurse (Left)", "timestamp": "2026-02-10T07:00:00"},
+        ]
+        path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+        stats = run_import(path)[-1]
+
+        assert stats["imported"] == 2
+        assert stats["errors"] == 3
+        resp = client.get('/api/feeds?date=2026-02-10')
+        assert resp.status_code == 200
+        assert [(f['type'], f['time']) for f in resp.get_json()['feeds']] == [
+            ("Vitamin D", "09:00 AM"),
+            ("Diaper (Pee)", "04:00 AM"),
+        ]
+
+    def test_offset_timestamps_stored_in_local_time(self, client, tmp_path):
+        """Imported rows sort and count as latest by their instant, like API writes"""
+        imported = "2026-02-10T20:00:00-05:00"
+        local = datetime.fromisoformat(imported).astimezone(None)
+        path = tmp_path / "feeds.ndjson"
+        path.write_text(json.dumps({"type": "Feed (Bottle)", "amount_ml": 90, "timestamp": imported}) + "\n")
+        client.post('/api/feeds', json={"type": "bottle", "amount_ml": 60,
+                                        "timestamp": (local - timedelta(minutes=30)).replace(tzinfo=None).isoformat()})
+        run_import(path)
+
+        feeds = client.get(f'/api/feeds?date={local.strftime("%Y-%m-%d")}').get_json()['feeds']
+        assert [f['amount_ml'] for f in feeds] == [90, 60]
+        assert feeds[0]['timestamp'] == local.isoformat()
+        assert feeds[0]['time'] == local.strftime("%I:%M %p")
+        with app_module.app.test_request_context():
+            assert app_module.get_feed_table().latest("feed")[3] == 90
+
+    def test_progress_reported_per_batch(self, client, tmp_path):
+        path = tmp_path / "feeds.ndjson"
+        path.write_text("".join(
+            json.dumps({"type": "bottle", "amount_ml": 60, "timestamp": f"2026-02-10T{h:02d}:00:00"}) + "\n"
+            for h in range(10)
+        ))
+        progress = run_import(path, batch_size=4)
+
+        assert [p["imported"] for p in progress] == [4, 8, 10]
+        assert progress[-1]["done"]
+
+
+class TestImportEndpoint:
+    """Test POST /api/import"""
+
+    def test_upload_streams_progress(self, client):
+        with open(os.path.join(REPO_DIR, "feeds.json"), "rb") as f:
+            resp = client.post('/api/import', data={"file": (f, "feeds.json")},
+                               content_type="multipart/form-data")
+
+        assert resp.status_code == 200
+        lines = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+        assert lines[-1]["imported"] == 7
+
+    def test_missing_file(self, client):
+        assert client.post('/api/import').status_code == 400
+
+    def test_unknown_format(self, client):
+        resp = client.post('/api/import', data={"file": (io.BytesIO(b"hi"), "notes.txt")},
+                           content_type="multipart/form-data")
+        assert resp.status_code == 400
+
+    def test_malformed_file_reports_error(self, client):
+        resp = client.post('/api/import', data={"file": (io.BytesIO(b'[{"type": '), "x.json")},
+                           content_type="multipart/form-data")
+        last = json.loads(resp.get_data(as_text=True).splitlines()[-1])
+        assert "error" in last
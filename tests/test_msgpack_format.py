@@ -0,0 +1,204 @@
+"""
+Test MessagePack encoding and Accept: application/msgpack on the read endpoints.
+"""
+
+import email.message
+import gzip
+import io
+
+import pytest
+
+import app as app_module
+import follower as follower_mod
+import msgpack_format
+from feed_table import timestamp_epoch
+from follower import Follower
+
+MSGPACK = {"Accept": "application/msgpack"}
+
+
+@pytest.fixture(params=["msgpack", "python"])
+def codec(request, monkeypatch):
+    if request.param == "msgpack" and msgpack_format.msgpack is None:
+        pytest.skip("msgpack not installed")
+    if request.param == "python":
+        monkeypatch.setattr(msgpack_format, "msgpack", None)
+    return msgpack_format
+
+
+VALUES = [
+    None, True, False, 0, 127, 128, 255, 256, 65535, 65536, 2 ** 32, 2 ** 64 - 1,
+    -1, -32, -33, -128, -129, -32768, -32769, -2 ** 31 - 1, -2 ** 63,
+    1.5, -0.25, 1e300, "", "a" * 31, "b" * 32, "c" * 255, "d" * 256, "é" * 40000, "🍼",
+    b"", b"\x00" * 300, b"\x01" * 70000,
+    [], list(range(15)), list(range(16)), list(range(70000)),
+    {}, {str(i): i for i in range(15)}, {str(i): i for i in range(16)},
+    {"nested": [{"a": None}, [1, [2, [3]]]], "x": {"y": {"z": 0.5}}},
+]
+
+
+class TestCodec:
+    """Test packing and unpacking, with the msgpack package and without"""
+
+    @pytest.mark.parametrize("value", VALUES, ids=range(len(VALUES)))
+    def test_round_trip(self, codec, value):
+        assert codec.unpackb(codec.packb(value)) == value
+
+    @pytest.mark.skipif(msgpack_format.msgpack is None, reason="msgpack not installed")
+    @pytest.mark.parametrize("value", VALUES, ids=range(len(VALUES)))
+    def test_same_bytes_as_msgpack(self, value, monkeypatch):
+        expected = msgpack_format.packb(value)
+        monkeypatch.setattr(msgpack_format, "msgpack", None)
+        assert msgpack_format.packb(value) == expected
+
+    def test_tuples_and_dates(self, codec):
+        from datetime import date
+        assert codec.unpackb(codec.packb((1, date(2026, 2, 10)))) == [1, "2026-02-10"]
+
+    def test_unserializable(self, codec):
+        with pytest.raises(TypeError):
+            codec.packb({"value": object()})
+
+    @pytest.mark.parametrize("data", [b"", b"\x92\x01", b"\xd9\x05abc", b"\x01\x02", b"\xc1"])
+    def test_malformed(self, codec, data):
+        with pytest.raises(ValueError):
+            codec.unpackb(data)
+
+    @pytest.mark.parametrize("size", [1, 14, 15, 16, 70000])
+    def test_extend_map(self, codec, size):
+        base = {f"k{i}": i for i in range(size)}
+        extended = codec.extend_map(codec.packb(base), {"late": 1, "later": None})
+        assert codec.unpackb(extended) == dict(base, late=1, later=None)
+
+
+class TestCompactEntries:
+    """Test type codes and epoch timestamps in entry lists"""
+
+    def test_rows(self):
+        payload = {"feeds": [
+            {"id": 1, "type": "Nurse (Left)", "timestamp": "2026-02-10T01:15:00"},
+            {"id": 2, "type": "Diaper (Pee)", "timestamp": "2026-02-10T02:00:00.5"},
+            {"id": 3, "type": "Nurse (Left)", "timestamp": None},
+        ], "next_cursor": None}
+        compact = msgpack_format.compact_entries(payload)
+
+        assert compact["types"] == ["Nurse (Left)", "Diaper (Pee)"]
+        assert [feed["type"] for feed in compact["feeds"]] == [0, 1, 0]
+        assert compact["feeds"][0]["timestamp"] == timestamp_epoch("2026-02-10T01:15:00")
+        assert isinstance(compact["feeds"][0]["timestamp"], int)
+        assert compact["feeds"][1]["timestamp"] % 1 == 0.5
+        assert compact["feeds"][2]["timestamp"] is None
+        # The payload itself is left alone
+        assert payload["feeds"][0]["type"] == "Nurse (Left)"
+
+    def test_columns(self):
+        payload = {"feeds": {"type": ["Vitamin D", "Vitamin D"], "amount_ml": [None, 5]}}
+        compact = msgpack_format.compact_entries(payload)
+        assert compact["feeds"] == {"type": [0, 0], "amount_ml": [None, 5]}
+        assert compact["types"] == ["Vitamin D"]
+
+    def test_without_entries(self):
+        payload = {"today": {}}
+        assert msgpack_format.compact_entries(payload) is payload
+
+
+class TestNegotiation:
+    """Test Accept: application/msgpack on the read endpoints"""
+
+    def test_feeds(self, client, seed_data):
+        as_json = client.get('/api/feeds?date=2026-02-10').get_json()
+        resp = client.get('/api/feeds?date=2026-02-10', headers=MSGPACK)
+
+        assert resp.mimetype == "application/msgpack"
+        assert resp.headers["Vary"] == "Accept"
+        data = msgpack_format.unpackb(resp.get_data())
+        assert sorted(data['types']) == ["Feed (Bottle)", "Nurse (Left)"]
+        assert [data['types'][feed['type']] for feed in data['feeds']] == [feed['type'] for feed in as_json['feeds']]
+        assert [feed['timestamp'] for feed in data['feeds']] == [
+            timestamp_epoch(feed['timestamp']) for feed in as_json['feeds']]
+        assert data['last_feed_summary'] == as_json['last_feed_summary']
+        assert "last_feed_minutes_ago" in data
+
+    def test_json_by_default(self, client, seed_data):
+        for headers in ({}, {"Accept": "*/*"}, {"Accept": "application/json, application/msgpack"}):
+            assert client.get('/api/feeds', headers=headers).mimetype == "application/json"
+
+    def test_preferred_by_quality(self, client, seed_data):
+        resp = client.get('/api/feeds', headers={"Accept": "application/json;q=0.5, application/msgpack"})
+        assert resp.mimetype == "application/msgpack"
+
+    def test_formats_cached_separately(self, client, seed_data):
+        client.get('/api/feeds?date=2026-02-10')
+        resp = client.get('/api/feeds?date=2026-02-10', headers=MSGPACK)
+        assert len(msgpack_format.unpackb(resp.get_data())['feeds']) == 2
+        assert client.get('/api/feeds?date=2026-02-10').get_json()['feeds'][0]['type'] == "Feed (Bottle)"
+
+    def test_columns_and_history_page(self, client, seed_data):
+        resp = client.get('/api/feeds?limit=2&fields=type,timestamp&shape=columns', headers=MSGPACK)
+        data = msgpack_format.unpackb(resp.get_data())
+        assert [data['types'][code] for code in data['feeds']['type']] == ["Feed (Bottle)", "Nurse (Left)"]
+        assert data['feeds']['timestamp'] == sorted(data['feeds']['timestamp'], reverse=True)
+        assert data['next_cursor'] == "2026-02-10"
+
+    def test_long_ranges_not_streamed(self, client, seed_data, monkeypatch):
+        monkeypatch.setattr(app_module, "STREAM_MIN_ENTRIES", 1)
+        resp = client.get('/api/feeds?limit_days=3650', headers=MSGPACK)
+        assert "Content-Length" in resp.headers
+        assert len(msgpack_format.unpackb(resp.get_data())['feeds']) == 5
+
+    def test_compressed(self, client, seed_data, monkeypatch):
+        monkeypatch.setattr(app_module, "COMPRESS_MIN_BYTES", 100)
+        resp = client.get('/api/feeds?limit_days=3650', headers=dict(MSGPACK, **{"Accept-Encoding": "gzip"}))
+        assert resp.headers["Content-Encoding"] == "gzip"
+        assert len(msgpack_format.unpackb(gzip.decompress(resp.get_data()))['feeds']) == 5
+
+    def test_analytics(self, client, seed_data):
+        url = '/api/analytics?from=2026-02-01&to=2026-02-10'
+        resp = client.get(url, headers=MSGPACK)
+        assert resp.mimetype == "application/msgpack"
+        assert msgpack_format.unpackb(resp.get_data()) == client.get(url).get_json()
+
+    def test_changes(self, client, seed_data):
+        resp = client.get('/api/changes', headers=MSGPACK)
+        assert resp.mimetype == "application/msgpack"
+        assert msgpack_format.unpackb(resp.get_data()) == client.get('/api/changes').get_json()
+
+    def test_errors_stay_json(self, client):
+        resp = client.get('/api/feeds?fields=color', headers=MSGPACK)
+        assert resp.status_code == 400
+        assert resp.get_json()['success'] is False
+
+
+class TestFollowerFetch:
+    """Test the follower asks the primary for MessagePack"""
+
+    @pytest.fixture
+    def urlopen(self, client, monkeypatch):
+        """Route follower HTTP requests to the test client."""
+        sent = []
+
+        class Reply(io.BytesIO):
+            def __init__(self, resp):
+                super().__init__(resp.get_data())
+                self.headers = email.message.Message()
+                self.headers["Content-Type"] = resp.headers["Content-Type"]
+
+            def __exit__(self, *exc):
+                self.close()
+
+        def fake_urlopen(request, timeout=None):
+            sent.append(request.get_header("Accept"))
+            return Reply(client.get(request.full_url[len("http://primary"):], headers={"Accept": sent[-1]}))
+
+        monkeypatch.setattr(follower_mod.urllib.request, "urlopen", fake_urlopen)
+        return sent
+
+    def test_follows_over_msgpack(self, client, seed_data, urlopen):
+        follower = Follower("http://primary")
+        assert follower.poll()
+        assert len(follower.table.rows) == 5
+
+        client.delete('/api/feeds/2')
+        assert follower.poll()
+        assert follower.table.seq == client.get('/api/changes').get_json()['seq']
+        assert urlopen[0].startswith("application/msgpack")
@@ -0,0 +1,123 @@
+"""
+Test the cached Excel report generator.
+"""
+
+import io
+import os
+import threading
+
+import pytest
+from openpyxl import load_workbook
+
+import app as app_module
+from reports import ReportCache, daily_summary
+
+
+@pytest.fixture
+def report_cache(tmp_path, monkeypatch):
+    cache = ReportCache(directory=str(tmp_path / "reports"))
+    monkeypatch.setattr(app_module, "report_cache", cache)
+    yield cache
+    cache.close()
+
+
+class TestReportEndpoint:
+    """Test GET /api/report"""
+
+    def test_report_contents(self, client, seed_data, report_cache):
+        resp = client.get('/api/report')
+
+        assert resp.status_code == 200
+        assert resp.headers['X-Report-Cache'] == 'miss'
+        wb = load_workbook(io.BytesIO(resp.get_data()))
+        assert wb.sheetnames == ["Feed Log", "Daily Summary"]
+        assert wb["Feed Log"].max_row == 6
+        assert wb["Feed Log"]["A1"].font.bold
+        assert [row for row in wb["Daily Summary"].iter_rows(min_row=2, values_only=True)] == [
+            ("2026-02-09", 2, 0, 1, 0, 0),
+            ("2026-02-10", 2, 0, 1, 0, 0),
+        ]
+
+    def test_repeat_download_is_cached(self, client, seed_data, report_cache):
+        first = client.get('/api/report?from=2026-02-10')
+        second = client.get('/api/report?from=2026-02-10')
+
+        assert second.headers['X-Report-Cache'] == 'hit'
+        assert second.get_data() == first.get_data()
+        assert (report_cache.hits, report_cache.misses) == (1, 1)
+
+    def test_write_invalidates(self, client, seed_data, report_cache):
+        client.get('/api/report')
+        client.post('/api/feeds', json={"type": "bottle", "amount_ml": 60.0})
+
+        resp = client.get('/api/report')
+        assert resp.headers['X-Report-Cache'] == 'miss'
+        assert load_workbook(io.BytesIO(resp.get_data()))["Feed Log"].max_row == 7
+
+    def test_bad_format(self, client, report_cache):
+        assert client.get('/api/report?format=pdf').status_code == 400
+
+
+class TestReportCache:
+    """Test LRU and size-based eviction"""
+
+    def feeds(self):
+        return [{"date": "2026-02-10", "time": "10:00 AM", "type": "Feed (Bottle)", "amount_ml": 90,
+                 "duration_min": None, "notes": "", "logged_by": "Dad", "timestamp": "2026-02-10T10:00:00"}]
+
+    def test_lru_by_entries(self, tmp_path):
+        cache = ReportCache(directory=str(tmp_path), max_entries=2)
+        try:
+            a, _ = cache.get(("a", "xlsx"), self.feeds)
+            cache.get(("b", "xlsx"), self.feeds)
+            cache.get(("a", "xlsx"), self.feeds)  # a is now most recent
+            cache.get(("c", "xlsx"), self.feeds)  # evicts b
+
+            assert os.path.exists(a)
+            assert cache.get(("a", "xlsx"), self.feeds)[1] is True
+            assert cache.get(("b", "xlsx"), self.feeds)[1] is False
+        finally:
+            cache.close()
+
+    def test_evicts_by_total_size(self, tmp_path):
+        cache = ReportCache(directory=str(tmp_path), max_bytes=1)
+        try:
+            first, _ = cache.get(("a", "xlsx"), self.feeds)
+            second, _ = cache.get(("b", "xlsx"), self.feeds)
+
+            # Always keeps the newest file, even if it alone is over the limit
+            assert not os.path.exists(first)
+            assert os.path.exists(second)
+            assert cache.total_bytes == os.path.getsize(second)
+        finally:
+            cache.close()
+
+    def test_slow_load_does_not_block_hits(self, tmp_path):
+        cache = ReportCache(directory=str(tmp_path))
+        loading = threading.Event()
+        release = threading.Event()
+
+        def slow_feeds():
+            loading.set()
+            release.wait(5)
+            return self.feeds()
+        try:
+            cache.get(("a", "xlsx"), self.feeds)
+            miss = threading.Thread(target=cache.get, args=(("b", "xlsx"), slow_feeds))
+            miss.start()
+            assert loading.wait(5)
+            hits = []
+            hit = threading.Thread(target=lambda: hits.append(cache.get(("a", "xlsx"), self.feeds)[1]))
+            hit.start()
+            hit.join(2)
+            assert hits == [True]  # answered while the other report is still loading
+            release.set()
+            miss.join(5)
+            assert cache.get(("b", "xlsx"), self.feeds)[1] is True
+        finally:
+            release.set()
+            cache.close()
+
+    def test_daily_summary_skips_vitamin(self):
+        feeds = self.feeds() + [dict(self.feeds()[0], type="Vitamin D", amount_ml=None)]
+        assert daily_summary(feeds) == [["2026-02-10", 1, 90, 0, 0, 0]]
@@ -0,0 +1,100 @@
+"""
+Test the serialized response cache for /api/feeds and /api/stats.
+"""
+
+import json
+from datetime import datetime, timedelta
+
+import app as app_module
+from response_cache import ResponseCache
+
+
+def hits():
+    return app_module.response_cache.hits
+
+
+class TestResponseCache:
+    """Test the cache itself"""
+
+    def test_only_current_version_hits(self):
+        cache = ResponseCache()
+        cache.put("feeds.xlsx", ("feeds",), 1, (b"{}", {}))
+        assert cache.get("feeds.xlsx", ("feeds",), 1) == (b"{}", {})
+        assert cache.get("feeds.xlsx", ("feeds",), 2) is None
+
+    def test_new_version_drops_older_entries(self):
+        cache = ResponseCache()
+        cache.put("feeds.xlsx", ("feeds",), 1, (b"{}", {}))
+        cache.put("feeds.xlsx", ("stats",), 2, (b"{}", {}))
+        assert cache.stats()["entries"] == 1
+        assert cache.get("feeds.xlsx", ("feeds",), 1) is None
+
+    def test_late_put_of_older_version_is_ignored(self):
+        cache = ResponseCache()
+        cache.put("feeds.xlsx", ("feeds",), 2, (b"new", {}))
+        cache.put("feeds.xlsx", ("stats",), 1, (b"old", {}))
+        assert cache.get("feeds.xlsx", ("feeds",), 2) == (b"new", {})
+        assert cache.stats()["entries"] == 1
+
+    def test_forget_lets_versions_start_over(self):
+        cache = ResponseCache()
+        cache.put("feeds.xlsx", ("feeds",), 5, (b"{}", {}))
+        cache.forget("feeds.xlsx")
+        cache.put("feeds.xlsx", ("feeds",), 0, (b"[]", {}))
+        assert cache.get("feeds.xlsx", ("feeds",), 0) == (b"[]", {})
+
+    def test_bounded_by_size(self):
+        cache = ResponseCache(max_bytes=10)
+        for i in range(5):
+            cache.put("feeds.xlsx", (i,), 1, (b"1234", {}))
+        assert cache.total_bytes <= 10
+        assert cache.get("feeds.xlsx", (4,), 1) is not None
+        assert cache.get("feeds.xlsx", (0,), 1) is None
+
+
+class TestCachedEndpoints:
+    """Test serving /api/feeds and /api/stats from cached bodies"""
+
+    def test_repeat_request_is_a_hit(self, client, seed_data):
+        first = client.get('/api/feeds?date=2026-02-10').get_json()
+        before = hits()
+        second = client.get('/api/feeds?date=2026-02-10').get_json()
+
+        assert hits() == before + 1
+        assert second == first
+
+    def test_write_invalidates(self, client, seed_data):
+        client.get('/api/stats')
+        client.post('/api/feeds', json={"type": "diaper", "timestamp": datetime.now().isoformat()})
+        before = hits()
+
+        data = client.get('/api/stats').get_json()
+        assert hits() == before
+        assert data['today']['total_diaper_changes'] == 1
+
+    def test_minutes_ago_recomputed_on_hit(self, client, monkeypatch):
+        thirty_min_ago = (datetime.now() - timedelta(minutes=30)).isoformat()
+        client.post('/api/feeds', json={"type": "bottle", "amount_ml": 90, "timestamp": thirty_min_ago})
+        assert 29 <= client.get('/api/feeds').get_json()['last_feed_minutes_ago'] <= 31
+
+        monkeypatch.setattr(app_module, "minutes_since", lambda ts: 999 if ts else None)
+        before = hits()
+        data = client.get('/api/feeds').get_json()
+
+        assert hits() == before + 1
+        assert data['last_feed_minutes_ago'] == 999
+        assert data['last_diaper_minutes_ago'] is None
+
+    def test_body_is_valid_json(self, client, seed_data):
+        client.get('/api/feeds?limit_days=100000')
+        response = client.get('/api/feeds?limit_days=100000')
+        assert response.mimetype == "application/json"
+        assert len(json.loads(response.data)['feeds']) == 5
+
+    def test_data_version_header(self, client, seed_data):
+        """Clients can key their own caches by the version a body was built from"""
+        version = client.get('/api/home').headers['X-Data-Version']
+        assert client.get('/api/stats').headers['X-Data-Version'] == version
+
+        client.post('/api/feeds', json={"type": "diaper", "timestamp": datetime.now().isoformat()})
+        assert int(client.get('/api/home').headers['X-Data-Version']) > int(version)
@@ -0,0 +1,117 @@
+"""
+Test coalescing of identical concurrent reads.
+"""
+
+import threading
+import time
+
+import app as app_module
+from singleflight import SingleFlight
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def run_concurrently(count, target):
+    results = [None] * count
+
+    def worker(i):
+        results[i] = target()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for t in threads:
+        t.start()
+    return threads, results
+
+
+class TestSingleFlight:
+    """Test the coalescing primitive"""
+
+    def test_concurrent_callers_share_one_computation(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            release.wait(5)
+            return {"value": 42}
+
+        threads, results = run_concurrently(5, lambda: flight.do("k", compute))
+        wait_for(lambda: flight.shared == 4)
+        release.set()
+        for t in threads:
+            t.join()
+
+        assert len(calls) == 1
+        assert flight.stats() == {"computed": 1, "shared": 4}
+        assert all(result is results[0][0] for result, _ in results)
+        assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+
+    def test_nothing_is_kept_afterwards(self):
+        flight = SingleFlight()
+        assert flight.do("k", lambda: 1) == (1, False)
+        assert flight.do("k", lambda: 2) == (2, False)
+
+    def test_errors_reach_every_waiter(self):
+        flight = SingleFlight()
+        release = threading.Event()
+
+        def compute():
+            release.wait(5)
+            raise RuntimeError("boom")
+
+        errors = []
+
+        def call():
+            try:
+                flight.do("k", compute)
+            except RuntimeError as e:
+                errors.append(e)
+
+        threads, _ = run_concurrently(3, call)
+        wait_for(lambda: flight.shared == 2)
+        release.set()
+        for t in threads:
+            t.join()
+        assert len(errors) == 3
+
+
+class TestCoalescedEndpoints:
+    """Test /api/feeds sharing work between concurrent requests"""
+
+    def test_concurrent_feed_requests_are_coalesced(self, app, seed_data, monkeypatch):
+        release = threading.Event()
+        original = app_module.build_feeds_payload
+        calls = []
+
+        def slow_build(*args):
+            calls.append(1)
+            release.wait(5)
+            return original(*args)
+        monkeypatch.setattr(app_module, "build_feeds_payload", slow_build)
+
+        before = app_module.read_flight.stats()
+        threads, results = run_concurrently(
+            4, lambda: app.test_client().get('/api/feeds?limit_days=100000').get_json())
+        wait_for(lambda: app_module.read_flight.shared - before["shared"] == 3)
+        release.set()
+        for t in threads:
+            t.join()
+
+        assert len(calls) == 1
+        assert all(result == results[0] for result in results)
+        assert len(results[0]['feeds']) == 5
+
+        metrics = app.test_client().get('/api/metrics').get_json()
+        assert metrics['coalescing']['shared'] >= 3
+
+    def test_new_data_is_not_coalesced_with_old(self, client, seed_data):
+        """The data version is part of the key"""
+        assert len(client.get('/api/feeds?date=2026-02-10').get_json()['feeds']) == 2
+        client.post('/api/feeds', json={"type": "diaper", "timestamp": "2026-02-10T05:00:00"})
+        assert len(client.get('/api/feeds?date=2026-02-10').get_json()['feeds']) == 3
+
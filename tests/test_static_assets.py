@@ -0,0 +1,127 @@
+"""
+Test fingerprinted, precompressed static assets and caching of the page shell.
+"""
+
+import gzip
+import re
+
+import pytest
+
+import app as app_module
+import static_assets
+from static_assets import AssetTable
+
+
+@pytest.fixture
+def asset_dir(tmp_path):
+    (tmp_path / "app.js").write_text("console.log('hello');\n" * 50)
+    (tmp_path / "app.css").write_text("body { color: red; }\n" * 50)
+    (tmp_path / "manifest.json").write_text("{}")
+    return tmp_path
+
+
+def asset_urls(html):
+    return re.findall(r'/assets/[^"]+', html)
+
+
+class TestAssetTable:
+    """Test fingerprinting and precompression"""
+
+    def test_only_scripts_and_styles(self, asset_dir):
+        table = AssetTable(str(asset_dir))
+        assert sorted(table.manifest()) == ["app.css", "app.js"]
+
+    def test_fingerprint_follows_content(self, asset_dir):
+        before = AssetTable(str(asset_dir))
+        assert re.fullmatch(r"app\.[0-9a-f]{12}\.js", before.url_name("app.js"))
+
+        (asset_dir / "app.js").write_text("console.log('changed');\n")
+        after = AssetTable(str(asset_dir))
+        assert after.url_name("app.js") != before.url_name("app.js")
+        assert after.url_name("app.css") == before.url_name("app.css")
+
+    def test_precompressed_bodies(self, asset_dir):
+        asset = AssetTable(str(asset_dir)).assets["app.js"]
+        assert gzip.decompress(asset.bodies["gzip"]) == asset.bodies["identity"]
+        assert ("br" in asset.bodies) == (static_assets.brotli is not None)
+        assert asset.mimetype == "text/javascript"
+
+    def test_lookup(self, asset_dir):
+        table = AssetTable(str(asset_dir))
+        name = table.url_name("app.js")
+
+        assert table.lookup(name) == (table.assets["app.js"], True)
+        assert table.lookup("app.000000000000.js") == (table.assets["app.js"], False)
+        assert table.lookup("other.000000000000.js") == (None, False)
+
+
+class TestShell:
+    """Test GET / serves a small, briefly cached shell"""
+
+    def test_links_fingerprinted_assets(self, client):
+        html = client.get('/').get_data(as_text=True)
+        urls = asset_urls(html)
+        assert {url.split("/")[-1] for url in urls} == {
+            app_module.assets.url_name(name)
+            for name in ("app.css", "app.js", "history.js", "offline.js", "chart-worker.js", "msgpack.js")
+        }
+        assert "<style>" not in html
+
+    def test_short_max_age_and_revalidation(self, client):
+        resp = client.get('/')
+        assert resp.headers["Cache-Control"] == f"max-age={app_module.SHELL_MAX_AGE}"
+
+        again = client.get('/', headers={"If-None-Match": resp.headers["ETag"]})
+        assert again.status_code == 304
+        assert again.get_data() == b""
+
+    def test_compressed_when_accepted(self, client):
+        plain = client.get('/')
+        resp = client.get('/', headers={"Accept-Encoding": "gzip"})
+
+        assert "Content-Encoding" not in plain.headers
+        assert resp.headers["Content-Encoding"] == "gzip"
+        assert resp.headers["Vary"] == "Accept-Encoding"
+        assert gzip.decompress(resp.get_data()) == plain.get_data()
+
+    def test_tenant_links_stay_under_prefix(self, client):
+        html = client.get('/t/alice/').get_data(as_text=True)
+        urls = re.findall(r'"(/[^"]*assets/[^"]+)"', html)
+        assert len(urls) == 6
+        assert all(url.startswith("/t/alice/assets/") for url in urls)
+
+
+class TestAssetRoute:
+    """Test GET /assets/<name>"""
+
+    def test_immutable_and_precompressed(self, client):
+        name = app_module.assets.url_name("app.js")
+        resp = client.get(f'/assets/{name}', headers={"Accept-Encoding": "gzip, deflate"})
+
+        assert resp.status_code == 200
+        assert resp.mimetype == "text/javascript"
+        assert resp.headers["Cache-Control"] == "public, max-age=31536000, immutable"
+        assert resp.headers["Content-Encoding"] == "gzip"
+        assert resp.get_data() == app_module.assets.assets["app.js"].bodies["gzip"]
+
+    def test_identity_without_accept_encoding(self, client):
+        name = app_module.assets.url_name("app.css")
+        resp = client.get(f'/assets/{name}')
+
+        assert "Content-Encoding" not in resp.headers
+        assert resp.get_data() == app_module.assets.assets["app.css"].bodies["identity"]
+
+    def test_old_fingerprint_gets_current_file_uncached(self, client):
+        resp = client.get('/assets/app.000000000000.js')
+
+        assert resp.status_code == 200
+        assert resp.headers["Cache-Control"] == "no-cache"
+        assert resp.get_data() == app_module.assets.assets["app.js"].bodies["identity"]
+
+    def test_unknown_asset(self, client):
+        assert client.get('/assets/nothing.000000000000.js').status_code == 404
+
+    def test_service_worker_lists_assets(self, client):
+        body = client.get('/sw.js').get_data(as_text=True)
+        for name in ("app.js", "app.css", "offline.js"):
+            assert f'"assets/{app_module.assets.url_name(name)}"' in body
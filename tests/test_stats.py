@@ -210,3 +210,82 @@ class TestStatsEndpoint:
 
         assert data['total_ml'] == 90.0  # Only bottles
         assert data['total_pump_ml'] == 150.0  # Just pump
+
+
+class TestRollingWindowStats:
+    """Test GET /api/stats?window="""
+
+    def post_ago(self, client, minutes, **feed):
+        from datetime import timedelta
+        feed["timestamp"] = (datetime.now() - timedelta(minutes=minutes)).isoformat()
+        client.post('/api/feeds', json=feed)
+
+    def test_window_spans_midnight(self, client):
+        """Entries from 'yesterday' count if they are within the window"""
+        self.post_ago(client, 60 * 20, type="bottle", amount_ml=90.0)
+        self.post_ago(client, 60 * 2, type="bottle", amount_ml=60.0)
+        self.post_ago(client, 60 * 30, type="bottle", amount_ml=120.0)
+
+        totals = client.get('/api/stats?window=24h').get_json()['totals']
+        assert totals['total_ml'] == 150.0
+        assert totals['total_feeds'] == 2
+        assert 18 * 60 - 1 <= totals['avg_feed_interval_min'] <= 18 * 60
+
+        assert client.get('/api/stats?window=6h').get_json()['totals']['total_ml'] == 60.0
+        assert client.get('/api/stats?window=7d').get_json()['totals']['total_ml'] == 270.0
+
+    def test_window_counts_every_kind(self, client):
+        self.post_ago(client, 10, type="nurse", side="left", duration_min=12)
+        self.post_ago(client, 20, type="pump", side="both", amount_ml=100.0)
+        self.post_ago(client, 30, type="diaper", side="pee")
+        self.post_ago(client, 40, type="vitamin_d")
+
+        totals = client.get('/api/stats?window=1h').get_json()['totals']
+        assert totals['total_nursing_sessions'] == 1
+        assert totals['total_pump_ml'] == 100.0
+        assert totals['total_diaper_changes'] == 1
+        assert 9 <= totals['avg_feed_interval_min'] <= 10
+
+    def test_cached_until_next_write(self, client):
+        import app as app_module
+        self.post_ago(client, 30, type="bottle", amount_ml=90.0)
+        client.get('/api/stats?window=24h')
+        hits = app_module.window_stats.hits
+        client.get('/api/stats?window=24h')
+        assert app_module.window_stats.hits == hits + 1
+
+        self.post_ago(client, 5, type="bottle", amount_ml=30.0)
+        assert client.get('/api/stats?window=24h').get_json()['totals']['total_ml'] == 120.0
+
+    def test_edits_and_deletes_leave_the_window(self, client):
+        self.post_ago(client, 30, type="bottle", amount_ml=90.0)
+        self.post_ago(client, 20, type="bottle", amount_ml=60.0)
+        client.get('/api/stats?window=1h')
+
+        client.delete('/api/feeds/2')
+        assert client.get('/api/stats?window=1h').get_json()['totals']['total_ml'] == 90.0
+
+    def test_window_reaching_archive(self, client):
+        """Archived entries inside the window are counted"""
+        import app as app_module
+        from datetime import timedelta
+        self.post_ago(client, 60 * 24 * 40, type="bottle", amount_ml=90.0)
+        self.post_ago(client, 60 * 24 * 10, type="bottle", amount_ml=60.0)
+        self.post_ago(client, 60 * 24 * 5, type="diaper", side="pee")
+        self.post_ago(client, 60, type="bottle", amount_ml=30.0)
+        before = client.get('/api/stats?window=30d').get_json()['totals']
+
+        app_module.archive_feeds_before((datetime.now() - timedelta(days=2)).strftime("%Y-%m-%d"))
+        totals = client.get('/api/stats?window=30d').get_json()['totals']
+
+        assert totals == before
+        assert totals['total_ml'] == 90.0
+        assert totals['total_diaper_changes'] == 1
+        assert totals['entries'] == 3
+        assert client.get('/api/stats?window=60d').get_json()['totals']['total_ml'] == 180.0
+
+    @pytest.mark.parametrize("window", ["24", "h", "0h", "5w", "999d"])
+    def test_invalid_window(self, client, window):
+        response = client.get(f'/api/stats?window={window}')
+        assert response.status_code == 400
+        assert response.get_json()['success'] is False
@@ -0,0 +1,80 @@
+"""
+Test per-tenant feed stores and the LRU of open tables.
+"""
+
+import os
+
+import app as app_module
+
+
+def diaper(timestamp):
+    return {"type": "diaper", "side": "pee", "timestamp": timestamp}
+
+
+class TestTenantSelection:
+    """Test addressing a tenant by URL prefix or header"""
+
+    def test_tenants_are_isolated(self, client, seed_data):
+        client.post('/t/alice/api/feeds', json=diaper("2026-02-10T05:00:00"))
+        client.post('/api/feeds', json=diaper("2026-02-10T06:00:00"), headers={"X-Tenant": "bob"})
+        client.post('/api/feeds', json=diaper("2026-02-10T07:00:00"), headers={"X-Tenant": "bob"})
+
+        alice = client.get('/t/alice/api/feeds?date=2026-02-10').get_json()['feeds']
+        assert [f['type'] for f in alice] == ["Diaper (Pee)"]
+        assert len(client.get('/api/feeds?date=2026-02-10', headers={"X-Tenant": "bob"}).get_json()['feeds']) == 2
+        assert len(client.get('/api/feeds?date=2026-02-10').get_json()['feeds']) == 2
+
+    def test_tenant_workbook_location(self, client, temp_xlsx):
+        client.post('/t/alice/api/feeds', json=diaper("2026-02-10T05:00:00"))
+        expected = os.path.join(os.path.dirname(temp_xlsx), "tenants", "alice", "feeds.xlsx")
+        assert os.path.exists(expected)
+
+    def test_invalid_tenant_key(self, client):
+        response = client.get('/api/feeds', headers={"X-Tenant": "../etc"})
+        assert response.status_code == 400
+        assert response.get_json()['success'] is False
+
+    def test_reading_unknown_tenant_creates_nothing(self, client, temp_xlsx):
+        response = client.get('/api/feeds', headers={"X-Tenant": "nobody"})
+
+        assert response.status_code == 404
+        assert response.get_json()['success'] is False
+        assert client.get('/t/nobody/api/home').status_code == 404
+        assert not os.path.exists(os.path.join(os.path.dirname(temp_xlsx), "tenants", "nobody"))
+
+    def test_create_tenant_command(self, app, client, temp_xlsx):
+        result = app.test_cli_runner().invoke(args=["create-tenant", "carol"])
+
+        assert result.exit_code == 0
+        assert os.path.exists(os.path.join(os.path.dirname(temp_xlsx), "tenants", "carol", "feeds.xlsx"))
+        assert client.get('/t/carol/api/feeds').get_json()['feeds'] == []
+
+    def test_ui_uses_tenant_prefix(self, client):
+        html = client.get('/t/alice/').get_data(as_text=True)
+        assert 'const API_ROOT = "/t/alice";' in html
+
+
+class TestOpenTables:
+    """Test the bound on in-memory tables"""
+
+    def test_least_recently_used_tables_are_dropped(self, app, client, monkeypatch):
+        monkeypatch.setitem(app.config, 'MAX_OPEN_TABLES', 2)
+        for i, name in enumerate(["t1", "t2", "t3", "t4"]):
+            client.post(f'/t/{name}/api/feeds', json=diaper(f"2026-02-10T0{i}:00:00"))
+
+        open_paths = list(app_module.feed_tables)
+        assert len(open_paths) == 2
+        assert open_paths[-1].endswith(os.path.join("t4", "feeds.xlsx"))
+
+        # A dropped tenant reloads from its snapshot + journal
+        feeds = client.get('/t/t1/api/feeds?date=2026-02-10').get_json()['feeds']
+        assert [f['time'] for f in feeds] == ["12:00 AM"]
+
+    def test_each_tenant_has_its_own_lock(self, app):
+        with app.test_request_context(headers={"X-Tenant": "alice"}):
+            app.preprocess_request()
+            alice = app_module.get_file_lock()
+        with app.test_request_context(headers={"X-Tenant": "bob"}):
+            app.preprocess_request()
+            bob = app_module.get_file_lock()
+        assert alice is not bob